@@ -1,25 +1,92 @@
 from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.utils import timezone
 from datetime import timedelta
 
-from .models import Item, ItemImage
+from .facets import admin_location_choices, apply_facet_changes, queryset_facet_keys
+from .locations import merge_locations
+from .models import (
+    AnalysisSuggestion,
+    ArchivedClaim,
+    ArchivedItem,
+    Item,
+    ItemImage,
+    Location,
+    LocationAlias,
+    LostReport,
+    ReportMatch,
+    SearchSynonym,
+    visible_items_q,
+)
+
+
+RECENT_CLAIMS_CACHE_KEY = "inventory:admin_recent_claims"
+# The changelist's recently-claimed notice may lag a claim by this long
+RECENT_CLAIMS_CACHE_SECONDS = 60
+# Unfiltered changelists of tables larger than this show the planner's row estimate
+ESTIMATED_COUNT_THRESHOLD = 10_000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that, on PostgreSQL, takes an unfiltered changelist's row count
+    from the planner statistics instead of counting a large table. Filtered
+    lists and small tables are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where and connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [query.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > ESTIMATED_COUNT_THRESHOLD:
+                return int(row[0])
+        return super().count
+
+
+class LocationListFilter(admin.SimpleListFilter):
+    """Filter on the most common locations, taken from the cached facet counts."""
+    title = "location found"
+    parameter_name = "location"
+
+    def lookups(self, request, model_admin):
+        return [(location, location) for location in admin_location_choices()]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(location__name=self.value())
+        return queryset
 
 
 class ItemImageInline(admin.TabularInline):
     model = ItemImage
+    fields = ("image",)
     extra = 1
 
 
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
-    list_display = ("title", "status", "claimed_info", "location_found", "date_found", "created_by", "created_at")
-    list_filter = ("status", "location_found", "date_found", "created_at", "claimed_at")
+    list_display = ("title", "status", "claimed_info", "location", "date_found", "created_by", "created_at")
+    list_filter = ("status", "category", LocationListFilter, "date_found", "created_at", "claimed_at")
+    list_select_related = ("created_by", "location")
     search_fields = ("title", "description", "location_found", "claimed_by_name")
+    autocomplete_fields = ("created_by", "location")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["mark_found"]
     readonly_fields = ("created_at", "updated_at", "claimed_at", "claimed_notification")
     fieldsets = (
         ("Item Information", {
-            "fields": ("title", "description", "category", "location_found", "date_found")
+            "fields": ("title", "description", "category", "location_found", "location", "date_found")
         }),
         ("Status", {
             "fields": ("status", "claimed_by_name", "claimed_at", "claimed_notification")
@@ -68,25 +135,158 @@ class ItemAdmin(admin.ModelAdmin):
         return "-"
     claimed_notification.short_description = "Claim Notification"
     
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.select_related('created_by')
-    
+    @admin.action(description="Return selected claimed items to found")
+    def mark_found(self, request, queryset):
+        """One UPDATE for the whole selection; facet counts are moved in bulk as the signals are bypassed."""
+        claimed = queryset.filter(status=Item.Status.CLAIMED)
+        with transaction.atomic():
+            # Every selected item is visible once found
+            before = queryset_facet_keys(claimed.filter(visible_items_q()))
+            after = queryset_facet_keys(claimed)
+            updated = claimed.update(
+                status=Item.Status.FOUND, claimed_by_name="", claimed_at=None, updated_at=timezone.now()
+            )
+            apply_facet_changes(before, after)
+            transaction.on_commit(lambda: cache.delete(RECENT_CLAIMS_CACHE_KEY))
+        self.message_user(request, f"Returned {updated} item(s) to found.")
+
     def changelist_view(self, request, extra_context=None):
         """Add notification count to admin list view."""
         extra_context = extra_context or {}
-        # Count recently claimed items (within 24 hours)
-        recent_claims = Item.objects.filter(
-            status=Item.Status.CLAIMED,
-            claimed_at__gte=timezone.now() - timedelta(hours=24)
-        ).count()
+        # Count recently claimed items (within 24 hours), cached briefly as it is shown on every load
+        recent_claims = cache.get_or_set(
+            RECENT_CLAIMS_CACHE_KEY,
+            lambda: Item.objects.filter(
+                status=Item.Status.CLAIMED,
+                claimed_at__gte=timezone.now() - timedelta(hours=24)
+            ).count(),
+            RECENT_CLAIMS_CACHE_SECONDS,
+        )
         if recent_claims > 0:
             extra_context['recent_claims_count'] = recent_claims
         return super().changelist_view(request, extra_context)
 
 
+class LocationAliasInline(admin.TabularInline):
+    model = LocationAlias
+    extra = 0
+
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ("name", "normalized", "item_count", "created_at")
+    search_fields = ("name", "normalized", "aliases__alias")
+    readonly_fields = ("created_at",)
+    inlines = [LocationAliasInline]
+    actions = ["merge_selected"]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(item_count=Count("items"))
+
+    @admin.display(ordering="item_count")
+    def item_count(self, obj):
+        return obj.item_count
+
+    @admin.action(description="Merge selected locations into the one with most items")
+    def merge_selected(self, request, queryset):
+        locations = list(queryset.order_by("-item_count", "name"))
+        if len(locations) < 2:
+            self.message_user(request, "Select at least two locations to merge.")
+            return
+        moved = merge_locations(locations[0], locations[1:])
+        self.message_user(request, f"Merged {len(locations) - 1} location(s) into {locations[0]}; moved {moved} item(s).")
+
+
 @admin.register(ItemImage)
 class ItemImageAdmin(admin.ModelAdmin):
-    list_display = ("item", "created_at")
+    list_display = ("item", "dimensions", "rendition_formats", "bytes_saved", "created_at")
+    list_select_related = ("item",)
+    autocomplete_fields = ("item",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    fields = ("item", "image", "width", "height", "rendition_formats", "bytes_saved", "created_at")
+    readonly_fields = ("width", "height", "rendition_formats", "bytes_saved", "created_at")
+
+    def dimensions(self, obj):
+        return f"{obj.width}×{obj.height}" if obj.width else "-"
+
+    def rendition_formats(self, obj):
+        sizes = obj.renditions.get("bytes", {})
+        return ", ".join(f"{key}: {size // 1024} KB" for key, size in sizes.items()) or "-"
+    rendition_formats.short_description = "Rendition bytes"
+
+
+@admin.register(AnalysisSuggestion)
+class AnalysisSuggestionAdmin(admin.ModelAdmin):
+    list_display = ("item", "current_title", "title", "category", "status", "created_at")
+    list_filter = ("status", "category")
+    list_select_related = ("item",)
+    autocomplete_fields = ("item",)
+    readonly_fields = ("created_at",)
+    actions = ["apply_suggestions", "dismiss_suggestions"]
+
+    def current_title(self, obj):
+        return obj.item.title
+    current_title.short_description = "Current Title"
+
+    @admin.action(description="Apply selected suggestions to their items")
+    def apply_suggestions(self, request, queryset):
+        applied = 0
+        for suggestion in queryset.filter(status=AnalysisSuggestion.Status.PENDING).select_related("item"):
+            suggestion.apply()
+            applied += 1
+        self.message_user(request, f"Applied {applied} suggestion(s).")
+
+    @admin.action(description="Dismiss selected suggestions")
+    def dismiss_suggestions(self, request, queryset):
+        dismissed = queryset.filter(status=AnalysisSuggestion.Status.PENDING).update(
+            status=AnalysisSuggestion.Status.DISMISSED
+        )
+        self.message_user(request, f"Dismissed {dismissed} suggestion(s).")
+
+
+@admin.register(SearchSynonym)
+class SearchSynonymAdmin(admin.ModelAdmin):
+    list_display = ("term", "synonym", "weight")
+    list_editable = ("weight",)
+    search_fields = ("term", "synonym")
+
+
+class ReportMatchInline(admin.TabularInline):
+    model = ReportMatch
+    fields = ("item", "score", "status")
+    readonly_fields = ("item", "score")
+    extra = 0
+    can_delete = False
+
+
+@admin.register(LostReport)
+class LostReportAdmin(admin.ModelAdmin):
+    list_display = ("reporter_name", "short_description", "category", "lost_from", "lost_to", "status", "created_at")
+    list_filter = ("status", "category")
+    search_fields = ("description", "location", "reporter_name", "reporter_contact")
+    readonly_fields = ("created_at", "matched_at")
+    inlines = [ReportMatchInline]
+
+    def short_description(self, obj):
+        return obj.description[:60]
+    short_description.short_description = "Description"
+
+
+class ArchivedClaimInline(admin.TabularInline):
+    model = ArchivedClaim
+    extra = 0
+    can_delete = False
+    readonly_fields = ("claimant_name", "claimed_at")
+
 
+@admin.register(ArchivedItem)
+class ArchivedItemAdmin(admin.ModelAdmin):
+    list_display = ("title", "original_id", "category", "claimed_by_name", "claimed_at", "archived_at")
+    list_filter = ("category", "archived_at")
+    search_fields = ("title", "description", "claimed_by_name")
+    readonly_fields = [field.name for field in ArchivedItem._meta.fields]
+    inlines = [ArchivedClaimInline]
 
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,17 @@
+"""
+Offline benchmarks run with ``python manage.py benchmark``.
+
+Each module listed in BENCHMARKS exposes ``run()`` returning a list of
+``Result`` tuples. A result with a ``budget`` fails the run when its value
+exceeds the budget, so benchmarks double as performance regression checks.
+"""
+from collections import namedtuple
+
+Result = namedtuple("Result", ["name", "value", "unit", "budget"], defaults=[None])
+
+BENCHMARKS = {
+    "vision_batching": "inventory.benchmarks.vision_batching",
+    "vision_tiers": "inventory.benchmarks.vision_tiers",
+    "startup": "inventory.benchmarks.startup",
+    "search": "inventory.benchmarks.search",
+}
@@ -0,0 +1,93 @@
+"""
+Browse search latency.
+
+Builds the in-memory trigram index (the SQLite stand-in for pg_trgm) over a
+synthetic catalogue and times typo, synonym and multi-word queries against
+it, with the seeded synonym table. For comparison it also times a naive
+search that computes the similarity against every word of every item.
+"""
+import random
+import statistics
+import time
+
+from inventory.search import TrigramIndex, expand_query, synonym_seed, tokenize, trigrams
+
+from . import Result
+
+ITEMS = 5000
+RUNS_PER_QUERY = 20
+P95_BUDGET_MS = 25
+QUERIES = ["bottel", "airpods", "blue water bottle", "calculater", "black backpack", "iphone charger", "hoody"]
+
+COLOURS = ["black", "white", "blue", "red", "green", "grey", "pink", "navy", "silver", "yellow"]
+NOUNS = [
+    "bottle", "earbuds", "backpack", "hoodie", "calculator", "notebook", "charger", "umbrella",
+    "jacket", "wallet", "phone", "laptop", "flask", "diary", "cap", "glasses", "keys", "lunchbox",
+]
+DETAILS = [
+    "scratch", "sticker", "dented", "name", "label", "zip", "strap", "case", "torn", "initials",
+    "logo", "keychain", "pocket", "faded", "cracked", "handle", "lid", "cover", "brand", "pattern",
+]
+
+
+def _catalogue(rng):
+    for pk in range(1, ITEMS + 1):
+        title = f"{rng.choice(COLOURS)} {rng.choice(NOUNS)}"
+        description = " ".join(rng.choice(DETAILS + COLOURS + NOUNS) for _ in range(12))
+        yield pk, title, description
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _scan(rows, expanded):
+    """Rank by comparing each query term with every word of every item."""
+    scores = {}
+    for pk, title, description in rows:
+        total = 0.0
+        for alternatives in expanded:
+            best = 0.0
+            for term, weight in alternatives.items():
+                term_trigrams = trigrams(term)
+                for text, field_weight in ((title, 1.0), (description, 0.4)):
+                    for word in tokenize(text):
+                        word_trigrams = trigrams(word)
+                        similarity = len(term_trigrams & word_trigrams) / len(term_trigrams | word_trigrams)
+                        best = max(best, weight * similarity * field_weight)
+            total += best
+        if total:
+            scores[pk] = total
+    return scores
+
+
+def run():
+    rows = list(_catalogue(random.Random(7)))
+    synonyms = {}
+    for term, synonym, weight in synonym_seed():
+        synonyms.setdefault(term, {})[synonym] = weight
+
+    started = time.perf_counter()
+    index = TrigramIndex.build(rows)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    timings = []
+    for query in QUERIES:
+        for _ in range(RUNS_PER_QUERY):
+            started = time.perf_counter()
+            scores = index.rank(expand_query(query, synonyms))
+            sorted(scores, key=scores.get, reverse=True)[:200]
+            timings.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    for query in QUERIES:
+        _scan(rows, expand_query(query, synonyms))
+    scan_ms = (time.perf_counter() - started) * 1000 / len(QUERIES)
+
+    return [
+        Result(f"index build ({ITEMS} items)", build_ms, "ms"),
+        Result("query p50", statistics.median(timings), "ms"),
+        Result("query p95", _percentile(timings, 0.95), "ms", P95_BUDGET_MS),
+        Result("full scan per query", scan_ms, "ms"),
+    ]
@@ -0,0 +1,68 @@
+"""
+Import cost of starting a process.
+
+Every gunicorn worker, ``manage.py`` invocation and test run starts with
+``django.setup()``. This runs it in fresh interpreters under
+``python -X importtime`` and reports the import time it adds to a bare
+interpreter, along with how many of the heavy optional libraries were pulled
+in; those should only be imported by the code paths that use them.
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+
+from . import Result
+
+RUNS = 5
+# Mostly Django itself and noisy between runs; the heavy-module check is
+# the strict guard
+SETUP_BUDGET_MS = 450
+# Modules that must not be imported just to load the project
+HEAVY_MODULES = ("PIL", "pillow_heif", "numpy", "requests", "httpx")
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def _profile(code: str) -> tuple:
+    """Return (total import time in ms, set of top-level packages imported) for running ``code``."""
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "lost_and_found_project.settings")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    packages = set()
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        # Top-level entries' cumulative times add up to the whole import cost.
+        if not indent:
+            total_us += int(cumulative_us)
+        packages.add(module.split(".")[0])
+    return total_us / 1000, packages
+
+
+def run():
+    timings = []
+    imported = set()
+    for _ in range(RUNS):
+        bare_ms, _ = _profile("pass")
+        setup_ms, packages = _profile("import django; django.setup()")
+        timings.append(setup_ms - bare_ms)
+        imported |= packages
+
+    heavy = sorted(imported.intersection(HEAVY_MODULES))
+    return [
+        Result("django.setup() imports (median)", statistics.median(timings), "ms", SETUP_BUDGET_MS),
+        Result(f"heavy modules imported at setup{': ' + ', '.join(heavy) if heavy else ''}", len(heavy), "modules", 0),
+    ]
@@ -0,0 +1,80 @@
+"""
+Per-item vs batched vision analysis.
+
+Gemini is replaced by a simulated transport whose latency is a fixed
+per-request overhead (connection, prompt processing) plus upload time for
+the request body plus generation time per item, so the benchmark measures
+how much of that overhead batching removes without any network access.
+"""
+import json
+import time
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+from inventory.services import analyze_item_images, analyze_items_batch
+
+from . import Result
+
+ITEMS = 10
+IMAGES_PER_ITEM = 2
+BATCH_SIZE = 5
+REQUEST_OVERHEAD_S = 0.25
+UPLOAD_BYTES_PER_S = 5_000_000
+GENERATION_S_PER_ITEM = 0.05
+
+
+def _fake_image(seed):
+    buffer = BytesIO()
+    Image.effect_noise((320, 240), 40 + seed).convert("RGB").save(buffer, format="JPEG", quality=85)
+    return SimpleUploadedFile(f"bench_{seed}.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+
+def _simulated_post(url, **kwargs):
+    body = kwargs["json"]
+    parts = body["contents"][0]["parts"]
+    item_labels = [
+        part["text"].split('"')[1]
+        for part in parts[1:]
+        if "text" in part and part["text"].startswith('Item "')
+    ]
+    body_bytes = len(json.dumps(body))
+    items = max(1, len(item_labels))
+    time.sleep(REQUEST_OVERHEAD_S + body_bytes / UPLOAD_BYTES_PER_S + GENERATION_S_PER_ITEM * items)
+
+    suggestion = {"title": "Black Bottle", "description": "Steel bottle", "category": "Bottles and containers"}
+    if item_labels:
+        payload = [dict(suggestion, item_id=label) for label in item_labels]
+    else:
+        payload = suggestion
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"candidates": [{"content": {"parts": [{"text": json.dumps(payload)}]}}]}
+    return response
+
+
+def run():
+    items = {
+        item_id: [_fake_image(item_id * IMAGES_PER_ITEM + i) for i in range(IMAGES_PER_ITEM)]
+        for item_id in range(1, ITEMS + 1)
+    }
+
+    with override_settings(VISION_PROVIDER="gemini", GOOGLE_API_KEY="benchmark"), patch("requests.post", _simulated_post):
+        started = time.perf_counter()
+        for files in items.values():
+            analyze_item_images(files)
+        per_item_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        keys = list(items)
+        for i in range(0, len(keys), BATCH_SIZE):
+            analyze_items_batch({key: items[key] for key in keys[i:i + BATCH_SIZE]})
+        batched_s = time.perf_counter() - started
+
+    return [
+        Result("per-item calls", per_item_s, "s"),
+        Result(f"batched calls (batch size {BATCH_SIZE})", batched_s, "s"),
+        Result("batching speedup", per_item_s / batched_s, "x"),
+    ]
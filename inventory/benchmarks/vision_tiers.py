@@ -0,0 +1,76 @@
+"""
+Time to first suggestion: one full vision call vs tiered analysis.
+
+Gemini is replaced by a simulated transport whose latency is a fixed
+per-request overhead plus upload time for the request body plus generation
+time per output field, so the benchmark shows how much sooner the quick
+pass (one thumbnail, short prompt) fills the title and category than the
+full call fills anything.
+"""
+import json
+import time
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+from inventory.services import aanalyze_item_details, aanalyze_item_images, aanalyze_item_quick
+
+from . import Result
+
+IMAGES = 3
+REQUEST_OVERHEAD_S = 0.25
+UPLOAD_BYTES_PER_S = 5_000_000
+GENERATION_S_PER_FIELD = {"title": 0.1, "category": 0.05, "description": 0.6}
+# The quick pass has to beat the full call to the title by at least this much
+QUICK_SPEEDUP_BUDGET = 1 / 1.5
+
+
+def _fake_image(seed):
+    buffer = BytesIO()
+    Image.effect_noise((1600, 1200), 40 + seed).convert("RGB").save(buffer, format="JPEG", quality=85)
+    return SimpleUploadedFile(f"bench_{seed}.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+
+async def _simulated_post(url, body, timeout, headers=None):
+    prompt = body["contents"][0]["parts"][0]["text"]
+    fields = [field for field in GENERATION_S_PER_FIELD if f'"{field}"' in prompt]
+    time.sleep(
+        REQUEST_OVERHEAD_S
+        + len(json.dumps(body)) / UPLOAD_BYTES_PER_S
+        + sum(GENERATION_S_PER_FIELD[field] for field in fields)
+    )
+    payload = {"title": "Black Bottle", "description": "Steel bottle", "category": "Bottles and containers"}
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        "candidates": [{"content": {"parts": [{"text": json.dumps({field: payload[field] for field in fields})}]}}]
+    }
+    return response
+
+
+def _timed(coroutine_function, *args):
+    started = time.perf_counter()
+    async_to_sync(coroutine_function)(*args)
+    return time.perf_counter() - started
+
+
+def run():
+    files = [_fake_image(i) for i in range(IMAGES)]
+
+    with (
+        override_settings(VISION_PROVIDER="gemini", GOOGLE_API_KEY="benchmark"),
+        patch("inventory.vision_providers.apost_with_retries", _simulated_post),
+    ):
+        full_s = _timed(aanalyze_item_images, files)
+        quick_s = _timed(aanalyze_item_quick, files)
+        details_s = _timed(aanalyze_item_details, files, "BOTTLES_AND_CONTAINERS", "Black Bottle")
+
+    return [
+        Result("full call (all fields)", full_s, "s"),
+        Result("quick pass (title, category)", quick_s, "s"),
+        Result("detailed pass (description)", details_s, "s"),
+        Result("quick pass / full call", quick_s / full_s, "x", QUICK_SPEEDUP_BUDGET),
+    ]
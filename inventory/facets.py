@@ -0,0 +1,152 @@
+"""
+Per-category and per-location counts of publicly visible items.
+
+The browse page shows how many items each sidebar facet holds. Counting
+them per request would run the visibility filter once per facet, so the
+counts live in ``FacetCount`` rows that the Item signal handlers adjust as
+items are created, claimed, edited or deleted. Pages read a cached snapshot
+of that table. Claimed items also drop out of view when their visibility
+window passes, which no write announces, and ``queryset.update()`` bypasses
+signals; ``reconcile_facet_counts`` (run periodically by the
+``reconcile_facet_counts`` command) recomputes the rows from scratch.
+"""
+import logging
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import FacetCount, Item, visible_items_q
+
+logger = logging.getLogger(__name__)
+
+FACET_CACHE_KEY = "inventory:facet_counts"
+ADMIN_LOCATIONS_CACHE_KEY = "inventory:admin_locations"
+# Locations listed in the browse sidebar, most items first
+LOCATION_FACET_LIMIT = 8
+# Locations offered by the admin's location filter
+ADMIN_LOCATION_LIMIT = 50
+
+
+def facet_keys(item, now=None) -> Counter:
+    """The (facet, value) pairs ``item`` counts towards; empty if it is hidden."""
+    if not item.is_visible(now):
+        return Counter()
+    keys = Counter({(FacetCount.Facet.CATEGORY, item.category): 1})
+    if item.location_id:
+        keys[(FacetCount.Facet.LOCATION, item.location.name)] += 1
+    return keys
+
+
+def queryset_facet_keys(queryset) -> Counter:
+    """
+    The (facet, value) pairs of every item in ``queryset``, counted by the
+    database; filter it with ``visible_items_q`` for the items' current keys.
+    """
+    queryset = queryset.order_by()
+    keys = Counter()
+    for row in queryset.values("category").annotate(n=Count("pk")):
+        keys[(FacetCount.Facet.CATEGORY, row["category"])] += row["n"]
+    for row in queryset.exclude(location=None).values("location__name").annotate(n=Count("pk")):
+        keys[(FacetCount.Facet.LOCATION, row["location__name"])] += row["n"]
+    return keys
+
+
+def apply_facet_changes(before: Counter, after: Counter) -> None:
+    """Move counts from the ``before`` facet keys of an item to its ``after`` keys."""
+    deltas = Counter(after)
+    deltas.subtract(before)
+    changed = False
+    for (facet, value), delta in deltas.items():
+        if not delta:
+            continue
+        changed = True
+        rows = FacetCount.objects.filter(facet=facet, value=value)
+        if rows.update(count=F("count") + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                FacetCount.objects.create(facet=facet, value=value, count=delta)
+        except IntegrityError:
+            # Another request created the row first.
+            rows.update(count=F("count") + delta)
+    if changed:
+        transaction.on_commit(invalidate_facet_counts)
+
+
+def invalidate_facet_counts() -> None:
+    cache.delete_many([FACET_CACHE_KEY, ADMIN_LOCATIONS_CACHE_KEY])
+
+
+def reconcile_facet_counts(now=None) -> int:
+    """
+    Recompute every FacetCount row from the items table and return the
+    number of rows that were wrong.
+    """
+    expected = queryset_facet_keys(Item.objects.filter(visible_items_q(now)))
+
+    corrected = 0
+    with transaction.atomic():
+        existing = {(row.facet, row.value): row for row in FacetCount.objects.select_for_update()}
+        for key, row in existing.items():
+            if key not in expected:
+                row.delete()
+                corrected += 1
+            elif row.count != expected[key]:
+                row.count = expected[key]
+                row.save(update_fields=["count"])
+                corrected += 1
+        missing = [key for key in expected if key not in existing]
+        FacetCount.objects.bulk_create(
+            [FacetCount(facet=facet, value=value, count=expected[(facet, value)]) for facet, value in missing]
+        )
+        corrected += len(missing)
+    if corrected:
+        logger.info(f"Reconciled {corrected} facet count(s)")
+    invalidate_facet_counts()
+    return corrected
+
+
+def get_facet_counts() -> dict:
+    """
+    Return ``{"total", "category": {value: count}, "location": [(value, count)]}``
+    for the browse page from the cache, reading the table only on a miss.
+    """
+    counts = cache.get(FACET_CACHE_KEY)
+    if counts is not None:
+        return counts
+
+    # Seeded by the 0011 migration and kept current by the signal handlers
+    rows = list(FacetCount.objects.filter(count__gt=0).values_list("facet", "value", "count"))
+
+    categories = {value: count for facet, value, count in rows if facet == FacetCount.Facet.CATEGORY}
+    locations = sorted(
+        ((value, count) for facet, value, count in rows if facet == FacetCount.Facet.LOCATION),
+        key=lambda pair: (-pair[1], pair[0].lower()),
+    )
+    counts = {
+        "total": sum(categories.values()),
+        "category": categories,
+        "location": locations[:LOCATION_FACET_LIMIT],
+    }
+    cache.set(FACET_CACHE_KEY, counts, settings.FACET_CACHE_SECONDS)
+    return counts
+
+
+def admin_location_choices() -> list:
+    """
+    The most common locations of visible items, for the admin's location
+    filter, from the cache. Read from the facet counts rather than with a
+    ``DISTINCT`` over the items table.
+    """
+    locations = cache.get(ADMIN_LOCATIONS_CACHE_KEY)
+    if locations is None:
+        locations = list(
+            FacetCount.objects.filter(facet=FacetCount.Facet.LOCATION, count__gt=0)
+            .order_by("-count", "value")
+            .values_list("value", flat=True)[:ADMIN_LOCATION_LIMIT]
+        )
+        cache.set(ADMIN_LOCATIONS_CACHE_KEY, locations, settings.FACET_CACHE_SECONDS)
+    return locations
@@ -1,7 +1,16 @@
 from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import inlineformset_factory, DateInput
+from django.urls import reverse_lazy
 
-from .models import Item, ItemImage
+from .models import Item, ItemImage, LostReport
+from .uploads import UploadError, inspect_image
+
+
+def location_autocomplete_attrs() -> dict:
+    """Widget attributes that hook a location input up to location_autocomplete.js."""
+    return {"data-location-autocomplete": reverse_lazy("inventory:location_autocomplete"), "autocomplete": "off"}
 
 
 class ItemForm(forms.ModelForm):
@@ -16,11 +25,35 @@ class ItemForm(forms.ModelForm):
     class Meta:
         model = Item
         fields = ["title", "description", "location_found", "date_found", "status", "category"]
+        widgets = {
+            "location_found": forms.TextInput(attrs=location_autocomplete_attrs()),
+        }
+
+
+class ItemImageForm(forms.ModelForm):
+    class Meta:
+        model = ItemImage
+        fields = ["image"]
+
+    def clean_image(self):
+        image = self.cleaned_data.get("image")
+        if not isinstance(image, UploadedFile):
+            return image
+        if image.size > settings.MAX_UPLOAD_BYTES:
+            raise forms.ValidationError(
+                f"Image is larger than {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+            )
+        try:
+            inspect_image(image)
+        except UploadError as e:
+            raise forms.ValidationError(str(e))
+        return image
 
 
 ItemImageFormSet = inlineformset_factory(
     parent_model=Item,
     model=ItemImage,
+    form=ItemImageForm,
     fields=["image"],
     extra=1,
     can_delete=False,
@@ -43,3 +76,53 @@ class ClaimItemForm(forms.Form):
     )
 
 
+class PhotoSearchForm(forms.Form):
+    """Form for finding items that look like a photo taken by the student."""
+    photo = forms.ImageField(
+        required=True,
+        widget=forms.ClearableFileInput(attrs={
+            'accept': 'image/*',
+        }),
+    )
+
+
+class LostReportForm(forms.ModelForm):
+    """Form for a student to describe something they lost."""
+    class Meta:
+        model = LostReport
+        fields = ["description", "category", "lost_from", "lost_to", "location", "photo", "reporter_name", "reporter_contact"]
+        widgets = {
+            "lost_from": DateInput(attrs={"type": "date"}),
+            "lost_to": DateInput(attrs={"type": "date"}),
+            "photo": forms.ClearableFileInput(attrs={"accept": "image/*"}),
+            "location": forms.TextInput(attrs=location_autocomplete_attrs()),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            field.widget.attrs.setdefault(
+                "class",
+                "w-full rounded-xl border border-slate-200 bg-white px-4 py-3 text-sm focus:border-cyan-500 focus:outline-hidden",
+            )
+        self.fields["description"].widget.attrs["rows"] = 4
+
+    def clean_photo(self):
+        photo = self.cleaned_data.get("photo")
+        if isinstance(photo, UploadedFile):
+            if photo.size > settings.MAX_UPLOAD_BYTES:
+                raise forms.ValidationError(
+                    f"Image is larger than {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+                )
+            try:
+                inspect_image(photo)
+            except UploadError as e:
+                raise forms.ValidationError(str(e))
+        return photo
+
+    def clean(self):
+        cleaned_data = super().clean()
+        lost_from, lost_to = cleaned_data.get("lost_from"), cleaned_data.get("lost_to")
+        if lost_from and lost_to and lost_from > lost_to:
+            self.add_error("lost_to", "The last day cannot be before the first.")
+        return cleaned_data
@@ -0,0 +1,98 @@
+"""
+Normalisation applied once to every photo as it enters the system.
+
+Phone photos carry an EXIF orientation flag instead of rotated pixels, GPS
+and camera metadata, embedded preview images (EXIF thumbnails, the extra
+frames of MPO files) and often a wide-gamut colour profile. This stage
+bakes the orientation into the pixels, converts to sRGB and re-encodes
+without any of the metadata, so the stored file is what every later consumer
+(renditions, similarity hashing, vision analysis) reads as is.
+"""
+import functools
+import logging
+from io import BytesIO
+
+from PIL import Image, ImageCms, ImageOps
+
+logger = logging.getLogger(__name__)
+
+NORMALIZED_JPEG_QUALITY = 90
+# Image.info keys that carry metadata or previews we do not want to ship
+METADATA_KEYS = {"exif", "icc_profile", "xmp", "XML:com.adobe.xmp", "comment", "photoshop", "adobe"}
+SRGB_PROFILE = ImageCms.createProfile("sRGB")
+
+
+@functools.lru_cache(maxsize=None)
+def heif_available() -> bool:
+    """
+    Register the pillow-heif opener with Pillow the first time HEIC support
+    is needed and return whether it is installed. Deferred because loading
+    libheif adds noticeably to every process's startup.
+    """
+    try:
+        from pillow_heif import register_heif_opener
+    except ImportError:
+        logger.warning("pillow-heif not available. HEIC files will not be converted.")
+        return False
+    register_heif_opener()
+    return True
+
+
+def is_normalized(img) -> bool:
+    """Whether ``img`` is a single-frame JPEG or PNG with nothing to strip."""
+    return (
+        img.format in ("JPEG", "PNG")
+        and getattr(img, "n_frames", 1) == 1
+        and not METADATA_KEYS.intersection(img.info)
+    )
+
+
+def to_srgb(img):
+    """Convert ``img`` from its embedded ICC profile (if any) to sRGB."""
+    icc_profile = img.info.get("icc_profile")
+    if not icc_profile:
+        return img
+    output_mode = "RGBA" if "A" in img.getbands() else "RGB"
+    try:
+        return ImageCms.profileToProfile(
+            img, ImageCms.ImageCmsProfile(BytesIO(icc_profile)), SRGB_PROFILE, outputMode=output_mode
+        )
+    except (ImageCms.PyCMSError, OSError, ValueError) as e:
+        logger.warning(f"Ignoring unusable colour profile: {e}")
+        return img
+
+
+def normalize_image(file):
+    """
+    Return ``(data, extension)`` for the normalised version of ``file``, or
+    ``None`` when it is already normalised and can be stored unchanged.
+
+    Images with transparency become PNG, everything else (including HEIC)
+    JPEG. Raises ``OSError`` if the file cannot be read as an image.
+    """
+    heif_available()
+    file.seek(0)
+    img = Image.open(file)
+    if is_normalized(img):
+        file.seek(0)
+        return None
+
+    # Only the first frame is the photo; later MPO frames are previews.
+    img.seek(0)
+    # Transpose first: the colour conversion returns an image without ``info``.
+    img = ImageOps.exif_transpose(img)
+    img = to_srgb(img)
+    has_alpha = "A" in img.getbands() or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB")
+    # Encoders fall back to ``info`` for the profile and EXIF, so drop it all.
+    img.info = {}
+
+    output = BytesIO()
+    if has_alpha:
+        img.save(output, format="PNG", optimize=True)
+        extension = "png"
+    else:
+        img.save(output, format="JPEG", quality=NORMALIZED_JPEG_QUALITY, optimize=True)
+        extension = "jpg"
+    file.seek(0)
+    return output.getvalue(), extension
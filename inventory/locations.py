@@ -0,0 +1,186 @@
+"""
+Normalised item locations.
+
+Staff type where an item was found, so the same place drifts into
+"Library", "library " and "Lib 2nd floor". Each item is linked to a
+``Location``: spellings with the same ``location_key`` (case, spacing and
+punctuation ignored) or a ``LocationAlias`` of it resolve to the same row,
+so the browse page filters on an indexed foreign key instead of
+``icontains``. ``cluster_locations`` grouped the existing spellings once
+(a frozen copy runs in the 0017 data migration); new variants get a location of their own until
+staff merge them in the admin, which keeps the old spelling as an alias.
+
+``location_suggestions`` answers the autocomplete on the upload form and
+the browse filters from a prefix lookup on ``Location.normalized`` and
+``LocationAlias.alias``, cached until a location changes.
+"""
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, Q
+
+from .facets import apply_facet_changes, queryset_facet_keys
+from .models import FacetCount, Item, Location, LocationAlias, visible_items_q
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+NUMBER_RE = re.compile(r"\d+")
+# Shortest leading word taken as an abbreviation of a longer location ("lib" for "library")
+MIN_ABBREVIATION = 3
+# Keys at least this similar are treated as misspellings of each other
+MERGE_SIMILARITY = 0.85
+SUGGESTION_LIMIT = 10
+VERSION_CACHE_KEY = "inventory:locations:version"
+
+
+def location_key(text: str) -> str:
+    """Lower case words of ``text`` separated by single spaces: "Library  (2nd Floor)" -> "library 2nd floor"."""
+    return " ".join(WORD_RE.findall((text or "").lower()))
+
+
+def _display_name(spellings: Counter) -> str:
+    """The most used spelling, preferring capitalised and shorter ones on a tie."""
+    return min(spellings, key=lambda name: (-spellings[name], name == name.lower(), len(name), name))
+
+
+def _merge_target(key: str, roots: list) -> str | None:
+    """The root key that ``key`` is a variant of, from ``roots`` ordered most used first."""
+    first_word = key.split()[0]
+    for root in roots:
+        # "lib 2nd floor" and "library annex" belong to "library"
+        if " " not in root and len(first_word) >= MIN_ABBREVIATION and root.startswith(first_word):
+            return root
+    for root in roots:
+        # "Room 101" and "Room 102" are as similar as "libary" and "library"
+        same_numbers = NUMBER_RE.findall(key) == NUMBER_RE.findall(root)
+        if same_numbers and SequenceMatcher(None, key, root).ratio() >= MERGE_SIMILARITY:
+            return root
+    return None
+
+
+def cluster_locations(counts: dict) -> dict:
+    """
+    Group free-text locations, given as ``{spelling: number of items}``,
+    into ``{display name: [spellings]}``. Spellings with the same key are
+    grouped first; a group then joins a more used one when its first word
+    abbreviates that group's one-word key or when the keys are near-identical.
+    """
+    groups = {}
+    for spelling, count in counts.items():
+        key = location_key(spelling)
+        if key:
+            groups.setdefault(key, Counter())[spelling.strip()] += count
+    ordered = sorted(groups, key=lambda key: (-sum(groups[key].values()), key))
+
+    roots = []
+    members = {}
+    for key in ordered:
+        root = _merge_target(key, roots)
+        if root is None:
+            roots.append(key)
+            members[key] = Counter(groups[key])
+        else:
+            members[root].update(groups[key])
+
+    clusters = {}
+    for root in roots:
+        spellings = Counter({name: n for name, n in members[root].items() if location_key(name) == root})
+        clusters[_display_name(spellings)] = sorted(members[root])
+    return clusters
+
+
+def find_location(text: str) -> Location | None:
+    """The location ``text`` names, by key or alias."""
+    key = location_key(text)
+    if not key:
+        return None
+    return Location.objects.filter(Q(normalized=key) | Q(aliases__alias=key)).first()
+
+
+def resolve_location(text: str) -> Location | None:
+    """The location ``text`` names, created if it is new; None for a blank location."""
+    location = find_location(text)
+    if location is not None or not location_key(text):
+        return location
+    name, key = text.strip(), location_key(text)
+    try:
+        with transaction.atomic():
+            return Location.objects.create(name=name[:255], normalized=key[:255])
+    except IntegrityError:
+        # Created by another request first, or the name is taken with another key
+        return find_location(text) or Location.objects.filter(name=name).first()
+
+
+@transaction.atomic
+def merge_locations(target: Location, others) -> int:
+    """
+    Fold ``others`` into ``target``: their items move across in one update
+    and their keys and aliases become aliases of ``target``. Returns the
+    number of items moved.
+    """
+    others = [location for location in others if location.pk != target.pk]
+    if not others:
+        return 0
+
+    other_ids = [location.pk for location in others]
+    items = Item.objects.filter(location_id__in=other_ids)
+    before = queryset_facet_keys(items.filter(visible_items_q()))
+    after = Counter()
+    for (facet, value), n in before.items():
+        after[(facet, target.name if facet == FacetCount.Facet.LOCATION else value)] += n
+    moved = items.update(location=target)
+    apply_facet_changes(before, after)
+    LocationAlias.objects.filter(location_id__in=other_ids).update(location=target)
+    keys = {location.normalized for location in others}
+    Location.objects.filter(pk__in=other_ids).delete()
+    LocationAlias.objects.bulk_create(
+        [LocationAlias(location=target, alias=key) for key in keys if key != target.normalized],
+        ignore_conflicts=True,
+    )
+    transaction.on_commit(invalidate_locations)
+    return moved
+
+
+def invalidate_locations() -> None:
+    """Retire every cached suggestion list."""
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, 1, None)
+
+
+def prefix_q(field: str, key: str) -> Q:
+    """Match values of ``field`` (a location key) starting with ``key``, using the column's index."""
+    if connection.vendor == "postgresql":
+        # LIKE 'key%' uses the varchar_pattern_ops index Django adds to unique text columns
+        return Q(**{f"{field}__startswith": key})
+    # SQLite does not use an index for LIKE ... ESCAPE; keys hold only [a-z0-9 ], all sorting before "{"
+    return Q(**{f"{field}__gte": key, f"{field}__lt": key + "{"})
+
+
+def location_suggestions(prefix: str, limit: int = SUGGESTION_LIMIT) -> list:
+    """
+    Names of the locations whose key or an alias starts with ``prefix``,
+    those with most items first, cached per prefix.
+    """
+    key = location_key(prefix)
+    if not key:
+        return []
+    version = cache.get_or_set(VERSION_CACHE_KEY, 1, None)
+    cache_key = f"inventory:locations:{version}:{limit}:{key}"
+    names = cache.get(cache_key)
+    if names is None:
+        matching = Location.objects.filter(
+            prefix_q("normalized", key)
+            | Q(pk__in=LocationAlias.objects.filter(prefix_q("alias", key)).values("location_id"))
+        )
+        names = list(
+            matching.annotate(item_count=Count("items"))
+            .order_by("-item_count", "name")
+            .values_list("name", flat=True)[:limit]
+        )
+        cache.set(cache_key, names, settings.FACET_CACHE_SECONDS)
+    return names
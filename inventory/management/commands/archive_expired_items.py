@@ -0,0 +1,171 @@
+import os
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image
+
+from inventory.models import CLAIM_VISIBILITY_DAYS, ArchivedClaim, ArchivedItem, Item
+
+COMPRESSED_MAX_SIZE = (1600, 1600)
+COMPRESSED_QUALITY = 70
+
+
+class Command(BaseCommand):
+    help = (
+        "Move claimed items past their retention period, with their claims, into the archive tables "
+        "and their images into cold storage, leaving a tombstone so old links still resolve. "
+        "Intended to run on a schedule (e.g. nightly from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Items archived per transaction.")
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=None,
+            help="Days to keep an item after its public visibility window ends "
+                 "(default: settings.ITEM_RETENTION_DAYS).",
+        )
+        parser.add_argument(
+            "--compress",
+            action="store_true",
+            help="Downscale and re-encode images as smaller JPEGs when moving them to cold storage.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many items would be archived.")
+
+    def handle(self, *args, **options):
+        retention_days = options["retention_days"]
+        if retention_days is None:
+            retention_days = settings.ITEM_RETENTION_DAYS
+
+        queryset = self.expired_items(retention_days)
+        if options["dry_run"]:
+            self.stdout.write(f"{queryset.count()} item(s) would be archived.")
+            return
+
+        cold_storage = FileSystemStorage(location=settings.ARCHIVE_MEDIA_ROOT)
+        archived = images_moved = failed = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk)
+                .select_related("created_by")
+                .prefetch_related("images", "claims")[:options["batch_size"]]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            batch_archived, batch_images, batch_failed = self._archive_batch(batch, cold_storage, options["compress"])
+            archived += batch_archived
+            images_moved += batch_images
+            failed += batch_failed
+            self.stdout.write(f"{archived} item(s) archived, {images_moved} image(s) moved, {failed} failure(s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} item(s) and moved {images_moved} image(s) to cold storage; {failed} failure(s)."
+        ))
+
+    def expired_items(self, retention_days):
+        """Claimed items whose visibility window plus retention period has passed."""
+        now = timezone.now()
+        expired_q = Q()
+        for category, _ in Item.Category.choices:
+            visible_days = CLAIM_VISIBILITY_DAYS.get(category, 1)
+            expired_q |= Q(category=category, claimed_at__lt=now - timedelta(days=visible_days + retention_days))
+        return Item.objects.filter(
+            status=Item.Status.CLAIMED,
+            claimed_at__isnull=False,
+        ).filter(expired_q).order_by("pk")
+
+    def _archive_batch(self, batch, cold_storage, compress):
+        archived_items = []
+        claims_by_item = {}
+        cold_paths = []
+        original_paths = []
+        failed = 0
+
+        already_archived = set(
+            ArchivedItem.objects.filter(original_id__in=[item.pk for item in batch]).values_list("original_id", flat=True)
+        )
+        for item in batch:
+            hot_images = [item_image.image for item_image in item.images.all() if item_image.image]
+            if item.pk in already_archived:
+                # Its images went to cold storage with the archive row; only the hot copies are left to drop
+                original_paths.extend((image.storage, image.name) for image in hot_images)
+                continue
+            try:
+                media = [self._copy_to_cold_storage(image, cold_storage, compress) for image in hot_images]
+            except Exception as e:
+                self.stderr.write(f"Skipping item {item.pk}: could not move its images ({e})")
+                failed += 1
+                continue
+            cold_paths.extend(media)
+            original_paths.extend((image.storage, image.name) for image in hot_images)
+            archived_items.append(ArchivedItem(
+                original_id=item.pk,
+                title=item.title,
+                description=item.description,
+                location_found=item.location_found,
+                date_found=item.date_found,
+                status=item.status,
+                category=item.category,
+                created_by_username=item.created_by.get_username() if item.created_by else "",
+                claimed_by_name=item.claimed_by_name,
+                claimed_at=item.claimed_at,
+                created_at=item.created_at,
+                media=media,
+            ))
+            claims_by_item[item.pk] = list(item.claims.all())
+
+        moved_ids = [item.pk for item in batch if item.pk in claims_by_item or item.pk in already_archived]
+        try:
+            with transaction.atomic():
+                ArchivedItem.objects.bulk_create(archived_items)
+                archive_ids = dict(
+                    ArchivedItem.objects.filter(original_id__in=claims_by_item).values_list("original_id", "pk")
+                )
+                ArchivedClaim.objects.bulk_create([
+                    ArchivedClaim(
+                        archived_item_id=archive_ids[item_id],
+                        claimant_name=claim.claimant_name,
+                        claimed_at=claim.claimed_at,
+                    )
+                    for item_id, claims in claims_by_item.items()
+                    for claim in claims
+                ])
+                Item.objects.filter(pk__in=moved_ids).delete()
+                # Only drop the hot copies once the archive rows are durable.
+                transaction.on_commit(lambda: self._delete_files(original_paths))
+        except Exception as e:
+            self.stderr.write(f"Batch ending at item {batch[-1].pk} failed and was rolled back: {e}")
+            self._delete_files([(cold_storage, path) for path in cold_paths])
+            return 0, 0, failed + len(moved_ids)
+
+        return len(moved_ids), len(original_paths), failed
+
+    def _copy_to_cold_storage(self, field_file, cold_storage, compress):
+        with field_file.storage.open(field_file.name, "rb") as src:
+            if not compress:
+                return cold_storage.save(field_file.name, File(src))
+            img = Image.open(src)
+            img.thumbnail(COMPRESSED_MAX_SIZE)
+            output = BytesIO()
+            img.convert("RGB").save(output, format="JPEG", quality=COMPRESSED_QUALITY, optimize=True)
+            name = f"{os.path.splitext(field_file.name)[0]}.jpg"
+            return cold_storage.save(name, ContentFile(output.getvalue()))
+
+    def _delete_files(self, paths):
+        for storage, name in paths:
+            try:
+                storage.delete(name)
+            except Exception as e:
+                self.stderr.write(f"Could not delete {name}: {e}")
@@ -0,0 +1,38 @@
+import importlib
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = "Run the offline performance benchmarks and check their budgets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help=f"Benchmarks to run (default: all). Available: {', '.join(BENCHMARKS)}.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["names"] or list(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+        over_budget = []
+        for name in names:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            module = importlib.import_module(BENCHMARKS[name])
+            for result in module.run():
+                line = f"  {result.name}: {result.value:.3f} {result.unit}"
+                if result.budget is not None:
+                    line += f" (budget {result.budget:.3f} {result.unit})"
+                    if result.value > result.budget:
+                        over_budget.append(f"{name}: {result.name}")
+                        line = self.style.ERROR(line)
+                self.stdout.write(line)
+
+        if over_budget:
+            raise CommandError(f"Over budget: {'; '.join(over_budget)}")
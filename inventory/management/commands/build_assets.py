@@ -0,0 +1,33 @@
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile assets/tailwind.css into the purged, minified static/css/app.css. "
+        "Run collectstatic afterwards to hash and precompress it for deployment."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--watch", action="store_true", help="Rebuild whenever a template or script changes.")
+
+    def handle(self, *args, **options):
+        try:
+            from tailwindcss_bin import find_tailwindcss_bin
+        except ImportError:
+            raise CommandError("The Tailwind compiler is not installed: pip install tailwindcss-bin")
+
+        source = settings.BASE_DIR / "assets" / "tailwind.css"
+        output = settings.BASE_DIR / "static" / "css" / "app.css"
+        command = [find_tailwindcss_bin(), "--input", str(source), "--output", str(output), "--minify"]
+        if options["watch"]:
+            command.append("--watch")
+        try:
+            subprocess.run(command, cwd=settings.BASE_DIR, check=True)
+        except subprocess.CalledProcessError as e:
+            raise CommandError(f"Tailwind build failed with exit status {e.returncode}")
+        except KeyboardInterrupt:
+            return
+        self.stdout.write(self.style.SUCCESS(f"Wrote {output.relative_to(settings.BASE_DIR)} ({output.stat().st_size} bytes)"))
@@ -0,0 +1,175 @@
+import os
+import re
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.utils import timezone
+
+from inventory.media import RENDITION_NAME_RE
+from inventory.models import ItemImage
+from inventory.renditions import RENDITION_DIR
+from inventory.uploads import purge_stale_uploads
+
+# (model, file field) pairs whose values reference files in default storage:
+# every file field of the app, so a new one cannot have its files collected.
+REFERENCE_FIELDS = [
+    (model, field.name)
+    for model in apps.get_app_config("inventory").get_models()
+    for field in model._meta.get_fields()
+    if isinstance(field, models.FileField)
+]
+# Directories scanned by default: every file field's upload directory and the renditions
+DEFAULT_PREFIXES = sorted(
+    {model._meta.get_field(field).upload_to.rstrip("/") for model, field in REFERENCE_FIELDS} | {RENDITION_DIR}
+)
+
+
+def iter_storage_files(storage, prefix):
+    """
+    Yield ``(name, modified_timestamp, size)`` for every file under ``prefix``.
+
+    Local storage is walked with ``os.scandir`` so the listing streams instead
+    of being materialised; other backends fall back to ``listdir``.
+    """
+    if isinstance(storage, FileSystemStorage):
+        root = storage.path(prefix) if prefix else storage.location
+        stack = [root]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        name = os.path.relpath(entry.path, storage.location).replace(os.sep, "/")
+                        yield name, stat.st_mtime, stat.st_size
+        return
+
+    directories = [prefix]
+    while directories:
+        directory = directories.pop()
+        subdirs, files = storage.listdir(directory)
+        directories.extend(f"{directory}/{subdir}".lstrip("/") for subdir in subdirs)
+        for filename in files:
+            name = f"{directory}/{filename}".lstrip("/")
+            yield name, storage.get_modified_time(name).timestamp(), storage.size(name)
+
+
+def referenced_renditions(names) -> set:
+    """
+    Return which of the rendition ``names`` an ``ItemImage.renditions`` value
+    lists. The JSON cannot be searched by name, so the rows are found by the
+    source image stem each name starts with (one query) and their listed
+    names compared. Names that do not parse count as referenced.
+    """
+    stems = {}
+    referenced = set()
+    for name in names:
+        match = RENDITION_NAME_RE.match(name)
+        if match:
+            stems.setdefault(match["stem"], []).append(name)
+        else:
+            referenced.add(name)
+    if not stems:
+        return referenced
+
+    pattern = r"(^|/)(%s)(\.[^/.]*)?$" % "|".join(re.escape(stem) for stem in stems)
+    listed = set()
+    for renditions in ItemImage.objects.filter(image__regex=pattern).values_list("renditions", flat=True):
+        for format_names in (renditions or {}).get("formats", {}).values():
+            listed.update(format_names.values())
+    referenced.update(name for group in stems.values() for name in group if name in listed)
+    return referenced
+
+
+def referenced_names(names) -> set:
+    """Return which of ``names`` are referenced by a model row (one query per field, plus renditions)."""
+    renditions = [name for name in names if name.startswith(f"{RENDITION_DIR}/")]
+    referenced = referenced_renditions(renditions) if renditions else set()
+    for model, field in REFERENCE_FIELDS:
+        referenced.update(model.objects.filter(**{f"{field}__in": names}).values_list(field, flat=True))
+    return referenced
+
+
+class Command(BaseCommand):
+    help = (
+        "Find media files that no database row references (left behind by deleted items or failed uploads) "
+        "and report or delete those older than a grace period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delete", action="store_true", help="Delete orphans instead of only reporting them.")
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Ignore files modified more recently than this, so in-flight uploads are never touched.",
+        )
+        parser.add_argument(
+            "--prefix",
+            action="append",
+            dest="prefixes",
+            help=f"Storage directory to scan; repeat for several (default: {', '.join(DEFAULT_PREFIXES)}).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Files checked per database query.")
+        parser.add_argument("--verbose-list", action="store_true", help="Print every orphan found.")
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        cutoff = (timezone.now() - timedelta(hours=options["grace_hours"])).timestamp()
+        started = time.monotonic()
+
+        scanned = orphans = orphan_bytes = deleted = 0
+        # Only files older than the grace period are candidates; newer ones may
+        # belong to an upload whose row has not been committed yet.
+        candidates = (
+            (name, size)
+            for prefix in options["prefixes"] or DEFAULT_PREFIXES
+            for name, mtime, size in iter_storage_files(storage, prefix)
+            if mtime < cutoff
+        )
+        while True:
+            chunk = dict(islice(candidates, options["chunk_size"]))
+            if not chunk:
+                break
+            scanned += len(chunk)
+            unreferenced = chunk.keys() - referenced_names(list(chunk))
+            if not unreferenced:
+                continue
+
+            if options["delete"]:
+                # Re-check just before deleting in case a row was created meanwhile.
+                unreferenced -= referenced_names(list(unreferenced))
+            for name in sorted(unreferenced):
+                orphans += 1
+                orphan_bytes += chunk[name]
+                if options["verbose_list"]:
+                    self.stdout.write(f"  orphan: {name} ({chunk[name]} bytes)")
+                if options["delete"]:
+                    try:
+                        storage.delete(name)
+                        deleted += 1
+                    except Exception as e:
+                        self.stderr.write(f"Could not delete {name}: {e}")
+
+        elapsed = time.monotonic() - started
+        summary = (
+            f"Scanned {scanned} file(s) older than {options['grace_hours']}h in {elapsed:.1f}s; "
+            f"{orphans} orphan(s) totalling {orphan_bytes / 1_000_000:.1f} MB"
+        )
+        if options["delete"]:
+            # Abandoned chunked uploads never reach media storage; drop them with the orphans.
+            purged = purge_stale_uploads(options["grace_hours"] * 3600)
+            summary += f"; deleted {deleted} and {purged} abandoned staged upload(s)."
+        else:
+            summary += ". Re-run with --delete to remove them."
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from inventory.matching import index_report, match_report
+from inventory.models import LostReport
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-run matching for every open lost report. New items and reports are matched as they are saved; "
+        "run this periodically (e.g. nightly from cron) to pick up item photos added since, and after "
+        "changing the matching rules with --reindex."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reindex", action="store_true", help="Rebuild each report's index terms first.")
+
+    def handle(self, *args, **options):
+        reports = matches = 0
+        for report in LostReport.objects.filter(status=LostReport.Status.OPEN).iterator(chunk_size=500):
+            if options["reindex"]:
+                index_report(report)
+            matches += match_report(report)
+            reports += 1
+        self.stdout.write(self.style.SUCCESS(f"Matched {reports} open report(s); {matches} new match(es) queued."))
@@ -0,0 +1,58 @@
+import os
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventory.ingest import normalize_image
+from inventory.models import ItemImage
+from inventory.renditions import generate_renditions
+
+
+class Command(BaseCommand):
+    help = (
+        "Normalise item images stored before the ingest stage existed: apply EXIF orientation, "
+        "strip metadata and embedded previews, and convert to sRGB. Renditions and the similarity "
+        "index are refreshed for every file that changes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many images would be processed.")
+
+    def handle(self, *args, **options):
+        images = ItemImage.objects.filter(normalized_at__isnull=True).exclude(image="")
+        if options["dry_run"]:
+            self.stdout.write(f"{images.count()} image(s) would be normalised.")
+            return
+
+        rewritten = unchanged = failed = 0
+        for item_image in images.iterator(chunk_size=200):
+            old_name = item_image.image.name
+            try:
+                with item_image.image.open("rb") as fh:
+                    normalized = normalize_image(fh)
+            except Exception as e:
+                self.stderr.write(f"Skipping image {item_image.pk} ({old_name}): {e}")
+                failed += 1
+                continue
+
+            item_image.normalized_at = timezone.now()
+            if normalized is None:
+                ItemImage.objects.filter(pk=item_image.pk).update(normalized_at=item_image.normalized_at)
+                unchanged += 1
+                continue
+
+            data, extension = normalized
+            new_name = f"{os.path.splitext(os.path.basename(old_name))[0]}.{extension}"
+            storage = item_image.image.storage
+            item_image.image.save(new_name, ContentFile(data), save=False)
+            # save() runs the post_save handler that re-indexes the image; the
+            # renditions are encoded here rather than on the upload worker.
+            item_image.save()
+            generate_renditions(item_image)
+            storage.delete(old_name)
+            rewritten += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Normalised {rewritten} image(s); {unchanged} needed no changes; {failed} could not be read."
+        ))
@@ -0,0 +1,148 @@
+import json
+import mimetypes
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from inventory.models import AnalysisSuggestion, Item
+from inventory.services import RateLimiter, analyze_items_batch
+from inventory.vision_providers import get_vision_provider
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-run vision analysis on stored images for items with missing or poor AI metadata "
+        "and store the results as suggestions for staff review."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=50, help="Items fetched and checkpointed per batch.")
+        parser.add_argument("--workers", type=int, default=4, help="Concurrent analysis calls.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5,
+            help="Items packed into one vision request (1 disables batching).",
+        )
+        parser.add_argument("--rate", type=float, default=1.0, help="Maximum analysis calls started per second.")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many items.")
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-analyse every item with images, not just ones with fallback metadata.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=str(Path(settings.BASE_DIR) / "var" / "reanalyze_items.json"),
+            help="File recording the last completed item so an interrupted run can resume.",
+        )
+        parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint.")
+
+    def handle(self, *args, **options):
+        provider = get_vision_provider()
+        if not provider.is_configured():
+            raise CommandError(f"Vision provider {provider.name!r} is not configured; nothing can be analysed.")
+
+        checkpoint_path = Path(options["checkpoint"])
+        last_pk = 0 if options["restart"] else self._load_checkpoint(checkpoint_path)
+        if last_pk:
+            self.stdout.write(f"Resuming after item {last_pk}.")
+
+        queryset = Item.objects.filter(images__isnull=False)
+        if not options["all"]:
+            queryset = queryset.filter(Q(category=Item.Category.OTHER_MISC) | Q(description=""))
+        queryset = queryset.exclude(
+            analysis_suggestions__status=AnalysisSuggestion.Status.PENDING,
+        ).distinct().order_by("pk")
+
+        limiter = RateLimiter(options["rate"])
+        limit = options["limit"]
+        processed = suggested = errors = 0
+        exhausted = False
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as executor:
+            while limit is None or processed < limit:
+                chunk_size = options["chunk_size"]
+                if limit is not None:
+                    chunk_size = min(chunk_size, limit - processed)
+                chunk = list(queryset.filter(pk__gt=last_pk).prefetch_related("images")[:chunk_size])
+                if not chunk:
+                    exhausted = True
+                    break
+
+                batch_size = max(1, options["batch_size"])
+                batches = [chunk[i:i + batch_size] for i in range(0, len(chunk), batch_size)]
+                results = {}
+                for batch_results in executor.map(lambda batch: self._analyze(batch, limiter), batches):
+                    results.update(batch_results)
+
+                suggestions = []
+                for item in chunk:
+                    result = results.get(item.pk)
+                    if result:
+                        suggestions.append(AnalysisSuggestion(
+                            item=item,
+                            title=result.get("title", ""),
+                            description=result.get("description", ""),
+                            category=result.get("category", ""),
+                        ))
+                    else:
+                        errors += 1
+                AnalysisSuggestion.objects.bulk_create(suggestions)
+
+                processed += len(chunk)
+                suggested += len(suggestions)
+                last_pk = chunk[-1].pk
+                self._save_checkpoint(checkpoint_path, last_pk)
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"{processed} item(s) processed, {suggested} suggestion(s), {errors} error(s), "
+                    f"{processed / elapsed if elapsed else 0:.2f} items/s"
+                )
+
+        if exhausted:
+            # A run stopped by --limit keeps its checkpoint for the next one
+            checkpoint_path.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {processed} item(s) processed, {suggested} suggestion(s) awaiting review, {errors} error(s)."
+        ))
+
+    def _analyze(self, items, limiter):
+        """Analyse a batch of items' stored images; failed items map to {}."""
+        files_by_item = {}
+        try:
+            for item in items:
+                files = files_by_item[item.pk] = []
+                for item_image in item.images.all():
+                    try:
+                        fh = item_image.image.storage.open(item_image.image.name, "rb")
+                    except Exception:
+                        continue
+                    fh.content_type = mimetypes.guess_type(item_image.image.name)[0] or "image/jpeg"
+                    files.append(fh)
+            readable = {pk: files for pk, files in files_by_item.items() if files}
+            if not readable:
+                return {}
+            return analyze_items_batch(readable, throttle=limiter.acquire)
+        finally:
+            for files in files_by_item.values():
+                for fh in files:
+                    fh.close()
+
+    def _load_checkpoint(self, path):
+        try:
+            return int(json.loads(path.read_text())["last_pk"])
+        except (FileNotFoundError, KeyError, ValueError):
+            return 0
+
+    def _save_checkpoint(self, path, last_pk):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"last_pk": last_pk}))
+        tmp_path.replace(path)
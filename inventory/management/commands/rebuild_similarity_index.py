@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from inventory.models import ItemImage
+from inventory.similarity import get_similarity_index, index_item_image
+
+
+class Command(BaseCommand):
+    help = "Compute feature vectors for stored item images and add them to the similarity index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing-only",
+            action="store_true",
+            help="Only index images that are not in the index yet.",
+        )
+
+    def handle(self, *args, **options):
+        index = get_similarity_index()
+        indexed_ids = index.indexed_ids()
+
+        images = ItemImage.objects.only("pk", "image")
+        if options["missing_only"]:
+            images = images.exclude(pk__in=indexed_ids)
+
+        indexed = failed = 0
+        for item_image in images.iterator(chunk_size=500):
+            if index_item_image(item_image):
+                indexed += 1
+            else:
+                failed += 1
+
+        # Drop rows for images deleted while the signal handlers weren't running.
+        live_ids = set(ItemImage.objects.values_list("pk", flat=True))
+        stale = indexed_ids - live_ids
+        for image_id in stale:
+            index.remove(image_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} image(s); {failed} could not be read; removed {len(stale)} stale row(s)."
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from inventory.facets import reconcile_facet_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the browse page's per-category and per-location item counts. "
+        "Run periodically (e.g. hourly from cron) so claimed items drop out of the counts once their "
+        "visibility window passes."
+    )
+
+    def handle(self, *args, **options):
+        corrected = reconcile_facet_counts()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled facet counts; {corrected} row(s) corrected."))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from inventory.vision_stub import make_stub_server
+
+
+class Command(BaseCommand):
+    help = "Serve a local Gemini-compatible vision stub for offline load tests and CI."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency", type=float, default=0.5, help="Mean response delay in seconds.")
+        parser.add_argument("--jitter", type=float, default=0.2, help="Uniform +/- variation of the delay.")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail.")
+        parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected failures.")
+        parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible latency and errors.")
+        parser.add_argument(
+            "--chunk-delay", type=float, default=0.05, help="Delay between streamed chunks in seconds."
+        )
+
+    def handle(self, *args, **options):
+        server = make_stub_server(
+            host=options["host"],
+            port=options["port"],
+            latency=options["latency"],
+            jitter=options["jitter"],
+            error_rate=options["error_rate"],
+            error_status=options["error_status"],
+            seed=options["seed"],
+            chunk_delay=options["chunk_delay"],
+        )
+        host, port = server.server_address[:2]
+        self.stdout.write(self.style.SUCCESS(
+            f"Vision stub listening on http://{host}:{port}/v1beta "
+            f"(set GEMINI_BASE_URL to this and any GOOGLE_API_KEY). Ctrl-C to stop."
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            config = server.RequestHandlerClass.config
+            self.stdout.write(f"Served {config.requests} request(s), injected {config.errors} error(s).")
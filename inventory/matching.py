@@ -0,0 +1,249 @@
+"""
+Matching lost-item reports against found items.
+
+A report and an item are scored on four signals: how well their words
+agree (exact, synonym or near-miss spelling, see ``search``), whether the
+categories agree, whether the item was found during or soon after the days
+the report gives, and how much the locations overlap. A report with a
+photo also scores items whose photos look like it. Pairs scoring at least
+``MATCH_THRESHOLD`` are queued as ``ReportMatch`` rows for staff.
+
+Matching is incremental. A new or edited item is compared only with the
+open reports that share a word with it, found through the ``ReportTerm``
+inverted index, and whose date range is close to when it was found. A new
+report is compared only with the found items the search index returns for
+its description. The ``match_lost_reports`` command re-runs every open
+report, which picks up item photos added after the report was matched.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Item, LostReport, ReportMatch, ReportTerm
+from .search import SIMILARITY_THRESHOLD, get_synonyms, search_items, tokenize, trigrams
+
+logger = logging.getLogger(__name__)
+
+TEXT_WEIGHT = 0.45
+CATEGORY_WEIGHT = 0.25
+DATE_WEIGHT = 0.15
+LOCATION_WEIGHT = 0.15
+MATCH_THRESHOLD = 0.5
+# Items found this many days after a report's range still count, at a decaying score
+DATE_GRACE_DAYS = 14
+# Photo similarity below this says nothing; see photo_scores
+PHOTO_SIMILARITY_FLOOR = 0.75
+# Candidates scored per new item or report, best index hits first
+MAX_CANDIDATES = 200
+# Words too common in reports to say anything about the item
+STOPWORDS = frozenset(
+    "the and with for was has had have her his its our their this that from into near left lost "
+    "found got some very one two any item thing".split()
+)
+
+
+def report_terms(text: str) -> set:
+    """Indexable words of ``text``: at least three letters and not a stopword."""
+    return {word for word in tokenize(text) if len(word) >= 3 and word not in STOPWORDS}
+
+
+def word_similarity(a: str, b: str, synonyms: dict) -> float:
+    if a == b:
+        return 1.0
+    synonym_weight = synonyms.get(a, {}).get(b, 0.0)
+    a_trigrams, b_trigrams = trigrams(a), trigrams(b)
+    similarity = len(a_trigrams & b_trigrams) / len(a_trigrams | b_trigrams)
+    return max(synonym_weight, similarity if similarity >= SIMILARITY_THRESHOLD else 0.0)
+
+
+def text_score(report_words: set, item_words: set, synonyms: dict) -> float:
+    """Average over the report's words of the best agreeing word in the item."""
+    if not report_words or not item_words:
+        return 0.0
+    return sum(
+        max(word_similarity(word, item_word, synonyms) for item_word in item_words) for word in report_words
+    ) / len(report_words)
+
+
+def category_score(report, item) -> float:
+    if report.category == item.category:
+        return 1.0
+    # "Other" on either side is a guess, not a disagreement.
+    if Item.Category.OTHER_MISC in (report.category, item.category):
+        return 0.3
+    return 0.0
+
+
+def date_score(report, item) -> float:
+    if item.date_found < report.lost_from - timedelta(days=1):
+        return 0.0
+    days_after = (item.date_found - report.lost_to).days
+    if days_after <= 1:
+        return 1.0
+    return max(0.0, 1 - days_after / DATE_GRACE_DAYS)
+
+
+def location_score(report, item) -> float:
+    report_words, item_words = report_terms(report.location), report_terms(item.location_found)
+    if not report_words or not item_words:
+        # Unknown on either side: neither for nor against.
+        return 0.5
+    return len(report_words & item_words) / len(report_words | item_words)
+
+
+def score_match(report, item, synonyms=None, photo_score=0.0) -> float:
+    if synonyms is None:
+        synonyms = get_synonyms()
+    text = text_score(
+        report_terms(report.description),
+        report_terms(f"{item.title} {item.description}"),
+        synonyms,
+    )
+    return (
+        TEXT_WEIGHT * max(text, photo_score)
+        + CATEGORY_WEIGHT * category_score(report, item)
+        + DATE_WEIGHT * date_score(report, item)
+        + LOCATION_WEIGHT * location_score(report, item)
+    )
+
+
+def index_report(report) -> None:
+    """Replace the report's ``ReportTerm`` rows; closed reports are dropped from the index."""
+    ReportTerm.objects.filter(report=report).delete()
+    if report.status != LostReport.Status.OPEN:
+        return
+    terms = report_terms(f"{report.description} {report.location}")
+    ReportTerm.objects.bulk_create([ReportTerm(report=report, term=term[:64]) for term in terms])
+
+
+def _record(scored) -> int:
+    """
+    Queue ``(report, item, score)`` triples that reach the threshold and drop
+    pending matches that an edit pushed below it. Returns how many are new.
+    """
+    created = 0
+    with transaction.atomic():
+        for report, item, score in scored:
+            if score < MATCH_THRESHOLD:
+                ReportMatch.objects.filter(report=report, item=item, status=ReportMatch.Status.PENDING).delete()
+                continue
+            match, was_created = ReportMatch.objects.get_or_create(report=report, item=item, defaults={"score": score})
+            if was_created:
+                created += 1
+            elif match.status == ReportMatch.Status.PENDING and match.score != score:
+                ReportMatch.objects.filter(pk=match.pk).update(score=score, updated_at=timezone.now())
+    return created
+
+
+def candidate_reports(item):
+    """Open reports sharing a word with ``item`` whose date range fits when it was found."""
+    terms = report_terms(f"{item.title} {item.description}")
+    synonyms = get_synonyms()
+    for term in list(terms):
+        terms.update(synonyms.get(term, {}))
+    if not terms:
+        return LostReport.objects.none()
+    report_ids = (
+        ReportTerm.objects.filter(
+            term__in=terms,
+            report__status=LostReport.Status.OPEN,
+            report__lost_from__lte=item.date_found + timedelta(days=1),
+            report__lost_to__gte=item.date_found - timedelta(days=DATE_GRACE_DAYS),
+        )
+        .values("report")
+        .annotate(shared=Count("pk"))
+        .order_by("-shared")
+        .values_list("report", flat=True)[:MAX_CANDIDATES]
+    )
+    return LostReport.objects.filter(pk__in=list(report_ids))
+
+
+def match_item(item) -> int:
+    """Compare a new or edited item with the open reports that could describe it."""
+    if item.status != Item.Status.FOUND:
+        # Claimed: nothing left for staff to match.
+        ReportMatch.objects.filter(item=item, status=ReportMatch.Status.PENDING).delete()
+        return 0
+    synonyms = get_synonyms()
+    scored = []
+    for report in candidate_reports(item):
+        score = score_match(report, item, synonyms)
+        # Without the photo comparison (see match_report) a low score does
+        # not overrule a match the report's photo found.
+        if score >= MATCH_THRESHOLD or not report.photo:
+            scored.append((report, item, score))
+    return _record(scored)
+
+
+def candidate_items(report, photos=None):
+    """Found items the search index ties to the report's description or photo, within its dates."""
+    items = Item.objects.filter(
+        status=Item.Status.FOUND,
+        date_found__gte=report.lost_from - timedelta(days=1),
+        date_found__lte=report.lost_to + timedelta(days=DATE_GRACE_DAYS),
+    )
+    ids = list(search_items(items, report.description).values_list("pk", flat=True)[:MAX_CANDIDATES])
+    ids += [pk for pk in photos or {} if pk not in ids]
+    return items.filter(pk__in=ids)
+
+
+def photo_scores(report) -> dict:
+    """``{item pk: score}`` in (0, 1] for items whose photos look like the report's photo."""
+    if not report.photo:
+        return {}
+    from .models import ItemImage
+    from .similarity import compute_image_features, get_similarity_index
+
+    try:
+        with report.photo.open("rb") as fh:
+            vector = compute_image_features(fh)
+    except Exception:
+        logger.warning("Could not open report photo %s", report.photo.name)
+        return {}
+    if vector is None:
+        return {}
+    matches = get_similarity_index().query(vector, limit=MAX_CANDIDATES)
+    image_to_item = dict(ItemImage.objects.filter(pk__in=[pk for pk, _ in matches]).values_list("pk", "item_id"))
+    scores = {}
+    for image_id, similarity in matches:
+        item_id = image_to_item.get(image_id)
+        # Colour/texture descriptors of unrelated photos still score well
+        # above zero; only the part above the floor counts as agreement.
+        score = (similarity - PHOTO_SIMILARITY_FLOOR) / (1 - PHOTO_SIMILARITY_FLOOR)
+        if item_id is not None and score > 0:
+            scores[item_id] = max(scores.get(item_id, 0.0), score)
+    return scores
+
+
+def match_report(report) -> int:
+    """Compare a new, edited or re-run report with the found items that could be it."""
+    if report.status != LostReport.Status.OPEN:
+        return 0
+    synonyms = get_synonyms()
+    photos = photo_scores(report)
+    created = _record(
+        (report, item, score_match(report, item, synonyms, photos.get(item.pk, 0.0)))
+        for item in candidate_items(report, photos)
+    )
+    LostReport.objects.filter(pk=report.pk).update(matched_at=timezone.now())
+    return created
+
+
+def resolve_match(match, confirmed: bool) -> None:
+    """
+    Record a staff decision. Confirming closes the report as matched and
+    drops its other pending matches from the queue.
+    """
+    with transaction.atomic():
+        match.status = ReportMatch.Status.CONFIRMED if confirmed else ReportMatch.Status.DISMISSED
+        match.save(update_fields=["status", "updated_at"])
+        if confirmed:
+            report = match.report
+            report.status = LostReport.Status.MATCHED
+            report.save(update_fields=["status"])
+            report.matches.filter(status=ReportMatch.Status.PENDING).update(
+                status=ReportMatch.Status.DISMISSED, updated_at=timezone.now()
+            )
@@ -0,0 +1,172 @@
+"""
+Serving uploaded item photos.
+
+Photos are only public while their item is, and photos attached to lost
+reports are never public; staff can see all of them.
+``serve_media`` checks that and then lets the front-end server send the
+file, chosen by ``MEDIA_SENDFILE``: nginx through ``X-Accel-Redirect`` or
+Apache/lighttpd through ``X-Sendfile``. Without a front-end server the
+file is streamed from here through ``FileResponse``, which gunicorn sends
+with ``sendfile()``. That path answers ``If-None-Match`` and single byte
+``Range`` requests itself.
+
+Rendition names include a digest of their bytes (``renditions.rendition_name``),
+so they are cached for a year as immutable. Original uploads keep the
+uploader's file name, which can be reused after a delete; browsers revalidate
+those after ``MEDIA_CACHE_SECONDS``.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import ItemImage, LostReport
+from .renditions import DIGEST_LENGTH, RENDITION_DIR
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# <stem>[_<digest>]_<width>w[_<suffix storage added on a name clash>].<ext>
+RENDITION_NAME_RE = re.compile(
+    rf"^{RENDITION_DIR}/(?P<stem>.+?)(?:_(?P<digest>[0-9a-f]{{{DIGEST_LENGTH}}}))?_\d+w(?:_[A-Za-z0-9]{{7}})?\.\w+$"
+)
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def is_content_addressed(name: str) -> bool:
+    match = RENDITION_NAME_RE.match(name)
+    return bool(match and match["digest"])
+
+
+def find_item_image(name: str):
+    """The ``ItemImage`` whose original or renditions include the stored file ``name``, if any."""
+    images = ItemImage.objects.select_related("item")
+    match = RENDITION_NAME_RE.match(name)
+    if not match:
+        return images.filter(image=name).first()
+    upload_to = ItemImage._meta.get_field("image").upload_to
+    for item_image in images.filter(image__startswith=f"{upload_to}{match['stem']}."):
+        for names in item_image.renditions.get("formats", {}).values():
+            if name in names.values():
+                return item_image
+    return None
+
+
+def parse_range(header: str, size: int):
+    """
+    Return ``(start, end)`` (inclusive) for a single-range ``Range`` header,
+    ``None`` to send the whole file (no header, or one we do not handle such
+    as multiple ranges), or ``False`` if the range lies beyond the file.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class ByteRange:
+    """
+    File wrapper that reads at most ``length`` bytes from the file's current
+    position. It keeps ``fileno()`` so gunicorn can still ``sendfile()`` it;
+    the response's Content-Length bounds that transfer.
+    """
+
+    def __init__(self, file, length: int):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def _cache_headers(response, name: str, public: bool) -> None:
+    if not public:
+        patch_cache_control(response, private=True, no_cache=True)
+    elif is_content_addressed(name):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.MEDIA_CACHE_SECONDS)
+
+
+def _stream(request, path: str, size: int, content_type: str, etag: str):
+    byte_range = None
+    if_range = request.headers.get("If-Range")
+    if not if_range or if_range == etag:
+        byte_range = parse_range(request.headers.get("Range", ""), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    file = open(path, "rb")
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(ByteRange(file, end - start + 1), content_type=content_type, status=206)
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def serve_media(request, name: str):
+    """Respond with the stored media file ``name`` if the user may see it."""
+    item_image = find_item_image(name)
+    if item_image is not None:
+        public, storage = item_image.item.is_visible(), item_image.image.storage
+    elif LostReport.objects.filter(photo=name).exists():
+        # Photos attached to lost reports are for staff matching only.
+        public, storage = False, LostReport._meta.get_field("photo").storage
+    else:
+        raise Http404("No such media file")
+    if not public and not request.user.is_staff:
+        raise Http404("No such media file")
+
+    path = storage.path(name)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404("No such media file")
+    match = RENDITION_NAME_RE.match(name)
+    digest = match["digest"] if match else None
+    etag = f'"{digest}"' if digest else f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if settings.MEDIA_SENDFILE == "nginx":
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(name)
+        elif settings.MEDIA_SENDFILE == "sendfile":
+            response = HttpResponse(content_type=content_type)
+            response["X-Sendfile"] = path
+        else:
+            response = _stream(request, path, stat.st_size, content_type, etag)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    _cache_headers(response, name, public)
+    return response
@@ -0,0 +1,85 @@
+"""
+In-process latency metrics and counters.
+
+Every observation is logged to the ``inventory.metrics`` logger as
+``<name> <milliseconds>ms`` (counters as ``<name> +<n>``) so a log pipeline
+can aggregate across worker processes; each process also keeps its most
+recent ``SAMPLE_SIZE`` observations per name for a quick local summary
+(tests, benchmarks, the shell).
+"""
+import logging
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_SIZE = 500
+
+
+class LatencyRecorder:
+    def __init__(self, sample_size=SAMPLE_SIZE):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=sample_size))
+        self._counts = defaultdict(int)
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[name].append(seconds)
+            self._counts[name] += 1
+        logger.info("%s %.1fms", name, seconds * 1000)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Record how long the ``with`` block took, including when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def summary(self) -> dict:
+        """``{name: {"count", "p50_ms", "p95_ms"}}`` over the recent samples."""
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            name: {
+                "count": counts[name],
+                "p50_ms": statistics.median(values) * 1000,
+                "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+            }
+            for name, values in samples.items()
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+class CounterSet:
+    """Per-process event counters, logged like latencies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+        logger.info("%s +%d", name, amount)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+latency = LatencyRecorder()
+counters = CounterSet()
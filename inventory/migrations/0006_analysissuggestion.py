@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_claim'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('category', models.CharField(blank=True, choices=[('ELECTRONICS', 'Electronics'), ('BAGS_AND_CARRY', 'Bags and Carry'), ('SPORTS_AND_CLOTHING', 'Sports and clothing'), ('BOTTLES_AND_CONTAINERS', 'Bottles and containers'), ('DOCUMENTS_AND_IDS', "Documents and Id's"), ('NOTEBOOKS_AND_BOOKS', 'Notebooks/books'), ('OTHER_MISC', 'Other/Misc')], max_length=40)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending review'), ('APPLIED', 'Applied'), ('DISMISSED', 'Dismissed')], db_index=True, default='PENDING', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_suggestions', to='inventory.item')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['item', 'status'], name='inventory_a_item_id_2b4e91_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_analysissuggestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('location_found', models.CharField(blank=True, max_length=255)),
+                ('date_found', models.DateField()),
+                ('status', models.CharField(choices=[('FOUND', 'Found'), ('CLAIMED', 'Claimed')], max_length=20)),
+                ('category', models.CharField(choices=[('ELECTRONICS', 'Electronics'), ('BAGS_AND_CARRY', 'Bags and Carry'), ('SPORTS_AND_CLOTHING', 'Sports and clothing'), ('BOTTLES_AND_CONTAINERS', 'Bottles and containers'), ('DOCUMENTS_AND_IDS', "Documents and Id's"), ('NOTEBOOKS_AND_BOOKS', 'Notebooks/books'), ('OTHER_MISC', 'Other/Misc')], max_length=40)),
+                ('created_by_username', models.CharField(blank=True, max_length=150)),
+                ('claimed_by_name', models.CharField(blank=True, max_length=255)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('media', models.JSONField(blank=True, default=list, help_text='Image paths in cold storage')),
+            ],
+            options={
+                'ordering': ['-archived_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedClaim',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('claimant_name', models.CharField(max_length=255)),
+                ('claimed_at', models.DateTimeField()),
+                ('archived_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='claims', to='inventory.archiveditem')),
+            ],
+            options={
+                'ordering': ['-claimed_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_archiveditem_archivedclaim'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='itemimage',
+            name='placeholder',
+            field=models.TextField(blank=True, help_text='Blurred low-quality preview as a data URI.'),
+        ),
+        migrations.AddField(
+            model_name='itemimage',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='itemimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
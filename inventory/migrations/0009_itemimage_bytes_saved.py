@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_itemimage_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemimage',
+            name='bytes_saved',
+            field=models.PositiveIntegerField(default=0, help_text='Bytes saved across renditions by the best modern format (WebP/AVIF) compared with JPEG.'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_itemimage_bytes_saved'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itemimage',
+            name='normalized_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:01
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+
+# Frozen copy of inventory.models.CLAIM_VISIBILITY_DAYS as it was when this
+# migration was written
+CLAIM_VISIBILITY_DAYS = {
+    "ELECTRONICS": 7,
+    "SPORTS_AND_CLOTHING": 3,
+    "BAGS_AND_CARRY": 1,
+    "BOTTLES_AND_CONTAINERS": 1,
+    "OTHER_MISC": 1,
+    "DOCUMENTS_AND_IDS": 1,
+    "NOTEBOOKS_AND_BOOKS": 1,
+}
+
+
+def seed_facet_counts(apps, schema_editor):
+    """Count the visible items once, so the signal handlers only have to keep the rows up to date."""
+    Item = apps.get_model("inventory", "Item")
+    FacetCount = apps.get_model("inventory", "FacetCount")
+
+    now = timezone.now()
+    visible_q = Q(status="FOUND")
+    for category, _ in Item._meta.get_field("category").choices:
+        cutoff = now - timedelta(days=CLAIM_VISIBILITY_DAYS.get(category, 1))
+        visible_q |= Q(status="CLAIMED", category=category, claimed_at__isnull=False, claimed_at__gte=cutoff)
+
+    counts = Counter()
+    for category, location in Item.objects.filter(visible_q).values_list("category", "location_found").iterator():
+        counts[("category", category)] += 1
+        location = (location or "").strip()
+        if location:
+            counts[("location", location)] += 1
+    FacetCount.objects.bulk_create(
+        [FacetCount(facet=facet, value=value, count=n) for (facet, value), n in counts.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_itemimage_normalized_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('category', 'Category'), ('location', 'Location')], max_length=20)),
+                ('value', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['facet', '-count', 'value'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='facetcount',
+            constraint=models.UniqueConstraint(fields=('facet', 'value'), name='unique_facet_value'),
+        ),
+        migrations.RunPython(seed_facet_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,216 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:08
+
+from django.db import migrations, models
+
+# (term, synonym, weight) rows as inventory.search.synonym_seed() produced
+# them when this migration was written: each normalize_category keyword
+# paired with the others in its category at 0.5, plus the curated common
+# pairs, both ways, at 0.8.
+SYNONYMS = [
+    ('airpods', 'earbuds', 0.8),
+    ('airpods', 'earphones', 0.8),
+    ('backpack', 'bag', 0.5),
+    ('backpack', 'carry', 0.5),
+    ('backpack', 'luggage', 0.5),
+    ('bag', 'backpack', 0.5),
+    ('bag', 'carry', 0.5),
+    ('bag', 'luggage', 0.5),
+    ('bag', 'rucksack', 0.8),
+    ('book', 'diary', 0.5),
+    ('book', 'notebook', 0.5),
+    ('bottle', 'container', 0.5),
+    ('bottle', 'flask', 0.5),
+    ('bottle', 'tumbler', 0.8),
+    ('bottle', 'tupperware', 0.5),
+    ('cable', 'charger', 0.8),
+    ('card', 'document', 0.5),
+    ('card', 'id', 0.5),
+    ('card', 'license', 0.5),
+    ('card', 'passport', 0.5),
+    ('carry', 'backpack', 0.5),
+    ('carry', 'bag', 0.5),
+    ('carry', 'luggage', 0.5),
+    ('charger', 'cable', 0.8),
+    ('charger', 'electronic', 0.5),
+    ('charger', 'laptop', 0.5),
+    ('charger', 'phone', 0.5),
+    ('charger', 'tablet', 0.5),
+    ('chromebook', 'laptop', 0.8),
+    ('cloth', 'jacket', 0.5),
+    ('cloth', 'pants', 0.5),
+    ('cloth', 'shirt', 0.5),
+    ('cloth', 'shoe', 0.5),
+    ('cloth', 'sport', 0.5),
+    ('cloth', 'wearable', 0.5),
+    ('coat', 'jacket', 0.8),
+    ('container', 'bottle', 0.5),
+    ('container', 'flask', 0.5),
+    ('container', 'tupperware', 0.5),
+    ('diary', 'book', 0.5),
+    ('diary', 'notebook', 0.5),
+    ('document', 'card', 0.5),
+    ('document', 'id', 0.5),
+    ('document', 'license', 0.5),
+    ('document', 'passport', 0.5),
+    ('earbuds', 'airpods', 0.8),
+    ('earbuds', 'earphones', 0.8),
+    ('earphones', 'airpods', 0.8),
+    ('earphones', 'earbuds', 0.8),
+    ('earphones', 'headphones', 0.8),
+    ('electronic', 'charger', 0.5),
+    ('electronic', 'laptop', 0.5),
+    ('electronic', 'phone', 0.5),
+    ('electronic', 'tablet', 0.5),
+    ('flask', 'bottle', 0.5),
+    ('flask', 'container', 0.5),
+    ('flask', 'tupperware', 0.5),
+    ('glasses', 'spectacles', 0.8),
+    ('headphones', 'earphones', 0.8),
+    ('headphones', 'headset', 0.8),
+    ('headset', 'headphones', 0.8),
+    ('hoodie', 'jacket', 0.8),
+    ('hoodie', 'sweater', 0.8),
+    ('id', 'card', 0.5),
+    ('id', 'document', 0.5),
+    ('id', 'license', 0.5),
+    ('id', 'passport', 0.5),
+    ('ipad', 'tablet', 0.8),
+    ('iphone', 'phone', 0.8),
+    ('jacket', 'cloth', 0.5),
+    ('jacket', 'coat', 0.8),
+    ('jacket', 'hoodie', 0.8),
+    ('jacket', 'pants', 0.5),
+    ('jacket', 'shirt', 0.5),
+    ('jacket', 'shoe', 0.5),
+    ('jacket', 'sport', 0.5),
+    ('jacket', 'wearable', 0.5),
+    ('jumper', 'sweater', 0.8),
+    ('laptop', 'charger', 0.5),
+    ('laptop', 'chromebook', 0.8),
+    ('laptop', 'electronic', 0.5),
+    ('laptop', 'macbook', 0.8),
+    ('laptop', 'phone', 0.5),
+    ('laptop', 'tablet', 0.5),
+    ('license', 'card', 0.5),
+    ('license', 'document', 0.5),
+    ('license', 'id', 0.5),
+    ('license', 'passport', 0.5),
+    ('luggage', 'backpack', 0.5),
+    ('luggage', 'bag', 0.5),
+    ('luggage', 'carry', 0.5),
+    ('macbook', 'laptop', 0.8),
+    ('mobile', 'phone', 0.8),
+    ('notebook', 'book', 0.5),
+    ('notebook', 'diary', 0.5),
+    ('pants', 'cloth', 0.5),
+    ('pants', 'jacket', 0.5),
+    ('pants', 'shirt', 0.5),
+    ('pants', 'shoe', 0.5),
+    ('pants', 'sport', 0.5),
+    ('pants', 'wearable', 0.5),
+    ('passport', 'card', 0.5),
+    ('passport', 'document', 0.5),
+    ('passport', 'id', 0.5),
+    ('passport', 'license', 0.5),
+    ('phone', 'charger', 0.5),
+    ('phone', 'electronic', 0.5),
+    ('phone', 'iphone', 0.8),
+    ('phone', 'laptop', 0.5),
+    ('phone', 'mobile', 0.8),
+    ('phone', 'smartphone', 0.8),
+    ('phone', 'tablet', 0.5),
+    ('purse', 'wallet', 0.8),
+    ('rucksack', 'bag', 0.8),
+    ('shirt', 'cloth', 0.5),
+    ('shirt', 'jacket', 0.5),
+    ('shirt', 'pants', 0.5),
+    ('shirt', 'shoe', 0.5),
+    ('shirt', 'sport', 0.5),
+    ('shirt', 'wearable', 0.5),
+    ('shoe', 'cloth', 0.5),
+    ('shoe', 'jacket', 0.5),
+    ('shoe', 'pants', 0.5),
+    ('shoe', 'shirt', 0.5),
+    ('shoe', 'sport', 0.5),
+    ('shoe', 'wearable', 0.5),
+    ('smartphone', 'phone', 0.8),
+    ('spectacles', 'glasses', 0.8),
+    ('sport', 'cloth', 0.5),
+    ('sport', 'jacket', 0.5),
+    ('sport', 'pants', 0.5),
+    ('sport', 'shirt', 0.5),
+    ('sport', 'shoe', 0.5),
+    ('sport', 'wearable', 0.5),
+    ('sweater', 'hoodie', 0.8),
+    ('sweater', 'jumper', 0.8),
+    ('tablet', 'charger', 0.5),
+    ('tablet', 'electronic', 0.5),
+    ('tablet', 'ipad', 0.8),
+    ('tablet', 'laptop', 0.5),
+    ('tablet', 'phone', 0.5),
+    ('tumbler', 'bottle', 0.8),
+    ('tupperware', 'bottle', 0.5),
+    ('tupperware', 'container', 0.5),
+    ('tupperware', 'flask', 0.5),
+    ('wallet', 'purse', 0.8),
+    ('wearable', 'cloth', 0.5),
+    ('wearable', 'jacket', 0.5),
+    ('wearable', 'pants', 0.5),
+    ('wearable', 'shirt', 0.5),
+    ('wearable', 'shoe', 0.5),
+    ('wearable', 'sport', 0.5),
+]
+
+
+def seed_synonyms(apps, schema_editor):
+    SearchSynonym = apps.get_model("inventory", "SearchSynonym")
+    SearchSynonym.objects.bulk_create(
+        [SearchSynonym(term=term, synonym=synonym, weight=weight) for term, synonym, weight in SYNONYMS],
+        ignore_conflicts=True,
+    )
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Only Postgres has pg_trgm; other databases use the in-memory index.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in ("title", "description"):
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS inventory_item_{column}_trgm ON inventory_item USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in ("title", "description"):
+        schema_editor.execute(f"DROP INDEX IF EXISTS inventory_item_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_facetcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchSynonym',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, max_length=50)),
+                ('synonym', models.CharField(max_length=50)),
+                ('weight', models.FloatField(default=1.0, help_text='How strongly a synonym match counts relative to the term itself.')),
+            ],
+            options={
+                'ordering': ['term', 'synonym'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchsynonym',
+            constraint=models.UniqueConstraint(fields=('term', 'synonym'), name='unique_search_synonym'),
+        ),
+        migrations.RunPython(seed_synonyms, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_searchsynonym'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='itemimage',
+            name='image',
+            field=models.ImageField(db_index=True, upload_to='item_images/'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_itemimage_image_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LostReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.TextField(help_text='What was lost, e.g. brand, colour, stickers.')),
+                ('category', models.CharField(choices=[('ELECTRONICS', 'Electronics'), ('BAGS_AND_CARRY', 'Bags and Carry'), ('SPORTS_AND_CLOTHING', 'Sports and clothing'), ('BOTTLES_AND_CONTAINERS', 'Bottles and containers'), ('DOCUMENTS_AND_IDS', "Documents and Id's"), ('NOTEBOOKS_AND_BOOKS', 'Notebooks/books'), ('OTHER_MISC', 'Other/Misc')], default='OTHER_MISC', max_length=40)),
+                ('lost_from', models.DateField(help_text='Earliest day it could have been lost')),
+                ('lost_to', models.DateField(help_text='Latest day it could have been lost')),
+                ('location', models.CharField(blank=True, help_text='Where it was probably lost', max_length=255)),
+                ('photo', models.ImageField(blank=True, db_index=True, upload_to='lost_reports/')),
+                ('reporter_name', models.CharField(max_length=255)),
+                ('reporter_contact', models.CharField(blank=True, help_text='Email or phone for staff to reach out', max_length=255)),
+                ('status', models.CharField(choices=[('OPEN', 'Open'), ('MATCHED', 'Matched'), ('CLOSED', 'Closed')], default='OPEN', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('matched_at', models.DateTimeField(blank=True, help_text='When the matcher last compared this report', null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='inventory.lostreport')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReportMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending review'), ('CONFIRMED', 'Confirmed'), ('DISMISSED', 'Dismissed')], default='PENDING', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_matches', to='inventory.item')),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='inventory.lostreport')),
+            ],
+            options={
+                'ordering': ['-score'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='lostreport',
+            index=models.Index(fields=['status', 'lost_to'], name='inventory_l_status_5e7b04_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reportterm',
+            constraint=models.UniqueConstraint(fields=('term', 'report'), name='unique_report_term'),
+        ),
+        migrations.AddIndex(
+            model_name='reportmatch',
+            index=models.Index(fields=['status', '-score'], name='inventory_r_status_92c2f4_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reportmatch',
+            constraint=models.UniqueConstraint(fields=('report', 'item'), name='unique_report_match'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_lostreport'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='claim',
+            index=models.Index(fields=['-claimed_at'], name='claim_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['-date_found', '-created_at'], name='item_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('status', 'FOUND')), fields=['-date_found', '-created_at'], name='item_found_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['status', 'claimed_at'], name='item_status_claimed_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-19 10:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_item_claim_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('normalized', models.CharField(max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LocationAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=255, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'location aliases',
+                'ordering': ['alias'],
+            },
+        ),
+        migrations.AddField(
+            model_name='locationalias',
+            name='location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='inventory.location'),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='location',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='items', to='inventory.location'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['location', '-date_found', '-created_at'], name='item_location_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,127 @@
+import re
+from collections import Counter
+from datetime import timedelta
+from difflib import SequenceMatcher
+
+from django.db import migrations
+from django.db.models import Count, Q
+from django.utils import timezone
+
+# Frozen copies of inventory.locations and inventory.models.visible_items_q as
+# they were when this migration was written, so later changes to the live
+# code do not change what it does.
+WORD_RE = re.compile(r"[a-z0-9]+")
+NUMBER_RE = re.compile(r"\d+")
+MIN_ABBREVIATION = 3
+MERGE_SIMILARITY = 0.85
+CLAIM_VISIBILITY_DAYS = {
+    "ELECTRONICS": 7,
+    "SPORTS_AND_CLOTHING": 3,
+    "BAGS_AND_CARRY": 1,
+    "BOTTLES_AND_CONTAINERS": 1,
+    "OTHER_MISC": 1,
+    "DOCUMENTS_AND_IDS": 1,
+    "NOTEBOOKS_AND_BOOKS": 1,
+}
+
+
+def location_key(text):
+    return " ".join(WORD_RE.findall((text or "").lower()))
+
+
+def _display_name(spellings):
+    return min(spellings, key=lambda name: (-spellings[name], name == name.lower(), len(name), name))
+
+
+def _merge_target(key, roots):
+    first_word = key.split()[0]
+    for root in roots:
+        if " " not in root and len(first_word) >= MIN_ABBREVIATION and root.startswith(first_word):
+            return root
+    for root in roots:
+        same_numbers = NUMBER_RE.findall(key) == NUMBER_RE.findall(root)
+        if same_numbers and SequenceMatcher(None, key, root).ratio() >= MERGE_SIMILARITY:
+            return root
+    return None
+
+
+def cluster_locations(counts):
+    """Group ``{spelling: number of items}`` into ``{display name: [spellings]}``."""
+    groups = {}
+    for spelling, count in counts.items():
+        key = location_key(spelling)
+        if key:
+            groups.setdefault(key, Counter())[spelling.strip()] += count
+    ordered = sorted(groups, key=lambda key: (-sum(groups[key].values()), key))
+
+    roots = []
+    members = {}
+    for key in ordered:
+        root = _merge_target(key, roots)
+        if root is None:
+            roots.append(key)
+            members[key] = Counter(groups[key])
+        else:
+            members[root].update(groups[key])
+
+    clusters = {}
+    for root in roots:
+        spellings = Counter({name: n for name, n in members[root].items() if location_key(name) == root})
+        clusters[_display_name(spellings)] = sorted(members[root])
+    return clusters
+
+
+def visible_items_q(categories):
+    now = timezone.now()
+    claimed_q = Q()
+    for category in categories:
+        cutoff = now - timedelta(days=CLAIM_VISIBILITY_DAYS.get(category, 1))
+        claimed_q |= Q(status="CLAIMED", category=category, claimed_at__isnull=False, claimed_at__gte=cutoff)
+    return Q(status="FOUND") | claimed_q
+
+
+def link_locations(apps, schema_editor):
+    Item = apps.get_model("inventory", "Item")
+    Location = apps.get_model("inventory", "Location")
+    LocationAlias = apps.get_model("inventory", "LocationAlias")
+    FacetCount = apps.get_model("inventory", "FacetCount")
+
+    counts = dict(
+        Item.objects.exclude(location_found="").values_list("location_found").annotate(n=Count("pk")).order_by()
+    )
+    for name, spellings in cluster_locations(counts).items():
+        location = Location.objects.create(name=name, normalized=location_key(name))
+        aliases = {location_key(spelling) for spelling in spellings} - {location.normalized}
+        LocationAlias.objects.bulk_create([LocationAlias(location=location, alias=alias) for alias in aliases])
+        spellings = set(spellings)
+        raw = [value for value in counts if value.strip() in spellings]
+        Item.objects.filter(location_found__in=raw).update(location=location)
+
+    # Location facets are now counted per location rather than per spelling;
+    # every row is rebuilt so the table matches the items exactly
+    FacetCount.objects.all().delete()
+    categories = [value for value, _ in Item._meta.get_field("category").choices]
+    visible = Item.objects.filter(visible_items_q(categories)).order_by()
+    FacetCount.objects.bulk_create([
+        FacetCount(facet="category", value=row["category"], count=row["n"])
+        for row in visible.values("category").annotate(n=Count("pk"))
+    ] + [
+        FacetCount(facet="location", value=row["location__name"], count=row["n"])
+        for row in visible.exclude(location=None).values("location__name").annotate(n=Count("pk"))
+    ])
+
+
+def unlink_locations(apps, schema_editor):
+    apps.get_model("inventory", "Item").objects.update(location=None)
+    apps.get_model("inventory", "Location").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0016_location'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_locations, unlink_locations),
+    ]
@@ -1,5 +1,65 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+# Days a claimed item stays visible on the public browse page, by category.
+CLAIM_VISIBILITY_DAYS = {
+    "ELECTRONICS": 7,
+    "SPORTS_AND_CLOTHING": 3,
+    "BAGS_AND_CARRY": 1,
+    "BOTTLES_AND_CONTAINERS": 1,
+    "OTHER_MISC": 1,
+    "DOCUMENTS_AND_IDS": 1,  # Default for documents
+    "NOTEBOOKS_AND_BOOKS": 1,  # Default for notebooks
+}
+
+
+def visible_items_q(now=None) -> Q:
+    """
+    Filter for items shown on the public browse page: everything still FOUND,
+    plus CLAIMED items within their category's visibility window.
+    """
+    now = now or timezone.now()
+    claimed_q = Q()
+    for category, _ in Item.Category.choices:
+        cutoff = now - timedelta(days=CLAIM_VISIBILITY_DAYS.get(category, 1))
+        claimed_q |= Q(status=Item.Status.CLAIMED, category=category, claimed_at__isnull=False, claimed_at__gte=cutoff)
+    return Q(status=Item.Status.FOUND) | claimed_q
+
+
+class Location(models.Model):
+    """
+    A place items are found, the normalised form of ``Item.location_found``.
+    Spellings that differ only in case, spacing or punctuation share
+    ``normalized``; other variants ("Lib 2nd floor") are ``LocationAlias`` rows.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    # location_key(name): lower case words, the key of prefix autocomplete
+    normalized = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class LocationAlias(models.Model):
+    """Another spelling of a location, stored as its location_key."""
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name="aliases")
+    alias = models.CharField(max_length=255, unique=True)
+
+    class Meta:
+        ordering = ["alias"]
+        verbose_name_plural = "location aliases"
+
+    def __str__(self) -> str:
+        return f"{self.alias} -> {self.location.name}"
 
 
 class Item(models.Model):
@@ -19,6 +79,15 @@ class Item(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     location_found = models.CharField(max_length=255, blank=True)
+    # Resolved from location_found when it changes (inventory.locations.resolve_location)
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="items",
+        db_index=False,  # led by item_location_recent_idx
+    )
     date_found = models.DateField()
     status = models.CharField(
         max_length=20,
@@ -50,10 +119,31 @@ class Item(models.Model):
             models.Index(fields=["status"]),
             models.Index(fields=["date_found"]),
             models.Index(fields=["category"]),
+            # Browse, dashboard and admin lists, in their default order
+            models.Index(fields=["-date_found", "-created_at"], name="item_recent_idx"),
+            # Browse page: FOUND items are nearly all of what it lists
+            models.Index(
+                fields=["-date_found", "-created_at"],
+                condition=models.Q(status="FOUND"),
+                name="item_found_recent_idx",
+            ),
+            # Recently claimed items (admin notification count, browse visibility window, archiving)
+            models.Index(fields=["status", "claimed_at"], name="item_status_claimed_idx"),
+            # Browse page filtered to one location
+            models.Index(fields=["location", "-date_found", "-created_at"], name="item_location_recent_idx"),
         ]
 
     def __str__(self) -> str:
         return self.title
+
+    def is_visible(self, now=None) -> bool:
+        """Python equivalent of ``visible_items_q`` for this item."""
+        if self.status == self.Status.FOUND:
+            return True
+        if self.status != self.Status.CLAIMED or not self.claimed_at:
+            return False
+        now = now or timezone.now()
+        return self.claimed_at >= now - timedelta(days=CLAIM_VISIBILITY_DAYS.get(self.category, 1))
     
     @property
     def claim_count(self):
@@ -80,22 +170,238 @@ class Claim(models.Model):
         ordering = ['-claimed_at']
         indexes = [
             models.Index(fields=['item', '-claimed_at']),
+            # Dashboard's recent claims across all items
+            models.Index(fields=['-claimed_at'], name='claim_recent_idx'),
         ]
     
     def __str__(self) -> str:
         return f"{self.claimant_name} claimed {self.item.title}"
 
 
+class FacetCount(models.Model):
+    """
+    Number of publicly visible items with one value of a browse-page facet.
+    Maintained incrementally by ``inventory.facets``.
+    """
+    class Facet(models.TextChoices):
+        CATEGORY = "category", "Category"
+        LOCATION = "location", "Location"
+
+    facet = models.CharField(max_length=20, choices=Facet.choices)
+    value = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["facet", "-count", "value"]
+        constraints = [
+            models.UniqueConstraint(fields=["facet", "value"], name="unique_facet_value"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.facet}={self.value}: {self.count}"
+
+
+class SearchSynonym(models.Model):
+    """Query expansion for browse search: a search for ``term`` also matches ``synonym``."""
+    term = models.CharField(max_length=50, db_index=True)
+    synonym = models.CharField(max_length=50)
+    weight = models.FloatField(default=1.0, help_text="How strongly a synonym match counts relative to the term itself.")
+
+    class Meta:
+        ordering = ["term", "synonym"]
+        constraints = [
+            models.UniqueConstraint(fields=["term", "synonym"], name="unique_search_synonym"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.term} -> {self.synonym}"
+
+
 class ItemImage(models.Model):
     item = models.ForeignKey(
         Item,
         on_delete=models.CASCADE,
         related_name="images",
     )
-    image = models.ImageField(upload_to="item_images/")
+    # Indexed so the media view can find the image a requested file belongs to
+    image = models.ImageField(upload_to="item_images/", db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set by the ingest stage once orientation, metadata and colour profile are normalised
+    normalized_at = models.DateTimeField(null=True, blank=True)
+    # Filled in after upload by renditions.generate_renditions
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    placeholder = models.TextField(blank=True, help_text="Blurred low-quality preview as a data URI.")
+    renditions = models.JSONField(default=dict, blank=True)
+    bytes_saved = models.PositiveIntegerField(
+        default=0,
+        help_text="Bytes saved across renditions by the best modern format (WebP/AVIF) compared with JPEG.",
+    )
 
     def __str__(self) -> str:
         return f"Image for {self.item_id}"
 
+    @property
+    def renditions_current(self) -> bool:
+        """Whether the stored renditions were generated from the current image file."""
+        return bool(self.image) and self.renditions.get("source") == self.image.name
+
+
+class AnalysisSuggestion(models.Model):
+    """AI-suggested metadata for an existing item, held for staff review instead of overwriting."""
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending review"
+        APPLIED = "APPLIED", "Applied"
+        DISMISSED = "DISMISSED", "Dismissed"
+
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.CASCADE,
+        related_name="analysis_suggestions",
+    )
+    title = models.CharField(max_length=255, blank=True)
+    description = models.TextField(blank=True)
+    category = models.CharField(max_length=40, choices=Item.Category.choices, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        db_index=True,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["item", "status"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Suggestion for {self.item_id}: {self.title}"
+
+    def apply(self):
+        """Copy the suggested fields onto the item and mark the suggestion applied."""
+        item = self.item
+        if self.title:
+            item.title = self.title
+        if self.description:
+            item.description = self.description
+        if self.category:
+            item.category = self.category
+        item.save(update_fields=["title", "description", "category", "updated_at"])
+        self.status = self.Status.APPLIED
+        self.save(update_fields=["status"])
+
+
+class LostReport(models.Model):
+    """A student's description of something they lost, matched against found items."""
+    class Status(models.TextChoices):
+        OPEN = "OPEN", "Open"
+        MATCHED = "MATCHED", "Matched"
+        CLOSED = "CLOSED", "Closed"
+
+    description = models.TextField(help_text="What was lost, e.g. brand, colour, stickers.")
+    category = models.CharField(max_length=40, choices=Item.Category.choices, default=Item.Category.OTHER_MISC)
+    lost_from = models.DateField(help_text="Earliest day it could have been lost")
+    lost_to = models.DateField(help_text="Latest day it could have been lost")
+    location = models.CharField(max_length=255, blank=True, help_text="Where it was probably lost")
+    photo = models.ImageField(upload_to="lost_reports/", blank=True, db_index=True)
+    reporter_name = models.CharField(max_length=255)
+    reporter_contact = models.CharField(max_length=255, blank=True, help_text="Email or phone for staff to reach out")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.OPEN)
+    created_at = models.DateTimeField(auto_now_add=True)
+    matched_at = models.DateTimeField(null=True, blank=True, help_text="When the matcher last compared this report")
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "lost_to"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.reporter_name}: {self.description[:50]}"
+
+
+class ReportTerm(models.Model):
+    """Inverted index of open reports' words, so a new item only meets reports sharing a word with it."""
+    report = models.ForeignKey(LostReport, on_delete=models.CASCADE, related_name="terms")
+    term = models.CharField(max_length=64)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["term", "report"], name="unique_report_term"),
+        ]
+
+    def __str__(self) -> str:
+        return self.term
+
+
+class ReportMatch(models.Model):
+    """A found item that may be what a report describes, queued for staff."""
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending review"
+        CONFIRMED = "CONFIRMED", "Confirmed"
+        DISMISSED = "DISMISSED", "Dismissed"
+
+    report = models.ForeignKey(LostReport, on_delete=models.CASCADE, related_name="matches")
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="report_matches")
+    score = models.FloatField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-score"]
+        constraints = [
+            models.UniqueConstraint(fields=["report", "item"], name="unique_report_match"),
+        ]
+        indexes = [
+            models.Index(fields=["status", "-score"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Report {self.report_id} ~ item {self.item_id} ({self.score:.2f})"
+
+
+class ArchivedItem(models.Model):
+    """
+    Cold copy of an item removed from the live table by the retention job.
+
+    Also serves as the tombstone that lets old item links resolve after the
+    live row is gone.
+    """
+    original_id = models.BigIntegerField(unique=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    location_found = models.CharField(max_length=255, blank=True)
+    date_found = models.DateField()
+    status = models.CharField(max_length=20, choices=Item.Status.choices)
+    category = models.CharField(max_length=40, choices=Item.Category.choices)
+    created_by_username = models.CharField(max_length=150, blank=True)
+    claimed_by_name = models.CharField(max_length=255, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    media = models.JSONField(default=list, blank=True, help_text="Image paths in cold storage")
+
+    class Meta:
+        ordering = ["-archived_at"]
+
+    def __str__(self) -> str:
+        return f"{self.title} (archived)"
+
 
+class ArchivedClaim(models.Model):
+    archived_item = models.ForeignKey(
+        ArchivedItem,
+        on_delete=models.CASCADE,
+        related_name="claims",
+    )
+    claimant_name = models.CharField(max_length=255)
+    claimed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-claimed_at"]
+
+    def __str__(self) -> str:
+        return f"{self.claimant_name} claimed {self.archived_item.title}"
@@ -0,0 +1,225 @@
+"""
+Resized copies of item photos for responsive delivery.
+
+Each ``ItemImage`` gets a few fixed-width renditions, which templates
+offer through ``srcset`` so a phone on the browse page downloads a
+320px-wide copy instead of the camera original. Renditions are written as
+JPEG and, where the Pillow build can encode them, WebP and AVIF; the
+template picks the best format the browser's ``Accept`` header allows. Each
+image also gets a tiny blurred placeholder, stored inline as a data URI,
+that paints immediately while the real image loads.
+
+Encoding all of that costs a second or more per photo (AVIF most of it),
+so uploads hand it to a background thread with ``schedule_renditions``
+(see ``RENDITIONS_IN_BACKGROUND``); ``rebuild_renditions --missing-only``
+catches up on any a restart interrupted.
+"""
+import base64
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections
+from PIL import Image, ImageFilter, ImageOps
+
+logger = logging.getLogger(__name__)
+
+RENDITION_WIDTHS = (320, 640, 1280)
+# format key -> (Pillow format, extension, save options). Quality settings
+# give roughly the same visual quality as the JPEGs at fewer bytes.
+RENDITION_FORMATS = {
+    "jpeg": ("JPEG", "jpg", {"quality": 80, "optimize": True, "progressive": True}),
+    "webp": ("WEBP", "webp", {"quality": 75, "method": 4}),
+    "avif": ("AVIF", "avif", {"quality": 55, "speed": 8}),
+}
+# Most preferred first
+MODERN_FORMATS = ("avif", "webp")
+# Formats that also get a full-size copy. A full-size AVIF takes seconds to
+# encode, so AVIF srcsets end with the original JPEG instead.
+FULL_SIZE_FORMATS = ("webp",)
+RENDITION_DIR = "renditions"
+# Hex digits of the content digest in rendition names
+DIGEST_LENGTH = 12
+PLACEHOLDER_WIDTH = 24
+PLACEHOLDER_QUALITY = 50
+
+
+def rendition_name(image_name: str, width: int, extension: str = "jpg", data: bytes = None) -> str:
+    """
+    Storage name for the ``width`` rendition of ``image_name``. Given the
+    encoded ``data``, the name includes a digest of it, so a name never
+    refers to different bytes and can be cached forever (see ``media``).
+    """
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    if data is not None:
+        stem = f"{stem}_{content_digest(data)}"
+    return f"{RENDITION_DIR}/{stem}_{width}w.{extension}"
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]
+
+
+def available_formats() -> list:
+    """Rendition formats the installed Pillow can encode; JPEG always."""
+    Image.init()
+    return [key for key, (pil_format, _, _) in RENDITION_FORMATS.items() if key == "jpeg" or pil_format in Image.SAVE]
+
+
+def preferred_image_format(request, offered) -> str:
+    """
+    Pick the best of ``offered`` formats the request's ``Accept`` header
+    allows. Browsers list ``image/avif``/``image/webp`` in the Accept header
+    of page loads as well as image fetches, so this works for HTML too.
+    """
+    accepted = set()
+    for part in (request.headers.get("Accept", "") if request else "").split(","):
+        media_type, *params = [piece.strip() for piece in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(media_type.lower())
+    for key in MODERN_FORMATS:
+        if key in offered and f"image/{key}" in accepted:
+            return key
+    return "jpeg"
+
+
+def _encode(img, key) -> bytes:
+    pil_format, _, options = RENDITION_FORMATS[key]
+    output = BytesIO()
+    img.save(output, format=pil_format, **options)
+    return output.getvalue()
+
+
+def _resized(img, width):
+    height = max(1, round(img.height * width / img.width))
+    return img.resize((width, height), Image.LANCZOS)
+
+
+def make_placeholder(img) -> str:
+    """Return a blurred, heavily compressed thumbnail of ``img`` as a data URI."""
+    small = _resized(img, min(PLACEHOLDER_WIDTH, img.width)).filter(ImageFilter.GaussianBlur(1))
+    output = BytesIO()
+    small.save(output, format="JPEG", quality=PLACEHOLDER_QUALITY)
+    return "data:image/jpeg;base64," + base64.b64encode(output.getvalue()).decode("ascii")
+
+
+def delete_renditions(storage, renditions) -> None:
+    """Delete every file listed in an ``ItemImage.renditions`` value."""
+    for names in renditions.get("formats", {}).values():
+        for name in names.values():
+            try:
+                storage.delete(name)
+            except Exception as e:
+                logger.error(f"Error deleting rendition {name}: {e}", exc_info=True)
+
+
+def generate_renditions(item_image) -> bool:
+    """
+    Write renditions and a placeholder for ``item_image`` and store their
+    names on the row. Widths at or above the original are skipped; the
+    original itself is the largest ``srcset`` candidate. Returns True on success.
+    """
+    from .models import ItemImage
+
+    if not item_image.pk or not item_image.image:
+        return False
+    storage = item_image.image.storage
+    try:
+        with item_image.image.open("rb") as fh:
+            img = Image.open(fh)
+            if not item_image.normalized_at:
+                # Older uploads still carry their EXIF orientation flag.
+                img = ImageOps.exif_transpose(img)
+            img = img.convert("RGB")
+    except Exception:
+        logger.warning("Could not open %s to generate renditions", item_image.image.name)
+        return False
+
+    delete_renditions(storage, item_image.renditions or {})
+    widths = [width for width in RENDITION_WIDTHS if width < img.width]
+    formats = {}
+    # Bytes a browser downloads per format for the same set of widths
+    # (full size included), to measure what the modern formats save.
+    sizes = {}
+    for key in available_formats():
+        _, extension, _ = RENDITION_FORMATS[key]
+        # The original is the full-size JPEG, and the full-size candidate of formats without their own
+        full_size = key in FULL_SIZE_FORMATS
+        format_widths = widths + [img.width] if full_size else widths
+        names = {}
+        total = 0 if full_size else item_image.image.size
+        try:
+            for width in format_widths:
+                data = _encode(img if width == img.width else _resized(img, width), key)
+                names[str(width)] = storage.save(
+                    rendition_name(item_image.image.name, width, extension, data), ContentFile(data)
+                )
+                total += len(data)
+        except Exception:
+            logger.warning("Could not encode %s as %s", item_image.image.name, key, exc_info=True)
+            delete_renditions(storage, {"formats": {key: names}})
+            continue
+        formats[key] = names
+        sizes[key] = total
+
+    modern_sizes = [sizes[key] for key in MODERN_FORMATS if key in sizes]
+    item_image.width, item_image.height = img.size
+    item_image.placeholder = make_placeholder(img)
+    item_image.renditions = {"source": item_image.image.name, "formats": formats, "bytes": sizes}
+    item_image.bytes_saved = max(0, sizes["jpeg"] - min(modern_sizes)) if modern_sizes else 0
+    # update() rather than save() so post_save handlers do not run again.
+    ItemImage.objects.filter(pk=item_image.pk).update(
+        width=item_image.width,
+        height=item_image.height,
+        placeholder=item_image.placeholder,
+        renditions=item_image.renditions,
+        bytes_saved=item_image.bytes_saved,
+    )
+    return True
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def schedule_renditions(item_image_pk) -> None:
+    """
+    Generate the renditions of an ``ItemImage`` on the background worker,
+    or right away when ``RENDITIONS_IN_BACKGROUND`` is off.
+    """
+    global _executor
+    if not settings.RENDITIONS_IN_BACKGROUND:
+        _generate_stored(item_image_pk)
+        return
+    with _executor_lock:
+        if _executor is None:
+            # One worker: encoding is CPU-bound and should not starve the requests
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="renditions")
+    _executor.submit(_generate_stored, item_image_pk, background=True)
+
+
+def _generate_stored(item_image_pk, background=False) -> None:
+    from .models import ItemImage
+
+    try:
+        item_image = ItemImage.objects.filter(pk=item_image_pk).first()
+        if item_image is not None and not item_image.renditions_current:
+            generate_renditions(item_image)
+    except Exception as e:
+        logger.error(f"Error generating renditions for image {item_image_pk}: {e}", exc_info=True)
+    finally:
+        if background:
+            connections.close_all()
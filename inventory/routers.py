@@ -0,0 +1,107 @@
+"""
+Read-replica routing.
+
+The public pages read far more than anything writes, so with replicas
+configured (``DATABASE_REPLICAS``, built from ``DATABASE_REPLICA_URLS``)
+``replica_routing_middleware`` lets a GET or HEAD request read the
+inventory tables from one of them, chosen per request. Everything else
+uses the primary (``default``):
+
+- writes, every query of a request with another method (so a form
+  validates against what it is about to change) and reads after a write;
+- the other apps' tables (sessions, users), read on every request and
+  expected to be current;
+- queries outside a request: management commands and the shell;
+- a client's requests for ``DATABASE_PIN_SECONDS`` after one of its
+  requests wrote, marked by a cookie, so the redirect after a claim or an
+  upload shows the change before the replicas have caught up.
+"""
+import contextvars
+import random
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.decorators import sync_and_async_middleware
+
+# Apps whose tables replicas serve
+REPLICATED_APPS = {"inventory"}
+PIN_COOKIE = "pin_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@dataclass
+class _Routing:
+    replica: str | None
+    wrote: bool = False
+
+
+# Routing of the current request; None outside one
+_routing = contextvars.ContextVar("replica_routing", default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None or routing.replica is None or model._meta.app_label not in REPLICATED_APPS:
+            return DEFAULT_DB_ALIAS
+        if routing.wrote:
+            # Read back what this request wrote
+            return DEFAULT_DB_ALIAS
+        return routing.replica
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None and model._meta.app_label in REPLICATED_APPS:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get the primary's schema through replication
+        return db not in settings.DATABASE_REPLICAS
+
+
+def _start(request) -> _Routing:
+    replicas = settings.DATABASE_REPLICAS
+    reads_replica = replicas and request.method in SAFE_METHODS and PIN_COOKIE not in request.COOKIES
+    return _Routing(replica=random.choice(replicas) if reads_replica else None)
+
+
+def _finish(routing: _Routing, response):
+    if routing.wrote and settings.DATABASE_REPLICAS:
+        response.set_cookie(
+            PIN_COOKIE, "1", max_age=settings.DATABASE_PIN_SECONDS, httponly=True, samesite="Lax",
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    """Route the request's reads (see the module docstring) and pin clients that wrote to the primary."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            routing = _start(request)
+            token = _routing.set(routing)
+            try:
+                response = await get_response(request)
+            finally:
+                _routing.reset(token)
+            return _finish(routing, response)
+    else:
+        def middleware(request):
+            routing = _start(request)
+            token = _routing.set(routing)
+            try:
+                response = get_response(request)
+            finally:
+                _routing.reset(token)
+            return _finish(routing, response)
+    return middleware
@@ -0,0 +1,253 @@
+"""
+Typo-tolerant, synonym-aware search for the browse page.
+
+Queries are split into words and each word is expanded with its synonyms
+from ``SearchSynonym``, so "airpods" also looks for "earbuds". Words match
+by trigram similarity rather than substring, so "bottel" still finds
+"Bottle". On Postgres this uses pg_trgm and its GIN indexes on the title
+and description; elsewhere (SQLite in development) an in-memory trigram
+index over the words of every item stands in. Either way the candidates
+come from the index and results are ordered by relevance: title matches
+count more than description matches, synonyms less than the word itself.
+"""
+import re
+import threading
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Case, Count, FloatField, Max, Q, Value, When
+
+from .models import Item, SearchSynonym
+from .vision_providers import CATEGORY_KEYWORDS
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+# Minimum trigram similarity for a word to match; the pg_trgm default
+SIMILARITY_THRESHOLD = 0.3
+# Score given to a word that contains the search term, as icontains used to match
+SUBSTRING_SCORE = 0.6
+MAX_RESULTS = 200
+
+SYNONYM_CACHE_KEY = "inventory:search_synonyms"
+SYNONYM_CACHE_SECONDS = 300
+# Keywords that normalize_category puts in the same category are related,
+# not equivalent, so they count for less than curated synonyms.
+CATEGORY_SYNONYM_WEIGHT = 0.5
+COMMON_SYNONYM_WEIGHT = 0.8
+# Curated pairs for things students lose, on top of the category vocabulary
+COMMON_SYNONYMS = (
+    ("airpods", "earbuds"),
+    ("airpods", "earphones"),
+    ("earbuds", "earphones"),
+    ("headphones", "earphones"),
+    ("headphones", "headset"),
+    ("phone", "iphone"),
+    ("phone", "mobile"),
+    ("phone", "smartphone"),
+    ("laptop", "macbook"),
+    ("laptop", "chromebook"),
+    ("tablet", "ipad"),
+    ("charger", "cable"),
+    ("bottle", "tumbler"),
+    ("jacket", "coat"),
+    ("jacket", "hoodie"),
+    ("sweater", "hoodie"),
+    ("sweater", "jumper"),
+    ("bag", "rucksack"),
+    ("wallet", "purse"),
+    ("glasses", "spectacles"),
+)
+
+
+def tokenize(text: str) -> list:
+    return WORD_RE.findall((text or "").lower())
+
+
+def synonym_seed() -> list:
+    """``(term, synonym, weight)`` rows for the initial synonym table."""
+    pairs = {}
+    for keywords in CATEGORY_KEYWORDS.values():
+        for term in keywords:
+            for synonym in keywords:
+                if term != synonym:
+                    pairs[(term, synonym)] = CATEGORY_SYNONYM_WEIGHT
+    for term, synonym in COMMON_SYNONYMS:
+        pairs[(term, synonym)] = pairs[(synonym, term)] = COMMON_SYNONYM_WEIGHT
+    return [(term, synonym, weight) for (term, synonym), weight in sorted(pairs.items())]
+
+
+def get_synonyms() -> dict:
+    """Return ``{term: {synonym: weight}}``, cached until the table changes."""
+    synonyms = cache.get(SYNONYM_CACHE_KEY)
+    if synonyms is None:
+        synonyms = defaultdict(dict)
+        for term, synonym, weight in SearchSynonym.objects.values_list("term", "synonym", "weight"):
+            synonyms[term.lower()][synonym.lower()] = weight
+        synonyms = dict(synonyms)
+        cache.set(SYNONYM_CACHE_KEY, synonyms, SYNONYM_CACHE_SECONDS)
+    return synonyms
+
+
+def invalidate_synonyms() -> None:
+    cache.delete(SYNONYM_CACHE_KEY)
+
+
+def expand_query(query: str, synonyms=None) -> list:
+    """
+    Return one ``{term: weight}`` dict per query word: the word itself at
+    weight 1 plus its synonyms. Single characters are ignored.
+    """
+    if synonyms is None:
+        synonyms = get_synonyms()
+    expanded = []
+    for word in tokenize(query):
+        if len(word) < 2:
+            continue
+        alternatives = {word: 1.0}
+        # Plurals share the singular's synonyms ("bottles" -> "flask").
+        keys = {word, word[:-1]} if word.endswith("s") and len(word) > 3 else {word}
+        for key in keys:
+            for synonym, weight in synonyms.get(key, {}).items():
+                alternatives[synonym] = max(alternatives.get(synonym, 0), weight)
+        expanded.append(alternatives)
+    return expanded
+
+
+def trigrams(word: str) -> frozenset:
+    """pg_trgm-style trigrams: the word padded with two spaces before and one after."""
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """
+    In-memory stand-in for pg_trgm: maps each trigram to the words that
+    contain it and each word to the items (and best field weight) it occurs in.
+    """
+
+    def __init__(self, stamp=None):
+        self.stamp = stamp
+        self._postings = {}
+        self._word_trigrams = {}
+        self._trigram_words = defaultdict(set)
+
+    @classmethod
+    def build(cls, rows, stamp=None) -> "TrigramIndex":
+        """Index ``(pk, title, description)`` rows."""
+        index = cls(stamp)
+        for pk, title, description in rows:
+            for text, field_weight in ((title, TITLE_WEIGHT), (description, DESCRIPTION_WEIGHT)):
+                for word in tokenize(text):
+                    postings = index._postings.setdefault(word, {})
+                    postings[pk] = max(postings.get(pk, 0), field_weight)
+        for word in index._postings:
+            word_trigrams = index._word_trigrams[word] = trigrams(word)
+            for trigram in word_trigrams:
+                index._trigram_words[trigram].add(word)
+        return index
+
+    def similar_words(self, term: str) -> dict:
+        """Return ``{word: similarity}`` for indexed words similar to ``term``."""
+        term_trigrams = trigrams(term)
+        candidates = set()
+        for trigram in term_trigrams:
+            candidates.update(self._trigram_words.get(trigram, ()))
+        matches = {}
+        for word in candidates:
+            word_trigrams = self._word_trigrams[word]
+            score = len(term_trigrams & word_trigrams) / len(term_trigrams | word_trigrams)
+            if len(term) >= 3 and term in word:
+                score = max(score, SUBSTRING_SCORE)
+            if score >= SIMILARITY_THRESHOLD:
+                matches[word] = score
+        return matches
+
+    def rank(self, expanded: list) -> dict:
+        """
+        Return ``{pk: score}`` for ``expand_query`` output. Each query word
+        contributes its best match per item; the contributions are summed.
+        """
+        scores = defaultdict(float)
+        for alternatives in expanded:
+            best = {}
+            for term, weight in alternatives.items():
+                for word, similarity in self.similar_words(term).items():
+                    for pk, field_weight in self._postings[word].items():
+                        best[pk] = max(best.get(pk, 0), weight * similarity * field_weight)
+            for pk, score in best.items():
+                scores[pk] += score
+        return dict(scores)
+
+
+# One index per database alias, so reads spread over replicas do not evict each other's
+_indexes = {}
+_index_lock = threading.Lock()
+
+
+def get_trigram_index(using="default") -> TrigramIndex:
+    """
+    Return the process-wide in-memory index for ``using``, rebuilding it
+    when items have been added, edited or deleted since it was built. The
+    check reads the database, so writes from other processes are seen too.
+    """
+    stamp = tuple(
+        Item.objects.using(using).aggregate(count=Count("pk"), latest=Max("updated_at"), last=Max("pk")).values()
+    )
+    with _index_lock:
+        index = _indexes.get(using)
+        if index is None or index.stamp != stamp:
+            rows = Item.objects.using(using).values_list("pk", "title", "description").iterator(chunk_size=2000)
+            index = _indexes[using] = TrigramIndex.build(rows, stamp)
+        return index
+
+
+def _search_postgres(queryset, expanded):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+    from django.db.models.functions import Greatest
+
+    candidates = Q()
+    rank = Value(0.0)
+    for alternatives in expanded:
+        term_scores = []
+        for term, weight in alternatives.items():
+            # ``<%`` (word similarity) is answered from the trigram GIN indexes.
+            candidates |= Q(title__trigram_word_similar=term) | Q(description__trigram_word_similar=term)
+            term_scores.append(
+                Greatest(
+                    TrigramWordSimilarity(term, "title") * Value(TITLE_WEIGHT),
+                    TrigramWordSimilarity(term, "description") * Value(DESCRIPTION_WEIGHT),
+                )
+                * Value(weight)
+            )
+        rank = rank + (Greatest(*term_scores) if len(term_scores) > 1 else term_scores[0])
+    return (
+        queryset.filter(candidates)
+        .annotate(search_rank=rank)
+        .order_by("-search_rank", "-date_found", "-created_at")
+    )
+
+
+def search_items(queryset, query: str):
+    """
+    Narrow ``queryset`` to items matching ``query`` and order them by
+    relevance, best first, with newer items first among equal scores.
+    """
+    expanded = expand_query(query)
+    if not expanded:
+        return queryset
+    if connections[queryset.db].vendor == "postgresql":
+        return _search_postgres(queryset, expanded)
+
+    scores = get_trigram_index(queryset.db).rank(expanded)
+    # Truncate only among the items the caller's filters allow
+    allowed = [pk for pk in queryset.values_list("pk", flat=True).order_by() if pk in scores]
+    ranked = sorted(allowed, key=scores.get, reverse=True)[:MAX_RESULTS]
+    if not ranked:
+        return queryset.none()
+    return (
+        queryset.filter(pk__in=ranked)
+        .annotate(search_rank=Case(*(When(pk=pk, then=Value(scores[pk])) for pk in ranked), output_field=FloatField()))
+        .order_by("-search_rank", "-date_found", "-created_at")
+    )
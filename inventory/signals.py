@@ -1,24 +1,20 @@
 import logging
 import os
-from io import BytesIO
 
-from django.db.models.signals import pre_save
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from PIL import Image
+from django.utils import timezone
 
-from .models import ItemImage
+from .facets import apply_facet_changes, facet_keys
+from .locations import invalidate_locations, resolve_location
+from .models import Item, ItemImage, Location, LocationAlias, LostReport, SearchSynonym
 
-logger = logging.getLogger(__name__)
-
-# Register HEIF opener with Pillow if pillow-heif is available
-try:
-    from pillow_heif import register_heif_opener
+# The image modules (Pillow, pillow-heif, numpy) are imported inside the
+# handlers that need them, so loading the app does not pay for them.
 
-    register_heif_opener()
-    HEIF_AVAILABLE = True
-except ImportError:
-    HEIF_AVAILABLE = False
-    logger.warning("pillow-heif not available. HEIC files will not be converted.")
+logger = logging.getLogger(__name__)
 
 
 def is_heic_file(filename):
@@ -29,66 +25,215 @@ def is_heic_file(filename):
     return filename_lower.endswith((".heic", ".heif"))
 
 
-@receiver(pre_save, sender=ItemImage)
-def convert_heic_image(sender, instance, **kwargs):
+def link_item_location(instance, previous):
     """
-    Signal handler to convert HEIC/HEIF files to JPEG before saving.
+    Point the item at the Location its location text names, creating one
+    for a new place, unless it is linked and the text has not changed.
     """
-    # Check if HEIF support is available
-    if not HEIF_AVAILABLE:
+    if previous is not None and instance.location_id and previous.location_found == instance.location_found:
         return
+    instance.location = resolve_location(instance.location_found)
 
-    # Only process if image field exists
-    if not instance.image:
+
+@receiver(pre_save, sender=Item)
+def remember_item_facets(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Signal handler that records which facet counts the stored version of the
+    item contributes to, so the post_save handler can move them, and links
+    the item to its location, loading the stored row once for both.
+    """
+    if raw:
         return
+    previous = Item.objects.select_related("location").filter(pk=instance.pk).first() if instance.pk else None
+    instance._facet_keys_before = facet_keys(previous) if previous else None
+    if update_fields is None or "location_found" in update_fields:
+        link_item_location(instance, previous)
 
-    image_field = instance.image
 
-    # Check if the file is HEIC/HEIF by filename
+@receiver(post_save, sender=Item)
+def update_facet_counts(sender, instance, raw=False, **kwargs):
+    """
+    Signal handler that adjusts the browse page facet counts for a created or changed item.
+    """
+    if raw:
+        return
+    before = getattr(instance, "_facet_keys_before", None)
+    try:
+        apply_facet_changes(before or {}, facet_keys(instance))
+    except Exception as e:
+        logger.error(f"Error updating facet counts for item {instance.pk}: {e}", exc_info=True)
+
+
+@receiver(post_delete, sender=Item)
+def remove_facet_counts(sender, instance, **kwargs):
+    """
+    Signal handler that drops a deleted item from the facet counts.
+    """
+    try:
+        apply_facet_changes(facet_keys(instance), {})
+    except Exception as e:
+        logger.error(f"Error updating facet counts for item {instance.pk}: {e}", exc_info=True)
+
+
+@receiver(post_save, sender=Item)
+def match_item_to_reports(sender, instance, raw=False, **kwargs):
+    """
+    Signal handler that compares a created or changed item with the open
+    lost reports that could describe it, once the save commits.
+    """
+    if raw:
+        return
+    from .matching import match_item
+
+    def _match():
+        try:
+            match_item(instance)
+        except Exception as e:
+            logger.error(f"Error matching item {instance.pk} to lost reports: {e}", exc_info=True)
+
+    transaction.on_commit(_match)
+
+
+@receiver(post_save, sender=LostReport)
+def match_report_to_items(sender, instance, raw=False, **kwargs):
+    """
+    Signal handler that indexes a created or changed lost report and
+    compares it with the found items, once the save commits.
+    """
+    if raw:
+        return
+    from .matching import index_report, match_report
+
+    def _match():
+        try:
+            index_report(instance)
+            match_report(instance)
+        except Exception as e:
+            logger.error(f"Error matching lost report {instance.pk}: {e}", exc_info=True)
+
+    transaction.on_commit(_match)
+
+
+@receiver(post_save, sender=SearchSynonym)
+@receiver(post_delete, sender=SearchSynonym)
+def refresh_search_synonyms(sender, **kwargs):
+    """
+    Signal handler that drops the cached synonym table once an edit commits.
+    """
+    from .search import invalidate_synonyms
+
+    transaction.on_commit(invalidate_synonyms)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=LocationAlias)
+@receiver(post_delete, sender=LocationAlias)
+def refresh_location_suggestions(sender, **kwargs):
+    """
+    Signal handler that retires the cached location suggestions once an edit commits.
+    """
+    transaction.on_commit(invalidate_locations)
+
+
+@receiver(pre_save, sender=ItemImage)
+def normalize_uploaded_image(sender, instance, **kwargs):
+    """
+    Signal handler that normalises a newly uploaded image once, before it is
+    stored: applies the EXIF orientation, strips metadata and embedded
+    previews, converts to sRGB and turns HEIC/HEIF into JPEG.
+    """
+    from .ingest import heif_available, normalize_image
+
+    # Only process new files that have not been normalised already (staged uploads are)
+    if not instance.image or instance.image._committed or instance.normalized_at:
+        return
+
+    image_field = instance.image
     filename = getattr(image_field, "name", None) or ""
-    if not is_heic_file(filename):
+    if is_heic_file(filename) and not heif_available():
+        return
+
+    try:
+        normalized = normalize_image(image_field)
+    except Exception as e:
+        logger.error(f"Error normalising image {filename}: {e}", exc_info=True)
+        # Don't raise - allow the original file to be saved if normalisation fails
+        return
+
+    instance.normalized_at = timezone.now()
+    if normalized is None:
+        return
+    data, extension = normalized
+    new_filename = f"{os.path.splitext(os.path.basename(filename))[0]}.{extension}"
+    instance.image.save(
+        new_filename,
+        ContentFile(data),
+        save=False,  # Don't save yet, let Django handle it
+    )
+    logger.info(f"Normalised uploaded image: {new_filename}")
+
+
+@receiver(post_save, sender=ItemImage)
+def update_similarity_index(sender, instance, **kwargs):
+    """
+    Signal handler to add the image's feature vector to the similarity index.
+    """
+    from .similarity import index_item_image
+
+    try:
+        index_item_image(instance)
+    except Exception as e:
+        logger.error(f"Error indexing image {instance.pk} for similarity search: {e}", exc_info=True)
+
+
+@receiver(post_save, sender=ItemImage)
+def create_renditions(sender, instance, **kwargs):
+    """
+    Signal handler to generate resized renditions and a placeholder when the
+    image file changes. The encoding runs once the save commits, in the
+    background unless ``RENDITIONS_IN_BACKGROUND`` is off (see inventory.renditions).
+    """
+    if instance.renditions_current:
         return
+    from .renditions import schedule_renditions
+
+    pk = instance.pk
+    transaction.on_commit(lambda: schedule_renditions(pk))
+
 
-    logger.info(f"Converting HEIC file to JPEG: {filename}")
+@receiver(post_delete, sender=ItemImage)
+def remove_from_similarity_index(sender, instance, **kwargs):
+    """
+    Signal handler to drop a deleted image from the similarity index.
+    """
+    from .similarity import get_similarity_index
 
     try:
-        # Read the file content
-        image_field.seek(0)
-        file_content = image_field.read()
-        image_field.seek(0)
-
-        # Open with Pillow (which now supports HEIC via pillow-heif)
-        img = Image.open(BytesIO(file_content))
-
-        # Convert to RGB if necessary
-        if img.mode in ("RGBA", "LA", "P"):
-            rgb_img = Image.new("RGB", img.size, (255, 255, 255))
-            if img.mode == "P":
-                img = img.convert("RGBA")
-            rgb_img.paste(img, mask=img.split()[3] if img.mode == "RGBA" else None)
-            img = rgb_img
-        elif img.mode != "RGB":
-            img = img.convert("RGB")
-
-        # Save to JPEG format in memory
-        output = BytesIO()
-        img.save(output, format="JPEG", quality=95, optimize=True)
-        output.seek(0)
-
-        # Update the filename to .jpg
-        base_name = os.path.splitext(filename)[0]
-        new_filename = f"{base_name}.jpg"
-
-        # Replace the file content
-        from django.core.files.base import ContentFile
-
-        instance.image.save(
-            new_filename,
-            ContentFile(output.read()),
-            save=False,  # Don't save yet, let Django handle it
-        )
-        logger.info(f"Successfully converted HEIC to JPEG: {new_filename}")
+        get_similarity_index().remove(instance.pk)
     except Exception as e:
-        logger.error(f"Error converting HEIC to JPEG: {e}", exc_info=True)
-        # Don't raise - allow the original file to be saved if conversion fails
+        logger.error(f"Error removing image {instance.pk} from similarity index: {e}", exc_info=True)
+
+
+@receiver(post_delete, sender=ItemImage)
+def delete_image_file(sender, instance, **kwargs):
+    """
+    Signal handler to delete the image file and its renditions once the row's deletion commits.
+    Files left behind by older deletions are swept by collect_orphaned_media.
+    """
+    if not instance.image:
+        return
+    storage = instance.image.storage
+    name = instance.image.name
+    renditions = instance.renditions
+
+    def _delete():
+        from .renditions import delete_renditions
+
+        try:
+            storage.delete(name)
+        except Exception as e:
+            logger.error(f"Error deleting image file {name}: {e}", exc_info=True)
+        delete_renditions(storage, renditions)
 
+    transaction.on_commit(_delete)
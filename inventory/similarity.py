@@ -0,0 +1,345 @@
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+from django.conf import settings
+from PIL import Image
+
+from .ingest import heif_available
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Feature layout: 8x3x3 HSV colour histogram + 8 gradient orientation bins
+# + 8 gradient magnitude bins.
+HUE_BINS = 8
+SAT_BINS = 3
+VAL_BINS = 3
+ORIENTATION_BINS = 8
+MAGNITUDE_BINS = 8
+FEATURE_DIM = HUE_BINS * SAT_BINS * VAL_BINS + ORIENTATION_BINS + MAGNITUDE_BINS
+
+SAMPLE_SIZE = (64, 64)
+INITIAL_CAPACITY = 256
+
+
+def compute_image_features(image_file) -> Optional[np.ndarray]:
+    """
+    Compute a compact colour/texture descriptor for an image.
+
+    Returns an L2-normalised float32 vector of length FEATURE_DIM, so the
+    cosine similarity of two images is a plain dot product. Returns None if
+    the file cannot be decoded.
+    """
+    heif_available()
+    try:
+        if hasattr(image_file, "seek"):
+            image_file.seek(0)
+        img = Image.open(image_file)
+        # Let the JPEG decoder downscale while decoding instead of
+        # materialising the full-resolution camera image.
+        img.draft("RGB", (SAMPLE_SIZE[0] * 4, SAMPLE_SIZE[1] * 4))
+        img = img.convert("RGB").resize(SAMPLE_SIZE, Image.BILINEAR)
+    except Exception:
+        logger.exception("Failed to decode image for similarity features")
+        return None
+    finally:
+        if hasattr(image_file, "seek"):
+            try:
+                image_file.seek(0)
+            except Exception:
+                pass
+
+    hsv = np.asarray(img.convert("HSV"), dtype=np.uint16)
+    h = (hsv[..., 0] * HUE_BINS) >> 8
+    s = (hsv[..., 1] * SAT_BINS) >> 8
+    v = (hsv[..., 2] * VAL_BINS) >> 8
+    colour_idx = (h * SAT_BINS + s) * VAL_BINS + v
+    colour_hist = np.bincount(
+        colour_idx.ravel(), minlength=HUE_BINS * SAT_BINS * VAL_BINS
+    ).astype(np.float32)
+    colour_hist /= colour_hist.sum() or 1.0
+
+    gray = np.asarray(img.convert("L"), dtype=np.float32) / 255.0
+    gx = gray[:-1, 1:] - gray[:-1, :-1]
+    gy = gray[1:, :-1] - gray[:-1, :-1]
+    magnitude = np.hypot(gx, gy).ravel()
+    orientation = np.arctan2(gy, gx).ravel() % np.pi
+    orient_idx = np.minimum((orientation / np.pi * ORIENTATION_BINS).astype(np.int64), ORIENTATION_BINS - 1)
+    orient_hist = np.bincount(orient_idx, weights=magnitude, minlength=ORIENTATION_BINS).astype(np.float32)
+    orient_hist /= orient_hist.sum() or 1.0
+    mag_idx = np.minimum((magnitude * 2 * MAGNITUDE_BINS).astype(np.int64), MAGNITUDE_BINS - 1)
+    mag_hist = np.bincount(mag_idx, minlength=MAGNITUDE_BINS).astype(np.float32)
+    mag_hist /= mag_hist.sum() or 1.0
+
+    # Hellinger mapping (sqrt) keeps dominant bins from swamping the dot product.
+    features = np.sqrt(np.concatenate([colour_hist, orient_hist, mag_hist]))
+    norm = np.linalg.norm(features)
+    if norm == 0:
+        return None
+    return (features / norm).astype(np.float32)
+
+
+class ImageSimilarityIndex:
+    """
+    Memory-mapped float32 matrix of image feature vectors.
+
+    Row ``i`` of ``vectors.f32`` holds the features of the ItemImage whose
+    primary key is ``ids[i]``; free rows have id -1 and are reused by later
+    inserts. The matrix grows by doubling, so adding or deleting one image
+    never rewrites the whole index.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    IDS_FILE = "ids.npy"
+    LOCK_FILE = ".lock"
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        self._ids_mtime = None
+        self._vectors = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._rows = {}
+
+    # -- storage helpers -------------------------------------------------
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.directory / self.VECTORS_FILE
+
+    @property
+    def _ids_path(self) -> Path:
+        return self.directory / self.IDS_FILE
+
+    def _file_lock(self):
+        return _FileLock(self.directory / self.LOCK_FILE)
+
+    def _refresh(self):
+        """Reload the id map (and remap vectors) if another process changed it."""
+        try:
+            mtime = self._ids_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._ids_mtime and (self._vectors is not None or mtime is None):
+            return
+        if mtime is None:
+            self._ids = np.empty(0, dtype=np.int64)
+            self._vectors = None
+        else:
+            self._ids = np.load(self._ids_path)
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r+", shape=(len(self._ids), FEATURE_DIM)
+            )
+        self._rows = {int(image_id): row for row, image_id in enumerate(self._ids) if image_id >= 0}
+        self._ids_mtime = mtime
+
+    def _save_ids(self):
+        tmp_path = self._ids_path.with_suffix(".tmp.npy")
+        np.save(tmp_path, self._ids)
+        os.replace(tmp_path, self._ids_path)
+        self._ids_mtime = self._ids_path.stat().st_mtime_ns
+
+    def _grow(self, capacity: int):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, "ab") as fh:
+            fh.truncate(capacity * FEATURE_DIM * np.dtype(np.float32).itemsize)
+        old_size = len(self._ids)
+        ids = np.full(capacity, -1, dtype=np.int64)
+        ids[:old_size] = self._ids
+        self._ids = ids
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, FEATURE_DIM))
+
+    # -- public API -----------------------------------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+    def indexed_ids(self) -> set:
+        """Return the ids of all images currently in the index."""
+        with self._lock:
+            self._refresh()
+            return set(self._rows)
+
+    def add(self, image_id: int, vector: np.ndarray):
+        """Insert or replace the vector for an image."""
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (FEATURE_DIM,):
+            raise ValueError(f"Expected a vector of length {FEATURE_DIM}, got {vector.shape}")
+        with self._lock, self._file_lock():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._ids_mtime = None
+            self._refresh()
+            row = self._rows.get(image_id)
+            if row is None:
+                free = np.flatnonzero(self._ids < 0)
+                if len(free):
+                    row = int(free[0])
+                else:
+                    row = len(self._ids)
+                    self._grow(max(INITIAL_CAPACITY, len(self._ids) * 2))
+            self._vectors[row] = vector
+            self._vectors.flush()
+            self._ids[row] = image_id
+            self._rows[image_id] = row
+            self._save_ids()
+
+    def remove(self, image_id: int):
+        """Free the row used by an image, if it is indexed."""
+        with self._lock, self._file_lock():
+            self._ids_mtime = None
+            self._refresh()
+            row = self._rows.pop(image_id, None)
+            if row is None:
+                return
+            self._vectors[row] = 0.0
+            self._vectors.flush()
+            self._ids[row] = -1
+            self._save_ids()
+
+    def get_vectors(self, image_ids: Iterable[int]) -> np.ndarray:
+        """Return the stored vectors for the given images (missing ids are skipped)."""
+        with self._lock:
+            self._refresh()
+            rows = [self._rows[i] for i in image_ids if i in self._rows]
+            if not rows:
+                return np.empty((0, FEATURE_DIM), dtype=np.float32)
+            return np.array(self._vectors[rows])
+
+    def query(self, vectors: np.ndarray, limit: int = 10, exclude_ids: Iterable[int] = ()):
+        """
+        Return up to ``limit`` ``(image_id, score)`` pairs most similar to
+        any of the query vectors, best first.
+
+        All query vectors are scored against the whole matrix in a single
+        matrix product; an image's score is its best match among them.
+        """
+        queries = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if queries.size == 0:
+            return []
+        with self._lock:
+            self._refresh()
+            if self._vectors is None or not self._rows:
+                return []
+            scores = (self._vectors @ queries.T).max(axis=1)
+            ids = self._ids.copy()
+
+        scores[ids < 0] = -np.inf
+        exclude = np.fromiter(exclude_ids, dtype=np.int64)
+        if exclude.size:
+            scores[np.isin(ids, exclude)] = -np.inf
+        candidates = np.flatnonzero(np.isfinite(scores))
+        if not candidates.size:
+            return []
+        if candidates.size > limit:
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(ids[row]), float(scores[row])) for row in candidates]
+
+
+class _FileLock:
+    """Advisory cross-process lock so concurrent workers don't interleave writes."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fh = None
+
+    def __enter__(self):
+        if fcntl is None:
+            return self
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, "a")
+        fcntl.flock(self._fh, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._fh is not None:
+            fcntl.flock(self._fh, fcntl.LOCK_UN)
+            self._fh.close()
+            self._fh = None
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_similarity_index() -> ImageSimilarityIndex:
+    """Return the process-wide index for the configured directory."""
+    directory = str(settings.IMAGE_SIMILARITY_INDEX_DIR)
+    with _indexes_lock:
+        index = _indexes.get(directory)
+        if index is None:
+            index = _indexes[directory] = ImageSimilarityIndex(directory)
+        return index
+
+
+def index_item_image(item_image) -> bool:
+    """Compute and store features for a saved ItemImage. Returns True on success."""
+    if not item_image.pk or not item_image.image:
+        return False
+    try:
+        with item_image.image.open("rb") as fh:
+            vector = compute_image_features(fh)
+    except Exception:
+        logger.warning("Could not open %s for similarity indexing", item_image.image.name)
+        return False
+    if vector is None:
+        return False
+    get_similarity_index().add(item_image.pk, vector)
+    return True
+
+
+def find_similar_items(item, limit: int = 6):
+    """Return up to ``limit`` FOUND items whose photos look like ``item``'s."""
+    index = get_similarity_index()
+    own_image_ids = list(item.images.values_list("pk", flat=True))
+    vectors = index.get_vectors(own_image_ids)
+    if not len(vectors):
+        return []
+    return _items_for_matches(
+        index.query(vectors, limit=limit * 4, exclude_ids=own_image_ids),
+        limit,
+        exclude_item_id=item.pk,
+    )
+
+
+def search_items_by_photo(image_file, limit: int = 20):
+    """Return up to ``limit`` FOUND items whose photos look like an uploaded photo."""
+    vector = compute_image_features(image_file)
+    if vector is None:
+        return []
+    return _items_for_matches(get_similarity_index().query(vector, limit=limit * 4), limit)
+
+
+def _items_for_matches(matches, limit, exclude_item_id=None):
+    """Collapse image-level matches into distinct items, best score first."""
+    from .models import Item, ItemImage
+
+    if not matches:
+        return []
+    image_to_item = dict(
+        ItemImage.objects.filter(pk__in=[image_id for image_id, _ in matches]).values_list("pk", "item_id")
+    )
+    ordered_item_ids = []
+    for image_id, _ in matches:
+        item_id = image_to_item.get(image_id)
+        if item_id is None or item_id == exclude_item_id or item_id in ordered_item_ids:
+            continue
+        ordered_item_ids.append(item_id)
+
+    items = Item.objects.filter(pk__in=ordered_item_ids, status=Item.Status.FOUND).prefetch_related("images")
+    items_by_id = {item.pk: item for item in items}
+    return [items_by_id[pk] for pk in ordered_item_ids if pk in items_by_id][:limit]
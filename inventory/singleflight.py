@@ -0,0 +1,147 @@
+"""
+Single-flight coordination of upload-page vision calls.
+
+The upload page re-analyses whenever a photo is added, removed or replaced,
+so adding photos one by one would otherwise start a vision call per photo,
+each holding the API (and under WSGI a worker) for seconds while only the
+last result is wanted. Calls are keyed by upload session:
+
+- a request identical to one already in flight for the session waits for
+  that call's result instead of making its own;
+- a request with different inputs supersedes the session's older call. The
+  older call is cancelled if it runs on the same event loop (always the
+  case under ASGI) and its result is discarded otherwise; its callers get
+  ``Superseded``.
+
+``stream`` does the same for an async generator: every caller sharing the
+call receives all of its items, including those produced before it joined.
+
+State is per process.
+"""
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+
+from .metrics import counters
+
+# Upload sessions whose newest request is remembered, least recently used dropped first
+MAX_SESSIONS = 1000
+# Marks the end of a shared stream in each subscriber's queue
+_END = object()
+
+
+class Superseded(Exception):
+    """A newer analysis request from the same upload session replaced this one."""
+
+
+class _Feed:
+    """Items of a shared stream: replayed to late subscribers, then delivered as they arrive."""
+
+    def __init__(self):
+        self.items = []
+        self.queues = []
+
+    def subscribe(self, task) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        for item in self.items:
+            queue.put_nowait(item)
+        if task.done():
+            queue.put_nowait(_END)
+        self.queues.append(queue)
+        return queue
+
+    async def consume(self, stream):
+        async for item in stream:
+            self.items.append(item)
+            for queue in self.queues:
+                queue.put_nowait(item)
+
+    def close(self, task):
+        for queue in self.queues:
+            queue.put_nowait(_END)
+
+
+class AnalysisCoordinator:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # session -> fingerprint of its newest request, across event loops
+        self._latest = OrderedDict()
+        # event loop -> {session: (fingerprint, task, feed or None)}; tasks cannot be awaited from another loop
+        self._in_flight = weakref.WeakKeyDictionary()
+
+    async def run(self, session: str, fingerprint: str, call):
+        """
+        Return the result of ``await call()``, sharing one call between
+        identical requests of ``session``. Raises ``Superseded`` if a newer
+        request of the session replaced this one first.
+        """
+        task, _ = self._join(session, fingerprint, call)
+        try:
+            # Shielded: one caller going away must not cancel the others' call.
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                raise Superseded()
+            raise
+        self._check_latest(session, fingerprint)
+        return result
+
+    async def stream(self, session: str, fingerprint: str, make_stream):
+        """
+        Yield the items of ``make_stream()``, an async generator, sharing one
+        stream between identical requests of ``session`` like ``run``. The
+        fingerprint must differ from those of ``run`` calls.
+        """
+        feed = _Feed()
+        task, feed = self._join(session, fingerprint, lambda: feed.consume(make_stream()), feed)
+        queue = feed.subscribe(task)
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            self._check_latest(session, fingerprint)
+            yield item
+        if task.cancelled():
+            raise Superseded()
+        if task.exception() is not None:
+            raise task.exception()
+
+    def _join(self, session, fingerprint, call, feed=None) -> tuple:
+        """Return ``(task, feed)`` of the session's identical call in flight, starting ``call()`` if there is none."""
+        with self._lock:
+            self._latest[session] = fingerprint
+            self._latest.move_to_end(session)
+            while len(self._latest) > MAX_SESSIONS:
+                self._latest.popitem(last=False)
+
+        calls = self._in_flight.setdefault(asyncio.get_running_loop(), {})
+        current = calls.get(session)
+        if current is not None and current[0] == fingerprint:
+            counters.increment("vision.calls_shared")
+            return current[1], current[2]
+        if current is not None:
+            current[1].cancel()
+            counters.increment("vision.calls_cancelled")
+        task = asyncio.ensure_future(call())
+        calls[session] = (fingerprint, task, feed)
+        task.add_done_callback(lambda done: self._forget(calls, session, done))
+        if feed is not None:
+            task.add_done_callback(feed.close)
+        return task, feed
+
+    def _check_latest(self, session, fingerprint):
+        with self._lock:
+            latest = self._latest.get(session, fingerprint)
+        if latest != fingerprint:
+            counters.increment("vision.results_discarded")
+            raise Superseded()
+
+    @staticmethod
+    def _forget(calls, session, task):
+        current = calls.get(session)
+        if current is not None and current[1] is task:
+            del calls[session]
+
+
+coordinator = AnalysisCoordinator()
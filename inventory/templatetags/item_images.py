@@ -0,0 +1,65 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from ..renditions import preferred_image_format
+
+register = template.Library()
+
+
+def image_candidates(item_image, image_format="jpeg") -> list:
+    """``(url, width)`` pairs for the renditions of ``image_format``, smallest first."""
+    if not item_image.renditions_current:
+        return []
+    storage = item_image.image.storage
+    names = item_image.renditions.get("formats", {}).get(image_format, {})
+    candidates = [(storage.url(name), int(width)) for width, name in names.items()]
+    # Formats without a full-size rendition (JPEG, AVIF) end with the original
+    if item_image.width and all(width != item_image.width for _, width in candidates):
+        candidates.append((item_image.image.url, item_image.width))
+    return sorted(candidates, key=lambda c: c[1])
+
+
+@register.simple_tag(takes_context=True)
+def responsive_image(context, item_image, alt="", sizes="100vw", css_class="", fit="contain", eager=False, defer=False, style=""):
+    """
+    Render an ``<img>`` for an ``ItemImage`` that picks a rendition through
+    ``srcset``/``sizes``, loads lazily and paints its blurred placeholder first.
+    The format (AVIF, WebP or JPEG) follows the request's ``Accept`` header, so
+    views using this tag must send ``Vary: Accept``.
+
+    ``eager`` is for images likely to be above the fold. ``defer`` leaves the
+    real source in ``data-src``/``data-srcset`` for page scripts to swap in
+    when the image is first shown, e.g. carousel slides after the first.
+    """
+    attrs = {
+        "alt": alt,
+        "class": css_class,
+        "sizes": sizes,
+        "decoding": "async",
+        "loading": "eager" if eager else "lazy",
+    }
+    if item_image.width and item_image.height:
+        attrs["width"] = item_image.width
+        attrs["height"] = item_image.height
+
+    offered = item_image.renditions.get("formats", {}) if item_image.renditions_current else {}
+    candidates = image_candidates(item_image, preferred_image_format(context.get("request"), offered))
+    srcset = ", ".join(f"{url} {width}w" for url, width in candidates)
+    src = candidates[-1][0] if candidates else item_image.image.url
+    if defer:
+        attrs["src"] = item_image.placeholder or "data:,"
+        attrs["data-src"] = src
+        if srcset:
+            attrs["data-srcset"] = srcset
+    else:
+        attrs["src"] = src
+        if srcset:
+            attrs["srcset"] = srcset
+        if item_image.placeholder:
+            style = (
+                f"background-image: url('{item_image.placeholder}'); background-size: {fit}; "
+                f"background-position: center; background-repeat: no-repeat; {style}"
+            )
+    if style:
+        attrs["style"] = style.strip()
+    return format_html("<img {}>", format_html_join(" ", '{}="{}"', attrs.items()))
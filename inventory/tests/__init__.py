@@ -1,2 +1,47 @@
+import shutil
+import tempfile
+from io import BytesIO
+from pathlib import Path
 
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
 
+from inventory.models import FacetCount
+
+
+def _image_file(size=(800, 600), name="photo.jpg", color=(30, 120, 200)):
+    """A solid-colour upload, encoded in the format ``name``'s extension names."""
+    image_format = Image.registered_extensions()[Path(name).suffix.lower()]
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format=image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=Image.MIME[image_format])
+
+
+def _counts(facet):
+    """The stored non-zero counts for one facet, as ``{value: count}``."""
+    return dict(FacetCount.objects.filter(facet=facet, count__gt=0).values_list("value", "count"))
+
+
+class TempMediaMixin:
+    """
+    Give each test its own throwaway directory, ``self.tmpdir``, and point
+    MEDIA_ROOT, the archive, the similarity index and upload staging inside
+    it. Extra settings for the same override go in ``media_settings``.
+    """
+
+    media_settings = {}
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=self.tmpdir / "media",
+            ARCHIVE_MEDIA_ROOT=self.tmpdir / "cold",
+            IMAGE_SIMILARITY_INDEX_DIR=self.tmpdir / "similarity",
+            UPLOAD_STAGING_DIR=self.tmpdir / "staging",
+            **self.media_settings,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
@@ -0,0 +1,125 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.admin import helpers
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.models import Item, ItemImage, Location
+from inventory.tests import _counts
+
+
+class ItemAdminTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.staff = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(self.staff)
+
+    def _item(self, **fields):
+        fields.setdefault("date_found", date.today())
+        fields.setdefault("category", Item.Category.ELECTRONICS)
+        fields.setdefault("created_by", self.staff)
+        return Item.objects.create(**fields)
+
+    def test_changelist_does_not_scan_items_for_filters_or_counts(self):
+        for n in range(3):
+            self._item(title=f"Phone {n}", location_found="Library")
+        self._item(title="Bottle", location_found="Gym")
+        url = reverse("admin:inventory_item_changelist")
+        self.client.get(url)  # warm the caches
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"location": "Library"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Gym")  # offered by the location filter
+        self.assertEqual(len(response.context["cl"].result_list), 3)
+        item_queries = [q["sql"] for q in queries if 'FROM "inventory_item"' in q["sql"]]
+        self.assertFalse([sql for sql in item_queries if "DISTINCT" in sql], item_queries)
+        # The filtered count, the page (with its creator joined) and nothing else
+        self.assertEqual(len(item_queries), 2, item_queries)
+        self.assertTrue(any('"auth_user"' in sql for sql in item_queries))
+
+    def test_recent_claims_count_is_cached(self):
+        self._item(
+            title="Phone", status=Item.Status.CLAIMED, claimed_by_name="Sam", claimed_at=timezone.now()
+        )
+        url = reverse("admin:inventory_item_changelist")
+        self.assertEqual(self.client.get(url).context["recent_claims_count"], 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse([q for q in queries if 'COUNT(*)' in q["sql"] and '"claimed_at" >=' in q["sql"]])
+
+    def test_mark_found_updates_the_selection_and_facet_counts(self):
+        now = timezone.now()
+        recent = self._item(
+            title="Phone", location_found="Library", status=Item.Status.CLAIMED,
+            claimed_by_name="Sam", claimed_at=now,
+        )
+        hidden = self._item(
+            title="Charger", location_found="Gym", status=Item.Status.CLAIMED,
+            claimed_by_name="Ana", claimed_at=now - timedelta(days=30),
+        )
+        untouched = self._item(title="Bottle", location_found="Gym")
+        self.assertEqual(_counts("category"), {"ELECTRONICS": 2})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("admin:inventory_item_changelist"), {
+                "action": "mark_found",
+                helpers.ACTION_CHECKBOX_NAME: [recent.pk, hidden.pk, untouched.pk],
+            })
+        self.assertEqual(response.status_code, 302)
+        updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "inventory_item"')]
+        self.assertEqual(len(updates), 1)
+
+        for item in (recent, hidden):
+            item.refresh_from_db()
+            self.assertEqual(item.status, Item.Status.FOUND)
+            self.assertEqual(item.claimed_by_name, "")
+            self.assertIsNone(item.claimed_at)
+        self.assertEqual(_counts("category"), {"ELECTRONICS": 3})
+        self.assertEqual(_counts("location"), {"Library": 1, "Gym": 2})
+
+
+class LocationAdminTests(TestCase):
+    def test_merge_action_folds_into_the_location_with_most_items(self):
+        staff = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(staff)
+        for spelling in ("Library", "Library", "Lib"):
+            with self.captureOnCommitCallbacks(execute=True):
+                Item.objects.create(title="Phone", date_found=date.today(), location_found=spelling)
+        url = reverse("admin:inventory_location_changelist")
+        self.assertContains(self.client.get(url), "Lib")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {
+                "action": "merge_selected",
+                helpers.ACTION_CHECKBOX_NAME: list(Location.objects.values_list("pk", flat=True)),
+            })
+        library = Location.objects.get()
+        self.assertEqual(library.name, "Library")
+        self.assertEqual(list(library.aliases.values_list("alias", flat=True)), ["lib"])
+        self.assertEqual(library.items.count(), 3)
+
+
+class ItemImageAdminTests(TestCase):
+    def test_changelist_joins_items_and_edit_form_uses_autocomplete(self):
+        staff = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(staff)
+        for n in range(3):
+            item = Item.objects.create(title=f"Phone {n}", date_found=date.today())
+            ItemImage.objects.bulk_create([ItemImage(item=item, image=f"items/{n}.jpg")])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("admin:inventory_itemimage_changelist"))
+        self.assertContains(response, "Phone 2")
+        self.assertFalse([q for q in queries if q["sql"].startswith('SELECT "inventory_item"')])
+
+        image = ItemImage.objects.first()
+        response = self.client.get(reverse("admin:inventory_itemimage_change", args=[image.pk]))
+        self.assertContains(response, "admin-autocomplete")
+        self.assertNotContains(response, "Phone 1</option>")
@@ -0,0 +1,41 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+MANIFEST_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+}
+
+
+class StaticAssetTests(SimpleTestCase):
+    def test_templates_do_not_load_runtime_cdns(self):
+        for template in (settings.BASE_DIR / "templates").rglob("*.html"):
+            source = template.read_text()
+            for host in ("cdn.tailwindcss.com", "cdn.jsdelivr.net"):
+                self.assertNotIn(host, source, f"{template.name} loads {host}")
+
+    def test_collectstatic_hashes_and_precompresses_assets(self):
+        static_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, static_root, ignore_errors=True)
+        with override_settings(STATIC_ROOT=static_root, STORAGES=MANIFEST_STORAGES):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            manifest = json.loads((static_root / "staticfiles.json").read_text())["paths"]
+            hashed = manifest["css/app.css"]
+            self.assertRegex(hashed, r"^css/app\.[0-9a-f]{12}\.css$")
+            self.assertTrue((static_root / f"{hashed}.gz").exists())
+            self.assertTrue((static_root / f"{hashed}.br").exists())
+
+            middleware = WhiteNoiseMiddleware(lambda request: None)
+            request = RequestFactory().get(f"/static/{hashed}", HTTP_ACCEPT_ENCODING="br, gzip")
+            response = middleware(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=315360000", response["Cache-Control"])
@@ -0,0 +1,262 @@
+import json
+import os
+import time
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from inventory.models import AnalysisSuggestion, ArchivedItem, Claim, Item, ItemImage, LostReport
+from inventory.tests import TempMediaMixin, _image_file
+
+
+class ReanalyzeItemsCommandTests(TempMediaMixin, TestCase):
+    media_settings = {"GOOGLE_API_KEY": "test-key"}
+
+    def setUp(self):
+        super().setUp()
+        self.checkpoint = self.tmpdir / "checkpoint.json"
+
+        self.misc = self._item("Thing", Item.Category.OTHER_MISC, "Some description")
+        self.undescribed = self._item("Bottle", Item.Category.BOTTLES_AND_CONTAINERS, "")
+        self.good = self._item("Laptop", Item.Category.ELECTRONICS, "Silver laptop")
+
+    def _item(self, title, category, description):
+        item = Item.objects.create(title=title, category=category, description=description, date_found=date.today())
+        ItemImage.objects.create(item=item, image=_image_file(size=(10, 10), name="photo.png"))
+        return item
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command(
+            "reanalyze_items", "--rate", "0", "--checkpoint", str(self.checkpoint), "--batch-size", "1", *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    @patch("inventory.services.analyze_item_images")
+    def test_writes_suggestions_without_touching_items(self, mock_analyze):
+        mock_analyze.return_value = {"title": "Blue Flask", "description": "Dented", "category": "BOTTLES_AND_CONTAINERS"}
+
+        output = self._run()
+
+        self.assertEqual(mock_analyze.call_count, 2)
+        self.assertEqual(
+            set(AnalysisSuggestion.objects.values_list("item_id", flat=True)),
+            {self.misc.pk, self.undescribed.pk},
+        )
+        self.misc.refresh_from_db()
+        self.assertEqual(self.misc.title, "Thing")
+        self.assertIn("0 error(s)", output)
+        self.assertFalse(self.checkpoint.exists())
+
+    @patch("inventory.services.analyze_item_images")
+    def test_counts_errors(self, mock_analyze):
+        mock_analyze.return_value = {}
+        output = self._run()
+        self.assertFalse(AnalysisSuggestion.objects.exists())
+        self.assertIn("2 error(s)", output)
+
+    @patch("inventory.services.analyze_item_images")
+    def test_resumes_from_checkpoint(self, mock_analyze):
+        mock_analyze.return_value = {"title": "Flask", "description": "", "category": "OTHER_MISC"}
+        self.checkpoint.write_text(json.dumps({"last_pk": self.misc.pk}))
+
+        output = self._run()
+
+        self.assertIn(f"Resuming after item {self.misc.pk}", output)
+        self.assertEqual(list(AnalysisSuggestion.objects.values_list("item_id", flat=True)), [self.undescribed.pk])
+
+    @patch("inventory.services.analyze_item_images")
+    def test_limited_run_keeps_its_checkpoint_for_the_next(self, mock_analyze):
+        mock_analyze.return_value = {"title": "Flask", "description": "", "category": "OTHER_MISC"}
+
+        self._run("--limit", "1")
+        self.assertEqual(json.loads(self.checkpoint.read_text())["last_pk"], self.misc.pk)
+
+        output = self._run()
+        self.assertIn(f"Resuming after item {self.misc.pk}", output)
+        self.assertEqual(mock_analyze.call_count, 2)
+        self.assertEqual(AnalysisSuggestion.objects.count(), 2)
+        self.assertFalse(self.checkpoint.exists())
+
+    @patch("inventory.management.commands.reanalyze_items.analyze_items_batch")
+    def test_batches_items_into_one_call(self, mock_batch):
+        mock_batch.side_effect = lambda items, throttle: {pk: {"title": "T", "description": "", "category": "OTHER_MISC"} for pk in items}
+
+        self._run("--batch-size", "5")
+
+        mock_batch.assert_called_once()
+        self.assertEqual(set(mock_batch.call_args[0][0]), {self.misc.pk, self.undescribed.pk})
+        self.assertEqual(AnalysisSuggestion.objects.count(), 2)
+
+    def test_requires_api_key(self):
+        with override_settings(GOOGLE_API_KEY=""):
+            with self.assertRaises(CommandError):
+                self._run()
+
+    def test_applying_a_suggestion_updates_the_item(self):
+        suggestion = AnalysisSuggestion.objects.create(
+            item=self.misc, title="Steel Bottle", description="", category=Item.Category.BOTTLES_AND_CONTAINERS
+        )
+        suggestion.apply()
+        self.misc.refresh_from_db()
+        self.assertEqual(self.misc.title, "Steel Bottle")
+        self.assertEqual(self.misc.description, "Some description")
+        self.assertEqual(self.misc.category, Item.Category.BOTTLES_AND_CONTAINERS)
+        self.assertEqual(suggestion.status, AnalysisSuggestion.Status.APPLIED)
+
+
+class ArchiveExpiredItemsCommandTests(TempMediaMixin, TestCase):
+    media_settings = {"ITEM_RETENTION_DAYS": 30}
+
+    def setUp(self):
+        super().setUp()
+        long_ago = timezone.now() - timedelta(days=60)
+        self.expired = self._claimed_item("Old Bottle", Item.Category.BOTTLES_AND_CONTAINERS, long_ago)
+        Claim.objects.create(item=self.expired, claimant_name="Asha")
+        self.recent = self._claimed_item("New Laptop", Item.Category.ELECTRONICS, timezone.now() - timedelta(days=10))
+        self.found = Item.objects.create(title="Cap", date_found=date.today())
+
+    def _claimed_item(self, title, category, claimed_at):
+        item = Item.objects.create(
+            title=title,
+            category=category,
+            date_found=date.today(),
+            status=Item.Status.CLAIMED,
+            claimed_by_name="Asha",
+            claimed_at=claimed_at,
+        )
+        ItemImage.objects.create(item=item, image=_image_file(size=(10, 10), name=f"{title}.png"))
+        return item
+
+    def test_moves_expired_items_claims_and_media(self):
+        image_name = self.expired.images.get().image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("archive_expired_items", stdout=StringIO())
+
+        self.assertFalse(Item.objects.filter(pk=self.expired.pk).exists())
+        self.assertTrue(Item.objects.filter(pk=self.recent.pk).exists())
+        self.assertTrue(Item.objects.filter(pk=self.found.pk).exists())
+
+        archived = ArchivedItem.objects.get(original_id=self.expired.pk)
+        self.assertEqual(archived.title, "Old Bottle")
+        self.assertEqual(list(archived.claims.values_list("claimant_name", flat=True)), ["Asha"])
+        self.assertEqual(len(archived.media), 1)
+        self.assertTrue((self.tmpdir / "cold" / archived.media[0]).exists())
+        self.assertFalse((self.tmpdir / "media" / image_name).exists())
+
+    def test_already_archived_item_is_removed_without_copying_again(self):
+        ArchivedItem.objects.create(
+            original_id=self.expired.pk, title="Old Bottle", date_found=date.today(),
+            created_at=self.expired.created_at, media=["earlier.png"],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("archive_expired_items", stdout=StringIO())
+
+        self.assertFalse(Item.objects.filter(pk=self.expired.pk).exists())
+        self.assertEqual(ArchivedItem.objects.get().media, ["earlier.png"])
+        self.assertFalse(list(self.tmpdir.glob("cold/**/*.png")))
+
+    def test_compress_reencodes_as_jpeg(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("archive_expired_items", "--compress", stdout=StringIO())
+        archived = ArchivedItem.objects.get(original_id=self.expired.pk)
+        self.assertTrue(archived.media[0].endswith(".jpg"))
+
+    def test_dry_run_changes_nothing(self):
+        out = StringIO()
+        call_command("archive_expired_items", "--dry-run", stdout=out)
+        self.assertIn("1 item(s) would be archived", out.getvalue())
+        self.assertTrue(Item.objects.filter(pk=self.expired.pk).exists())
+        self.assertFalse(ArchivedItem.objects.exists())
+
+
+class CollectOrphanedMediaCommandTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        item = Item.objects.create(title="Cap", date_found=date.today())
+        item_image = ItemImage.objects.create(item=item, image=_image_file(size=(10, 10), name="photo.png"))
+        self.referenced = self.tmpdir / "media" / item_image.image.name
+        self.old_orphan = self._write("item_images/old_orphan.jpg", age_hours=48)
+        self.new_orphan = self._write("item_images/new_orphan.jpg", age_hours=1)
+        self._age(self.referenced, 48)
+
+    def _write(self, name, age_hours):
+        path = self.tmpdir / "media" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 10)
+        self._age(path, age_hours)
+        return path
+
+    def _age(self, path, hours):
+        mtime = time.time() - hours * 3600
+        os.utime(path, (mtime, mtime))
+
+    def test_reports_without_deleting_by_default(self):
+        out = StringIO()
+        call_command("collect_orphaned_media", "--chunk-size", "1", stdout=out)
+        self.assertIn("1 orphan(s)", out.getvalue())
+        self.assertTrue(self.old_orphan.exists())
+
+    def test_deletes_only_old_unreferenced_files(self):
+        call_command("collect_orphaned_media", "--delete", stdout=StringIO())
+        self.assertFalse(self.old_orphan.exists())
+        self.assertTrue(self.new_orphan.exists())
+        self.assertTrue(self.referenced.exists())
+
+    def test_scans_renditions_against_the_names_each_image_lists(self):
+        item_image = ItemImage.objects.get()
+        stem = Path(item_image.image.name).stem
+        live = self._write(f"renditions/{stem}_0123456789ab_320w.jpg", age_hours=48)
+        stale = self._write(f"renditions/{stem}_ba9876543210_320w.jpg", age_hours=48)
+        unrelated = self._write("renditions/gone_0123456789ab_640w.webp", age_hours=48)
+        ItemImage.objects.filter(pk=item_image.pk).update(renditions={
+            "source": item_image.image.name, "formats": {"jpeg": {"320": f"renditions/{live.name}"}},
+        })
+
+        call_command("collect_orphaned_media", "--delete", stdout=StringIO())
+
+        self.assertTrue(live.exists())
+        self.assertFalse(stale.exists())
+        self.assertFalse(unrelated.exists())
+        self.assertFalse(self.old_orphan.exists())
+
+    def test_lost_report_photos_are_references(self):
+        photo = self._write("lost_reports/scarf.jpg", age_hours=48)
+        orphan = self._write("lost_reports/gone.jpg", age_hours=48)
+        LostReport.objects.bulk_create([LostReport(
+            description="Red scarf", lost_from=date.today(), lost_to=date.today(),
+            reporter_name="Sam", photo="lost_reports/scarf.jpg",
+        )])
+
+        call_command("collect_orphaned_media", "--delete", stdout=StringIO())
+
+        self.assertTrue(photo.exists())
+        self.assertFalse(orphan.exists())
+
+    def test_delete_purges_abandoned_staged_uploads(self):
+        staging = self.tmpdir / "staging"
+        staging.mkdir()
+        abandoned = staging / "abandoned-upload-token.part"
+        abandoned.write_bytes(b"x" * 10)
+        (staging / "abandoned-upload-token.json").write_text("{}")
+        self._age(abandoned, 48)
+        in_progress = staging / "in-progress-upload-token.part"
+        in_progress.write_bytes(b"x" * 10)
+
+        call_command("collect_orphaned_media", "--delete", stdout=StringIO())
+
+        self.assertEqual(sorted(p.name for p in staging.iterdir()), ["in-progress-upload-token.part"])
+
+    def test_deleting_an_item_removes_its_files(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Item.objects.get(title="Cap").delete()
+        self.assertFalse(self.referenced.exists())
@@ -0,0 +1,83 @@
+import importlib
+from datetime import date, timedelta
+from io import StringIO
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.facets import get_facet_counts
+from inventory.models import AnalysisSuggestion, Item
+from inventory.tests import _counts
+
+facet_migration = importlib.import_module("inventory.migrations.0011_facetcount")
+
+
+class FacetCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _item(self, **fields):
+        fields.setdefault("date_found", date.today())
+        fields.setdefault("category", Item.Category.ELECTRONICS)
+        return Item.objects.create(**fields)
+
+    def test_counts_follow_item_changes(self):
+        phone = self._item(title="Phone", location_found="Library ")
+        self._item(title="Charger", location_found="Gym")
+        self._item(title="Bottle", category=Item.Category.BOTTLES_AND_CONTAINERS, location_found="Gym")
+        self.assertEqual(_counts("category"), {"ELECTRONICS": 2, "BOTTLES_AND_CONTAINERS": 1})
+        self.assertEqual(_counts("location"), {"Library": 1, "Gym": 2})
+
+        # Recategorised by an applied suggestion
+        AnalysisSuggestion.objects.create(item=phone, category=Item.Category.OTHER_MISC).apply()
+        self.assertEqual(_counts("category"), {"ELECTRONICS": 1, "BOTTLES_AND_CONTAINERS": 1, "OTHER_MISC": 1})
+
+        phone.delete()
+        self.assertEqual(_counts("category"), {"ELECTRONICS": 1, "BOTTLES_AND_CONTAINERS": 1})
+        self.assertEqual(_counts("location"), {"Gym": 2})
+
+    def test_claim_keeps_item_counted_until_its_window_passes(self):
+        item = self._item(title="Bag", category=Item.Category.BAGS_AND_CARRY)
+        Client().post(reverse("inventory:claim_item", args=[item.pk]), {"name": "Sam"})
+        self.assertEqual(_counts("category"), {"BAGS_AND_CARRY": 1})
+
+        # Bags stay visible for one day after being claimed.
+        Item.objects.filter(pk=item.pk).update(claimed_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(_counts("category"), {"BAGS_AND_CARRY": 1})
+
+        out = StringIO()
+        call_command("reconcile_facet_counts", stdout=out)
+        self.assertIn("1 row(s) corrected", out.getvalue())
+        self.assertEqual(_counts("category"), {})
+
+    def test_browse_page_reads_cached_counts(self):
+        self._item(title="Phone", location_found="Library")
+        self._item(title="Tablet", location_found="Library")
+        with self.captureOnCommitCallbacks(execute=True):
+            self._item(title="Laptop")
+
+        self.assertEqual(get_facet_counts()["total"], 3)
+        with self.assertNumQueries(0):
+            counts = get_facet_counts()
+        self.assertEqual(counts["category"], {"ELECTRONICS": 3})
+        self.assertEqual(counts["location"], [("Library", 2)])
+
+        response = Client().get(reverse("inventory:item_list"))
+        self.assertContains(response, "?location=Library")
+        self.assertEqual(response.context["facet_counts"]["category"]["ELECTRONICS"], 3)
+
+    def test_migration_seeds_counts_for_existing_items(self):
+        Item.objects.bulk_create([
+            Item(title="Phone", date_found=date.today(), category=Item.Category.ELECTRONICS),
+            Item(title="Old bag", date_found=date.today(), category=Item.Category.BAGS_AND_CARRY,
+                 status=Item.Status.CLAIMED, claimed_at=timezone.now() - timedelta(days=2)),
+        ])
+
+        facet_migration.seed_facet_counts(apps, None)
+
+        self.assertEqual(_counts("category"), {"ELECTRONICS": 1})
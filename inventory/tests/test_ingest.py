@@ -0,0 +1,123 @@
+import json
+from datetime import date
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from PIL import Image, ImageCms
+
+from inventory.models import Item, ItemImage
+from inventory.tests import TempMediaMixin
+
+EXIF_ORIENTATION = 0x0112
+EXIF_MAKE = 0x010F
+
+
+def _phone_photo_bytes():
+    """A 60x40 JPEG that should be displayed rotated (orientation 6) and carries camera metadata."""
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    exif[EXIF_MAKE] = "PhoneMaker"
+    buffer = BytesIO()
+    Image.new("RGB", (60, 40), (200, 40, 40)).save(buffer, format="JPEG", exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class IngestNormalizationTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.item = Item.objects.create(title="Red Wallet", date_found=date.today())
+
+    def _stored(self, item_image):
+        return Image.open(self.tmpdir / "media" / item_image.image.name)
+
+    def test_phone_photo_is_rotated_and_stripped(self):
+        item_image = ItemImage.objects.create(
+            item=self.item, image=SimpleUploadedFile("phone.jpg", _phone_photo_bytes(), content_type="image/jpeg")
+        )
+        self.assertIsNotNone(item_image.normalized_at)
+        with self._stored(item_image) as img:
+            self.assertEqual(img.size, (40, 60))
+            self.assertNotIn("exif", img.info)
+            self.assertEqual(dict(img.getexif()), {})
+
+    def test_clean_jpeg_is_stored_unchanged(self):
+        buffer = BytesIO()
+        Image.new("RGB", (30, 20), "blue").save(buffer, format="JPEG")
+        item_image = ItemImage.objects.create(
+            item=self.item, image=SimpleUploadedFile("clean.jpg", buffer.getvalue(), content_type="image/jpeg")
+        )
+        self.assertIsNotNone(item_image.normalized_at)
+        self.assertEqual((self.tmpdir / "media" / item_image.image.name).read_bytes(), buffer.getvalue())
+
+    def test_transparent_png_keeps_alpha_without_profile(self):
+        buffer = BytesIO()
+        profile = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+        Image.new("RGBA", (20, 20), (0, 0, 255, 128)).save(buffer, format="PNG", icc_profile=profile)
+        item_image = ItemImage.objects.create(
+            item=self.item, image=SimpleUploadedFile("logo.png", buffer.getvalue(), content_type="image/png")
+        )
+        with self._stored(item_image) as img:
+            self.assertEqual((img.format, img.mode), ("PNG", "RGBA"))
+            self.assertNotIn("icc_profile", img.info)
+
+    def test_staged_upload_is_normalised_once(self):
+        User = get_user_model()
+        User.objects.create_user(username="staff", password="pw", is_staff=True)
+        client = Client()
+        client.login(username="staff", password="pw")
+        data = _phone_photo_bytes()
+
+        token = client.post(
+            reverse("inventory:upload_staging"),
+            data=json.dumps({"filename": "phone.jpg", "size": len(data)}),
+            content_type="application/json",
+        ).json()["token"]
+        status = client.put(
+            reverse("inventory:staged_upload", args=[token]),
+            data=data,
+            content_type="application/octet-stream",
+            HTTP_UPLOAD_OFFSET="0",
+        ).json()
+        self.assertTrue(status["complete"])
+        self.assertEqual((status["width"], status["height"]), (40, 60))
+        normalized_bytes = (self.tmpdir / "staging" / f"{token}.part").read_bytes()
+
+        client.post(reverse("inventory:item_upload"), {
+            "title": "Red Wallet",
+            "location_found": "Gym",
+            "date_found": date.today(),
+            "status": Item.Status.FOUND,
+            "category": Item.Category.OTHER_MISC,
+            "images-TOTAL_FORMS": "0",
+            "images-INITIAL_FORMS": "0",
+            "images-MIN_NUM_FORMS": "0",
+            "images-MAX_NUM_FORMS": "3",
+            "staged_tokens": [token],
+        })
+
+        item_image = ItemImage.objects.get(item__created_by__username="staff")
+        self.assertIsNotNone(item_image.normalized_at)
+        self.assertEqual((self.tmpdir / "media" / item_image.image.name).read_bytes(), normalized_bytes)
+
+    def test_normalize_images_command_backfills_old_uploads(self):
+        item_image = ItemImage.objects.create(
+            item=self.item, image=SimpleUploadedFile("old.jpg", _phone_photo_bytes(), content_type="image/jpeg")
+        )
+        # Simulate an image stored before the ingest stage existed.
+        (self.tmpdir / "media" / item_image.image.name).write_bytes(_phone_photo_bytes())
+        ItemImage.objects.filter(pk=item_image.pk).update(normalized_at=None)
+
+        out = StringIO()
+        call_command("normalize_images", stdout=out)
+
+        self.assertIn("Normalised 1 image(s)", out.getvalue())
+        item_image.refresh_from_db()
+        self.assertIsNotNone(item_image.normalized_at)
+        self.assertTrue(item_image.renditions_current)
+        with self._stored(item_image) as img:
+            self.assertEqual(img.size, (40, 60))
+            self.assertNotIn("exif", img.info)
@@ -0,0 +1,131 @@
+import importlib
+from datetime import date
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from inventory.locations import cluster_locations, location_key, location_suggestions, merge_locations
+from inventory.models import Item, Location, LocationAlias
+from inventory.tests import _counts
+
+cluster_migration = importlib.import_module("inventory.migrations.0017_cluster_locations")
+
+
+class ClusterTests(TestCase):
+    def test_location_key(self):
+        self.assertEqual(location_key("  Library (2nd Floor) "), "library 2nd floor")
+        self.assertEqual(location_key("--"), "")
+
+    def test_variants_cluster_under_the_most_used_spelling(self):
+        clusters = cluster_locations({
+            "Library": 5, "library ": 2, "LIBRARY": 1, "Lib 2nd floor": 1, "Libary": 1,
+            "Gym": 3, "Room 101": 1, "room 102": 1, "": 4,
+        })
+        self.assertEqual(clusters, {
+            "Library": ["LIBRARY", "Lib 2nd floor", "Libary", "Library", "library"],
+            "Gym": ["Gym"],
+            "Room 101": ["Room 101"],
+            "room 102": ["room 102"],
+        })
+
+
+class LocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _item(self, **fields):
+        fields.setdefault("title", "Phone")
+        fields.setdefault("date_found", date.today())
+        fields.setdefault("category", Item.Category.ELECTRONICS)
+        with self.captureOnCommitCallbacks(execute=True):
+            return Item.objects.create(**fields)
+
+    def test_items_link_to_a_location_by_key_or_alias(self):
+        library = self._item(location_found="Library").location
+        LocationAlias.objects.create(location=library, alias="lib 2nd floor")
+
+        self.assertEqual(self._item(location_found=" library").location, library)
+        self.assertEqual(self._item(location_found="Lib (2nd floor)").location, library)
+        self.assertIsNone(self._item(location_found="").location)
+
+        gym = self._item(location_found="Gym")
+        self.assertEqual(gym.location.name, "Gym")
+        gym.location_found = "library"
+        with self.captureOnCommitCallbacks(execute=True):
+            gym.save()
+        self.assertEqual(gym.location, library)
+        self.assertEqual(_counts("location"), {"Library": 4})
+
+    def test_saving_an_item_reads_its_stored_row_once(self):
+        item = self._item(location_found="Library")
+        item.title = "Black phone"
+        with CaptureQueriesContext(connection) as queries:
+            item.save()
+        selects = [q["sql"] for q in queries if q["sql"].startswith('SELECT "inventory_item"')]
+        self.assertEqual(len(selects), 1, selects)
+
+    def test_browse_filters_on_the_location(self):
+        library = self._item(location_found="Library").location
+        LocationAlias.objects.create(location=library, alias="lib")
+        self._item(title="Charger", location_found="lib")
+        self._item(title="Bottle", location_found="Gym")
+        url = reverse("inventory:item_list")
+
+        response = self.client.get(url, {"location": "LIB"})
+        self.assertEqual({item.title for item in response.context["items"]}, {"Phone", "Charger"})
+        self.assertEqual(response.context["current_location"], "Library")
+        # Exact, not substring
+        self.assertEqual(list(self.client.get(url, {"location": "brary"}).context["items"]), [])
+
+    def test_autocomplete_by_prefix_is_cached_until_locations_change(self):
+        for spelling in ("Library", "Library", "Lecture hall", "Gym"):
+            self._item(location_found=spelling)
+        LocationAlias.objects.create(location=Location.objects.get(name="Gym"), alias="leisure centre")
+        url = reverse("inventory:location_autocomplete")
+
+        response = self.client.get(url, {"q": "L"})
+        self.assertEqual(response.json(), {"results": ["Library", "Gym", "Lecture hall"]})
+        self.assertIn("max-age", response["Cache-Control"])
+        self.assertEqual(self.client.get(url, {"q": "lib"}).json(), {"results": ["Library"]})
+        self.assertEqual(self.client.get(url, {"q": ""}).json(), {"results": []})
+
+        with CaptureQueriesContext(connection) as queries:
+            location_suggestions("l")
+        self.assertEqual(len(queries), 0)
+
+        self._item(location_found="Lab 3")
+        self.assertIn("Lab 3", location_suggestions("l"))
+
+    def test_merge_moves_items_facets_and_spellings(self):
+        library = self._item(location_found="Library").location
+        self._item(location_found="Library")
+        lib = self._item(location_found="Lib").location
+        self.assertEqual(_counts("location"), {"Library": 2, "Lib": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(merge_locations(library, [lib]), 1)
+
+        self.assertEqual(Item.objects.filter(location=library).count(), 3)
+        self.assertFalse(Location.objects.filter(pk=lib.pk).exists())
+        self.assertEqual(_counts("location"), {"Library": 3})
+        self.assertEqual(self._item(location_found="lib").location, library)
+
+    def test_data_migration_clusters_existing_items(self):
+        Item.objects.bulk_create([
+            Item(title=f"Item {n}", date_found=date.today(), location_found=spelling)
+            for n, spelling in enumerate(["Library", "library ", "Lib 2nd floor", "Gym", ""])
+        ])
+
+        cluster_migration.link_locations(apps, None)
+
+        library = Location.objects.get(name="Library")
+        self.assertEqual(set(library.aliases.values_list("alias", flat=True)), {"lib 2nd floor"})
+        self.assertEqual(library.items.count(), 3)
+        self.assertEqual(Location.objects.get(name="Gym").items.count(), 1)
+        self.assertEqual(_counts("location"), {"Library": 3, "Gym": 1})
+        self.assertEqual(_counts("category"), {"OTHER_MISC": 5})
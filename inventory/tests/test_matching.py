@@ -0,0 +1,130 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from inventory.matching import candidate_reports, score_match
+from inventory.models import Item, LostReport, ReportMatch, ReportTerm
+
+TODAY = date.today()
+
+
+class MatchingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _report(self, **fields):
+        fields.setdefault("description", "Black Hydro Flask water bottle with a dent")
+        fields.setdefault("category", Item.Category.BOTTLES_AND_CONTAINERS)
+        fields.setdefault("lost_from", TODAY - timedelta(days=2))
+        fields.setdefault("lost_to", TODAY - timedelta(days=1))
+        fields.setdefault("location", "Gym")
+        fields.setdefault("reporter_name", "Sam")
+        with self.captureOnCommitCallbacks(execute=True):
+            return LostReport.objects.create(**fields)
+
+    def _item(self, **fields):
+        fields.setdefault("title", "Black Hydro Flask")
+        fields.setdefault("description", "Dented bottle")
+        fields.setdefault("category", Item.Category.BOTTLES_AND_CONTAINERS)
+        fields.setdefault("date_found", TODAY)
+        fields.setdefault("location_found", "Gym")
+        with self.captureOnCommitCallbacks(execute=True):
+            return Item.objects.create(**fields)
+
+    def test_new_item_is_matched_against_indexed_reports(self):
+        report = self._report()
+        self.assertIn("flask", ReportTerm.objects.filter(report=report).values_list("term", flat=True))
+        self._report(description="Blue umbrella", category=Item.Category.OTHER_MISC)
+
+        item = self._item()
+
+        match = ReportMatch.objects.get()
+        self.assertEqual((match.report, match.item, match.status), (report, item, ReportMatch.Status.PENDING))
+        self.assertGreater(match.score, 0.8)
+
+    def test_new_report_is_matched_against_found_items(self):
+        item = self._item(title="Blak hydroflask bottel")
+        self._item(title="Calculator", category=Item.Category.ELECTRONICS, description="")
+
+        report = self._report()
+
+        self.assertEqual(list(report.matches.values_list("item", flat=True)), [item.pk])
+
+    def test_candidates_share_a_word_and_fit_the_dates(self):
+        flask = self._report()
+        self._report(description="Grey hoodie", category=Item.Category.SPORTS_AND_CLOTHING)
+        self._report(lost_from=TODAY - timedelta(days=60), lost_to=TODAY - timedelta(days=50))
+        item = Item(title="Hydro Flask", date_found=TODAY, category=Item.Category.BOTTLES_AND_CONTAINERS)
+        self.assertEqual(list(candidate_reports(item)), [flask])
+
+    def test_synonyms_and_categories_count(self):
+        report = LostReport(
+            description="airpods case", category=Item.Category.ELECTRONICS, lost_from=TODAY, lost_to=TODAY
+        )
+        earbuds = Item(title="Earbuds case", category=Item.Category.ELECTRONICS, date_found=TODAY)
+        jumper = Item(title="Red jumper", category=Item.Category.SPORTS_AND_CLOTHING, date_found=TODAY)
+        self.assertGreater(score_match(report, earbuds), score_match(report, jumper))
+        # Found long after the report's dates
+        earbuds.date_found = TODAY + timedelta(days=30)
+        self.assertLess(score_match(report, earbuds), 0.8)
+
+    def test_claimed_item_leaves_the_queue(self):
+        self._report()
+        item = self._item()
+        item.status = Item.Status.CLAIMED
+        with self.captureOnCommitCallbacks(execute=True):
+            item.save()
+        self.assertFalse(ReportMatch.objects.exists())
+
+    def test_staff_confirm_closes_the_report(self):
+        report = self._report()
+        item = self._item()
+        other = self._item(title="Black flask", description="")
+        self.assertEqual(report.matches.count(), 2)
+
+        get_user_model().objects.create_user(username="staff", password="pw", is_staff=True)
+        self.client.login(username="staff", password="pw")
+        response = self.client.get(reverse("inventory:match_queue"))
+        self.assertContains(response, "Black Hydro Flask")
+
+        match = report.matches.get(item=item)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("inventory:match_queue"), {"match_id": match.pk, "action": "confirm"})
+
+        report.refresh_from_db()
+        self.assertEqual(report.status, LostReport.Status.MATCHED)
+        self.assertEqual(report.matches.get(item=other).status, ReportMatch.Status.DISMISSED)
+        self.assertFalse(ReportTerm.objects.filter(report=report).exists())
+
+    def test_students_can_file_a_report(self):
+        data = {
+            "description": "Green backpack",
+            "category": Item.Category.BAGS_AND_CARRY,
+            "lost_from": TODAY,
+            "lost_to": TODAY - timedelta(days=1),
+            "reporter_name": "Alex",
+        }
+        response = self.client.post(reverse("inventory:lost_report"), data)
+        self.assertContains(response, "cannot be before")
+
+        data["lost_to"] = TODAY
+        response = self.client.post(reverse("inventory:lost_report"), data)
+        self.assertContains(response, "Your report has been saved")
+        self.assertEqual(LostReport.objects.get().reporter_name, "Alex")
+
+    def test_command_rematches_open_reports(self):
+        report = self._report()
+        self._item()
+        ReportMatch.objects.all().delete()
+
+        out = StringIO()
+        call_command("match_lost_reports", "--reindex", stdout=out)
+
+        self.assertIn("Matched 1 open report(s); 1 new match(es) queued.", out.getvalue())
+        self.assertTrue(report.matches.exists())
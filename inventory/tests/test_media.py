@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from inventory.media import parse_range
+from inventory.models import Item, ItemImage
+from inventory.tests import TempMediaMixin, _image_file
+
+
+def _body(response):
+    return b"".join(response.streaming_content)
+
+
+class MediaServingTests(TempMediaMixin, TestCase):
+    media_settings = {"RENDITIONS_IN_BACKGROUND": False, "MEDIA_SENDFILE": ""}
+
+    def setUp(self):
+        super().setUp()
+        self.item = Item.objects.create(title="Blue Bottle", date_found=date.today())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item_image = ItemImage.objects.create(item=self.item, image=_image_file())
+        self.item_image.refresh_from_db()
+        self.original = self.item_image.image
+        self.rendition = self.item_image.renditions["formats"]["jpeg"]["320"]
+
+    def _get(self, name, **headers):
+        return self.client.get(f"/media/{name}", **headers)
+
+    def test_original_is_streamed_with_validators(self):
+        response = self._get(self.original.name)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(_body(response), Path(self.original.path).read_bytes())
+        self.assertIn("max-age=3600", response["Cache-Control"])
+        self.assertNotIn("immutable", response["Cache-Control"])
+
+        response = self._get(self.original.name, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_renditions_are_content_addressed_and_immutable(self):
+        self.assertRegex(self.rendition, r"_[0-9a-f]{12}_320w\.jpg$")
+        response = self._get(self.rendition)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+
+    def test_range_request_returns_partial_content(self):
+        data = Path(self.original.path).read_bytes()
+        response = self._get(self.original.name, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(data)}")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(_body(response), data[10:20])
+
+        response = self._get(self.original.name, HTTP_RANGE=f"bytes={len(data)}-")
+        self.assertEqual(response.status_code, 416)
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range("bytes=0-", 100), (0, 99))
+        self.assertEqual(parse_range("bytes=-10", 100), (90, 99))
+        self.assertEqual(parse_range("bytes=90-200", 100), (90, 99))
+        self.assertIsNone(parse_range("bytes=0-1,5-6", 100))
+        self.assertFalse(parse_range("bytes=100-", 100))
+
+    def test_hidden_item_photos_are_staff_only(self):
+        Item.objects.filter(pk=self.item.pk).update(
+            status=Item.Status.CLAIMED, claimed_at=timezone.now() - timedelta(days=365)
+        )
+        self.assertEqual(self._get(self.original.name).status_code, 404)
+
+        get_user_model().objects.create_user(username="staff", password="pw", is_staff=True)
+        self.client.login(username="staff", password="pw")
+        response = self._get(self.rendition)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_unreferenced_files_are_not_served(self):
+        (self.tmpdir / "media" / "item_images" / "stray.jpg").write_bytes(b"x")
+        self.assertEqual(self._get("item_images/stray.jpg").status_code, 404)
+        self.assertEqual(self._get("../db.sqlite3").status_code, 404)
+
+    def test_front_end_server_sends_the_file(self):
+        with self.settings(MEDIA_SENDFILE="nginx"):
+            response = self._get(self.original.name)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.original.name}")
+        self.assertEqual(response.content, b"")
+
+        with self.settings(MEDIA_SENDFILE="sendfile"):
+            response = self._get(self.original.name)
+        self.assertEqual(response["X-Sendfile"], self.original.path)
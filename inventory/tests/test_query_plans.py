@@ -0,0 +1,110 @@
+"""
+Query plans of the hot list queries on a seeded dataset.
+
+Each test runs ``EXPLAIN`` for a query the browse page, the staff dashboard or
+the admin issues on every load and fails if the plan reads a whole table or
+sorts the rows instead of walking an index in order.
+"""
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from inventory.locations import prefix_q
+from inventory.models import Claim, Item, Location, visible_items_q
+
+ITEM_COUNT = 5000
+CLAIMED_EVERY = 10
+LOCATION_COUNT = 200
+
+
+def query_plan(queryset) -> str:
+    """The database's plan for ``queryset``, one step per line."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return "\n".join(row[-1] for row in cursor.fetchall())
+        cursor.execute(f"EXPLAIN {sql}", params)
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        today = date.today()
+        categories = [value for value, _ in Item.Category.choices]
+        locations = Location.objects.bulk_create(
+            [Location(name=f"Room {n}", normalized=f"room {n}") for n in range(LOCATION_COUNT)]
+        )
+        cls.location = locations[0]
+        items = []
+        for n in range(ITEM_COUNT):
+            claimed = n % CLAIMED_EVERY == 0
+            items.append(Item(
+                title=f"Item {n}",
+                date_found=today - timedelta(days=n % 365),
+                category=categories[n % len(categories)],
+                location=locations[n % LOCATION_COUNT],
+                status=Item.Status.CLAIMED if claimed else Item.Status.FOUND,
+                claimed_by_name="Owner" if claimed else "",
+                claimed_at=now - timedelta(hours=n % 2000) if claimed else None,
+            ))
+        Item.objects.bulk_create(items, batch_size=500)
+        claimed = list(Item.objects.filter(status=Item.Status.CLAIMED).values_list("pk", "claimed_at"))
+        Claim.objects.bulk_create(
+            [Claim(item_id=pk, claimant_name="Owner") for pk, _ in claimed], batch_size=500
+        )
+        claims = list(Claim.objects.order_by("pk"))
+        for claim, (_, claimed_at) in zip(claims, claimed):
+            claim.claimed_at = claimed_at
+        Claim.objects.bulk_update(claims, ["claimed_at"], batch_size=500)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assertWalksIndex(self, queryset, index):
+        """Fail unless ``queryset`` is answered from ``index`` without a full table scan or a sort."""
+        plan = query_plan(queryset)
+        if connection.vendor == "sqlite":
+            full_scans = [line for line in plan.splitlines() if line.startswith("SCAN") and "INDEX" not in line]
+            self.assertEqual(full_scans, [], plan)
+            self.assertNotIn("TEMP B-TREE", plan, plan)
+        else:
+            self.assertNotIn("Seq Scan", plan, plan)
+            self.assertNotRegex(plan, r"(?m)^\s*(->\s*)?(Incremental )?Sort\b", plan)
+        self.assertIn(index, plan)
+
+    def test_browse_list(self):
+        queryset = Item.objects.filter(visible_items_q()).order_by("-date_found", "-created_at")
+        self.assertWalksIndex(queryset[:20], "item_recent_idx")
+
+    def test_browse_list_at_one_location(self):
+        queryset = Item.objects.filter(visible_items_q(), location=self.location).order_by("-date_found", "-created_at")
+        self.assertWalksIndex(queryset[:20], "item_location_recent_idx")
+
+    def test_location_autocomplete_prefix(self):
+        self.assertWalksIndex(Location.objects.filter(prefix_q("normalized", "room 1")).order_by(), "normalized")
+
+    def test_found_items(self):
+        queryset = Item.objects.filter(status=Item.Status.FOUND).order_by("-date_found", "-created_at")
+        self.assertWalksIndex(queryset[:20], "item_found_recent_idx")
+
+    def test_dashboard_list(self):
+        self.assertWalksIndex(Item.objects.order_by("-date_found", "-created_at")[:50], "item_recent_idx")
+
+    def test_dashboard_recent_claims(self):
+        queryset = (
+            Claim.objects.filter(claimed_at__gte=timezone.now() - timedelta(days=7))
+            .select_related("item")
+            .order_by("-claimed_at")
+        )
+        self.assertWalksIndex(queryset, "claim_recent_idx")
+
+    def test_admin_recent_claims_count(self):
+        # .count() drops the default ordering
+        queryset = Item.objects.filter(
+            status=Item.Status.CLAIMED, claimed_at__gte=timezone.now() - timedelta(hours=24)
+        ).order_by()
+        self.assertWalksIndex(queryset, "item_status_claimed_idx")
@@ -0,0 +1,115 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.template import Context, Template
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from inventory.models import Item, ItemImage
+from inventory.renditions import _generate_stored, available_formats, preferred_image_format
+from inventory.tests import TempMediaMixin, _image_file
+
+
+class RenditionTests(TempMediaMixin, TestCase):
+    media_settings = {"RENDITIONS_IN_BACKGROUND": False}
+
+    def setUp(self):
+        super().setUp()
+        self.item = Item.objects.create(title="Blue Bottle", date_found=date.today())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item_image = ItemImage.objects.create(item=self.item, image=_image_file())
+        self.item_image.refresh_from_db()
+
+    def test_renditions_and_placeholder_generated_on_upload(self):
+        jpeg = self.item_image.renditions["formats"]["jpeg"]
+        # Widths at or above the 800px original are not generated.
+        self.assertEqual(sorted(jpeg), ["320", "640"])
+        with Image.open(self.tmpdir / "media" / jpeg["320"]) as img:
+            self.assertEqual(img.size, (320, 240))
+        self.assertEqual((self.item_image.width, self.item_image.height), (800, 600))
+        self.assertTrue(self.item_image.placeholder.startswith("data:image/jpeg;base64,"))
+        self.assertLess(len(self.item_image.placeholder), 1000)
+
+    def test_responsive_image_tag(self):
+        template = Template("{% load item_images %}{% responsive_image image alt='Bottle' sizes='50vw' %}")
+        html = template.render(Context({"image": self.item_image}))
+        self.assertIn('loading="lazy"', html)
+        self.assertIn('decoding="async"', html)
+        self.assertIn('sizes="50vw"', html)
+        self.assertIn("_320w.jpg 320w", html)
+        self.assertIn(f"{self.item_image.image.url} 800w", html)
+        self.assertIn("background-image: url(&#x27;data:image/jpeg", html)
+
+    def test_deferred_image_keeps_source_in_data_attributes(self):
+        template = Template("{% load item_images %}{% responsive_image image defer=True %}")
+        html = template.render(Context({"image": self.item_image}))
+        self.assertIn(f'data-src="{self.item_image.image.url}"', html)
+        self.assertIn('src="data:image/jpeg;base64,', html)
+        self.assertNotIn(" srcset=", html)
+
+    def test_browse_page_defers_later_carousel_slides(self):
+        ItemImage.objects.create(item=self.item, image=_image_file(name="second.jpg"))
+        response = Client().get(reverse("inventory:item_list"))
+        self.assertContains(response, 'loading="eager"', count=1)
+        self.assertContains(response, "data-src=", count=1)
+
+    def test_modern_formats_generated_with_savings_recorded(self):
+        formats = self.item_image.renditions["formats"]
+        self.assertEqual(set(formats), set(available_formats()))
+        self.assertIn("webp", formats)
+        # Modern formats also get a full-size copy; JPEG uses the original.
+        self.assertEqual(sorted(formats["webp"], key=int), ["320", "640", "800"])
+        sizes = self.item_image.renditions["bytes"]
+        self.assertEqual(self.item_image.bytes_saved, sizes["jpeg"] - min(sizes["webp"], sizes.get("avif", sizes["webp"])))
+        self.assertGreater(self.item_image.bytes_saved, 0)
+
+    def test_upload_hands_encoding_to_the_background_worker(self):
+        with override_settings(RENDITIONS_IN_BACKGROUND=True), patch("inventory.renditions._executor") as executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                item_image = ItemImage.objects.create(item=self.item, image=_image_file(name="second.jpg"))
+        executor.submit.assert_called_once_with(_generate_stored, item_image.pk, background=True)
+        item_image.refresh_from_db()
+        self.assertFalse(item_image.renditions_current)
+
+    def test_avif_has_no_full_size_copy(self):
+        if "avif" not in available_formats():
+            self.skipTest("Pillow cannot encode AVIF")
+        self.assertEqual(sorted(self.item_image.renditions["formats"]["avif"], key=int), ["320", "640"])
+        request = RequestFactory().get("/", HTTP_ACCEPT="image/avif")
+        html = Template("{% load item_images %}{% responsive_image image %}").render(
+            Context({"image": self.item_image, "request": request})
+        )
+        self.assertIn("_640w.avif 640w", html)
+        self.assertIn(f"{self.item_image.image.url} 800w", html)
+
+    def test_format_follows_accept_header(self):
+        factory = RequestFactory()
+        chrome = factory.get("/", HTTP_ACCEPT="text/html,application/xhtml+xml,image/avif,image/webp,*/*;q=0.8")
+        webp_only = factory.get("/", HTTP_ACCEPT="text/html,image/webp,image/avif;q=0")
+        safari = factory.get("/", HTTP_ACCEPT="text/html,application/xhtml+xml,*/*;q=0.8")
+        self.assertEqual(preferred_image_format(chrome, {"jpeg", "webp", "avif"}), "avif")
+        self.assertEqual(preferred_image_format(chrome, {"jpeg", "webp"}), "webp")
+        self.assertEqual(preferred_image_format(webp_only, {"jpeg", "webp", "avif"}), "webp")
+        self.assertEqual(preferred_image_format(safari, {"jpeg", "webp", "avif"}), "jpeg")
+
+        template = Template("{% load item_images %}{% responsive_image image %}")
+        html = template.render(Context({"image": self.item_image, "request": webp_only}))
+        self.assertIn("_320w.webp 320w", html)
+        self.assertIn("_800w.webp 800w", html)
+        self.assertNotIn(".jpg", html)
+
+    def test_pages_with_photos_vary_on_accept(self):
+        response = Client().get(reverse("inventory:item_detail", args=[self.item.pk]), HTTP_ACCEPT="image/webp")
+        self.assertIn("Accept", response["Vary"])
+        self.assertContains(response, ".webp 320w")
+
+    def test_deleting_image_removes_renditions(self):
+        paths = [
+            self.tmpdir / "media" / name
+            for names in self.item_image.renditions["formats"].values()
+            for name in names.values()
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item_image.delete()
+        self.assertFalse(any(path.exists() for path in paths))
@@ -0,0 +1,102 @@
+import sqlite3
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from inventory.models import Item
+from inventory.routers import PIN_COOKIE
+from inventory.search import get_trigram_index
+
+REPLICA = "replica"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTests(TestCase):
+    """
+    The primary is the test database; the replica a second SQLite file
+    that starts as a copy of it and, like a lagging replica, only has the
+    rows a test puts there. The replica is registered once the test case
+    is set up (the runner only knows the configured databases) and so is
+    not rolled back after each test.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        path = Path(cls.replica_dir.name) / "replica.sqlite3"
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        with sqlite3.connect(path) as replica:
+            primary.connection.backup(replica)
+        replica.close()
+        connections.settings[REPLICA] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+            REPLICA: {"ENGINE": "django.db.backends.sqlite3", "NAME": str(path)},
+        })[REPLICA]
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        cls.replica_dir.cleanup()
+        super().tearDownClass()
+
+    def tearDown(self):
+        with connections[REPLICA].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {Item._meta.db_table}")
+
+    def _item(self, title, using=DEFAULT_DB_ALIAS, **fields):
+        item = Item(title=title, date_found=date.today(), **fields)
+        Item.objects.using(using).bulk_create([item])
+        return item
+
+    def test_public_reads_use_the_replica(self):
+        self._item("Replicated phone", pk=1)
+        self._item("Replicated phone", using=REPLICA, pk=1)
+        primary_only = self._item("New bottle", pk=2)
+
+        response = self.client.get(reverse("inventory:item_list"))
+        self.assertEqual([item.title for item in response.context["items"]], ["Replicated phone"])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.client.get(reverse("inventory:item_detail", args=[primary_only.pk])).status_code, 404)
+
+    def test_claim_pins_the_client_to_the_primary(self):
+        self._item("Phone", pk=1)
+        self._item("Phone", using=REPLICA, pk=1)
+        detail_url = reverse("inventory:item_detail", args=[1])
+
+        response = self.client.post(reverse("inventory:claim_item", args=[1]), {"name": "Sam Lee"})
+        self.assertRedirects(response, detail_url, fetch_redirect_response=False)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(Item.objects.get(pk=1).status, Item.Status.CLAIMED)
+
+        # The claimant's redirect reads the primary; other visitors still read the replica
+        self.assertContains(self.client.get(detail_url), "Sam Lee")
+        self.assertNotContains(Client().get(detail_url), "Sam Lee")
+
+    def test_queries_outside_requests_use_the_primary(self):
+        self.assertEqual(router.db_for_read(Item), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_write(Item), DEFAULT_DB_ALIAS)
+        self.assertFalse(router.allow_migrate(REPLICA, "inventory"))
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, "inventory"))
+
+    def test_search_keeps_an_index_per_database(self):
+        self._item("Phone", pk=1)
+        self._item("Phone", using=REPLICA, pk=1)
+        primary_index = get_trigram_index(DEFAULT_DB_ALIAS)
+        replica_index = get_trigram_index(REPLICA)
+        self.assertIsNot(primary_index, replica_index)
+        self.assertIs(get_trigram_index(DEFAULT_DB_ALIAS), primary_index)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_the_primary(self):
+        self._item("Phone", pk=1)
+        response = self.client.post(reverse("inventory:claim_item", args=[1]), {"name": "Sam Lee"})
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertContains(Client().get(reverse("inventory:item_detail", args=[1])), "Sam Lee")
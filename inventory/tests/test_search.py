@@ -0,0 +1,75 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from inventory.models import Item, SearchSynonym
+from inventory.search import TrigramIndex, expand_query, search_items
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.earbuds = self._item("Apple Wireless Earbuds", "White charging case with a scratch on the lid.")
+        self.bottle = self._item("Steel Water Bottle", "Blue, dented near the base.")
+        self.notebook = self._item("Maths Notebook", "Has a blue water bottle sticker on the cover.")
+
+    def _item(self, title, description, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Item.objects.create(title=title, description=description, date_found=date.today(), **fields)
+
+    def _search(self, query):
+        return list(search_items(Item.objects.all(), query))
+
+    def test_typo_still_matches(self):
+        self.assertEqual(self._search("bottel")[0], self.bottle)
+        self.assertEqual(self._search("earbud"), [self.earbuds])
+
+    def test_synonyms_from_seeded_table(self):
+        self.assertEqual(self._search("airpods"), [self.earbuds])
+        # "flask" is in the same normalize_category group as "bottle".
+        self.assertEqual(self._search("flask")[0], self.bottle)
+
+    def test_title_matches_rank_above_description_matches(self):
+        self.assertEqual(self._search("water bottle"), [self.bottle, self.notebook])
+
+    def test_partial_words_match_like_icontains(self):
+        self.assertEqual(self._search("wireless"), [self.earbuds])
+        self.assertEqual(self._search("note"), [self.notebook])
+
+    def test_synonym_edits_take_effect(self):
+        self.assertEqual(self._search("pods"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            SearchSynonym.objects.create(term="pods", synonym="earbuds", weight=0.8)
+        self.assertEqual(self._search("pods"), [self.earbuds])
+
+    def test_index_follows_item_changes(self):
+        self.assertEqual(self._search("umbrella"), [])
+        umbrella = self._item("Black Umbrella", "")
+        self.assertEqual(self._search("umbrela"), [umbrella])
+
+    def test_index_sees_writes_that_skip_signals(self):
+        self.assertEqual(self._search("umbrella"), [])
+        Item.objects.bulk_create([Item(title="Black Umbrella", date_found=date.today())])
+        self.assertEqual([item.title for item in self._search("umbrela")], ["Black Umbrella"])
+
+    def test_filters_apply_before_results_are_truncated(self):
+        wanted = self._item("Water Bottle", "", location_found="Gym")
+        for n in range(3):
+            self._item(f"Water Bottle {n}", "")
+        with patch("inventory.search.MAX_RESULTS", 2):
+            self.assertEqual(list(search_items(Item.objects.filter(location_found="Gym"), "bottle")), [wanted])
+
+    def test_expand_query_weights(self):
+        expanded = expand_query("Airpods a", synonyms={"airpod": {"earbuds": 0.8}})
+        self.assertEqual(expanded, [{"airpods": 1.0, "earbuds": 0.8}])
+        index = TrigramIndex.build([(1, "Earbuds", ""), (2, "Case", "for airpods")])
+        scores = index.rank(expanded)
+        self.assertGreater(scores[1], scores[2])
+
+    def test_browse_page_uses_search(self):
+        response = Client().get(reverse("inventory:item_list"), {"q": "airpods"})
+        self.assertEqual(list(response.context["items"]), [self.earbuds])
@@ -0,0 +1,110 @@
+import shutil
+import tempfile
+from datetime import date
+
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from inventory.models import Item, ItemImage
+from inventory.similarity import (
+    FEATURE_DIM,
+    ImageSimilarityIndex,
+    compute_image_features,
+    get_similarity_index,
+)
+from inventory.tests import _image_file
+
+
+class ImageFeatureTests(TestCase):
+    def test_features_are_normalised_and_deterministic(self):
+        first = compute_image_features(_image_file((40, 40), color="red"))
+        second = compute_image_features(_image_file((40, 40), color="red"))
+        self.assertEqual(first.shape, (FEATURE_DIM,))
+        self.assertAlmostEqual(float(np.linalg.norm(first)), 1.0, places=5)
+        np.testing.assert_array_equal(first, second)
+
+    def test_similar_colours_score_higher(self):
+        red = compute_image_features(_image_file((40, 40), color=(220, 20, 20)))
+        dark_red = compute_image_features(_image_file((40, 40), color=(200, 30, 30)))
+        blue = compute_image_features(_image_file((40, 40), color=(20, 20, 220)))
+        self.assertGreater(red @ dark_red, red @ blue)
+
+    def test_invalid_image_returns_none(self):
+        bogus = SimpleUploadedFile("bad.jpg", b"not an image", content_type="image/jpeg")
+        self.assertIsNone(compute_image_features(bogus))
+
+
+class ImageSimilarityIndexTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def _vector(self, hot):
+        vector = np.zeros(FEATURE_DIM, dtype=np.float32)
+        vector[hot] = 1.0
+        return vector
+
+    def test_add_query_and_remove(self):
+        index = ImageSimilarityIndex(self.directory)
+        index.add(1, self._vector(0))
+        index.add(2, self._vector(1))
+
+        self.assertEqual(index.query(self._vector(1), limit=1), [(2, 1.0)])
+        self.assertEqual([i for i, _ in index.query(self._vector(1), exclude_ids=[2])], [1])
+
+        index.remove(2)
+        self.assertEqual(index.indexed_ids(), {1})
+        # The freed row is reused instead of growing the matrix.
+        index.add(3, self._vector(2))
+        self.assertEqual(len(np.load(index._ids_path)), 256)
+        self.assertEqual(index.query(self._vector(2), limit=1)[0][0], 3)
+
+    def test_changes_are_visible_to_other_instances(self):
+        writer = ImageSimilarityIndex(self.directory)
+        reader = ImageSimilarityIndex(self.directory)
+        writer.add(7, self._vector(3))
+        self.assertEqual(reader.query(self._vector(3), limit=1)[0][0], 7)
+
+
+class SimilarItemsViewTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.index_dir, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=self.media_root, IMAGE_SIMILARITY_INDEX_DIR=self.index_dir)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.client = Client()
+        self.red_bottle = self._item("Red Bottle", (220, 20, 20))
+        self.red_bag = self._item("Red Bag", (200, 30, 30))
+        self.blue_book = self._item("Blue Book", (20, 20, 220))
+
+    def _item(self, title, color):
+        item = Item.objects.create(title=title, date_found=date.today(), status=Item.Status.FOUND)
+        ItemImage.objects.create(item=item, image=_image_file((40, 40), f"{title}.png", color))
+        return item
+
+    def test_images_are_indexed_on_save_and_removed_on_delete(self):
+        index = get_similarity_index()
+        self.assertEqual(len(index), 3)
+        self.blue_book.delete()
+        self.assertEqual(len(index), 2)
+
+    def test_detail_view_lists_similar_items(self):
+        response = self.client.get(reverse("inventory:item_detail", args=[self.red_bottle.pk]))
+        similar = response.context["similar_items"]
+        self.assertEqual(similar[0], self.red_bag)
+        self.assertNotIn(self.red_bottle, similar)
+
+    def test_photo_search_ranks_by_similarity(self):
+        response = self.client.post(
+            reverse("inventory:photo_search"),
+            {"photo": _image_file((40, 40), color=(25, 25, 210))},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["items"][0], self.blue_book)
+        self.assertContains(response, "look like your photo")
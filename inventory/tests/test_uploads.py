@@ -0,0 +1,194 @@
+import json
+import threading
+from datetime import date
+from io import BytesIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from inventory.models import Item, ItemImage
+from inventory.tests import TempMediaMixin
+from inventory.uploads import StagedUpload, UploadError
+
+
+def _png_bytes(size=(40, 30)):
+    buffer = BytesIO()
+    Image.effect_noise(size, 64).convert("RGB").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class StagedUploadTests(TempMediaMixin, TestCase):
+    media_settings = {"MAX_UPLOAD_BYTES": 200_000}
+
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        self.staff = User.objects.create_user(username="staff", password="pw", is_staff=True)
+        self.client = Client()
+        self.client.login(username="staff", password="pw")
+
+    def _start(self, data, client=None, scaled=False):
+        response = (client or self.client).post(
+            reverse("inventory:upload_staging"),
+            data=json.dumps({"filename": "photo.png", "size": len(data), "content_type": "image/png", "scaled": scaled}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()["token"]
+
+    def _put(self, token, offset, chunk, client=None):
+        return (client or self.client).put(
+            reverse("inventory:staged_upload", args=[token]),
+            data=chunk,
+            content_type="application/octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def _stage(self, data, chunk_size=500):
+        token = self._start(data)
+        for offset in range(0, len(data), chunk_size):
+            response = self._put(token, offset, data[offset:offset + chunk_size])
+            self.assertEqual(response.status_code, 200, response.content)
+        return token, response.json()
+
+    def test_chunked_upload_completes_with_dimensions(self):
+        token, status = self._stage(_png_bytes())
+        self.assertTrue(status["complete"])
+        self.assertEqual((status["width"], status["height"]), (40, 30))
+
+    def test_resume_reports_offset_and_rejects_gaps(self):
+        data = _png_bytes()
+        token = self._start(data)
+        self._put(token, 0, data[:1000])
+
+        response = self._put(token, 2000, data[2000:3000])
+        self.assertEqual(response.status_code, 409)
+        status = self.client.get(reverse("inventory:staged_upload", args=[token])).json()
+        self.assertEqual(status["offset"], 1000)
+
+        response = self._put(token, 1000, data[1000:])
+        self.assertTrue(response.json()["complete"])
+
+    def test_concurrent_append_at_the_same_offset_loses_with_the_new_offset(self):
+        data = _png_bytes()
+        token = self._start(data)
+        reading, release = threading.Event(), threading.Event()
+
+        class SlowStream(BytesIO):
+            def read(self, size=-1):
+                reading.set()
+                release.wait(5)
+                return super().read(size)
+
+        # Both requests loaded the upload at offset 0 before either wrote
+        first, second = (StagedUpload.load(token, self.staff) for _ in range(2))
+        writer = threading.Thread(target=first.append, args=(0, SlowStream(data[:1000])))
+        writer.start()
+        reading.wait(5)
+        errors = []
+
+        def retry():
+            try:
+                second.append(0, BytesIO(data[:1000]))
+            except UploadError as e:
+                errors.append(e)
+
+        retrier = threading.Thread(target=retry)
+        retrier.start()
+        release.set()
+        writer.join(5)
+        retrier.join(5)
+
+        self.assertEqual([(e.status, str(e)) for e in errors], [(409, "Expected offset 1000.")])
+        self.assertEqual(StagedUpload.load(token, self.staff).offset, 1000)
+        self.assertEqual((self.tmpdir / "staging" / f"{token}.part").stat().st_size, 1000)
+
+    def test_non_image_is_rejected_once_the_header_arrives(self):
+        data = b"not an image at all" * 10
+        token = self._start(data)
+        response = self._put(token, 0, data)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list((self.tmpdir / "staging").iterdir()), [])
+
+    @override_settings(MAX_IMAGE_PIXELS=100)
+    def test_oversized_dimensions_are_rejected(self):
+        data = _png_bytes()
+        token = self._start(data)
+        response = self._put(token, 0, data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("too large", response.json()["error"])
+
+    @override_settings(UPLOAD_MAX_DIMENSION=32)
+    def test_prescaled_variant_is_checked_against_max_dimension(self):
+        data = _png_bytes((40, 30))
+        response = self._put(self._start(data, scaled=True), 0, data)
+        self.assertEqual(response.status_code, 400)
+
+        data = _png_bytes((32, 24))
+        response = self._put(self._start(data, scaled=True), 0, data)
+        self.assertTrue(response.json()["complete"])
+
+    def test_upload_page_exposes_downscale_settings(self):
+        with self.settings(UPLOAD_MAX_DIMENSION=1600, UPLOAD_KEEP_ORIGINAL=True):
+            response = self.client.get(reverse("inventory:item_upload"))
+        self.assertContains(response, 'data-max-dimension="1600"')
+        self.assertContains(response, 'data-keep-original="true"')
+
+    def test_declared_size_over_limit_is_refused(self):
+        response = self.client.post(
+            reverse("inventory:upload_staging"),
+            data=json.dumps({"filename": "huge.jpg", "size": 10_000_000}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 413)
+
+    def test_uploads_are_private_to_their_owner(self):
+        token, _ = self._stage(_png_bytes())
+        User = get_user_model()
+        User.objects.create_user(username="other", password="pw", is_staff=True)
+        other = Client()
+        other.login(username="other", password="pw")
+        response = other.get(reverse("inventory:staged_upload", args=[token]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_requires_staff(self):
+        response = Client().post(reverse("inventory:upload_staging"), data="{}", content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+    @patch("inventory.views.aanalyze_item_images")
+    def test_analyze_accepts_staged_tokens(self, mock_analyze):
+        mock_analyze.return_value = {"title": "Cap", "description": "", "category": ""}
+        token, _ = self._stage(_png_bytes())
+
+        response = self.client.post(reverse("inventory:analyze_images_ajax"), {"staged_tokens": [token]})
+
+        self.assertEqual(response.json()["title"], "Cap")
+        (staged_file,) = mock_analyze.call_args[0][0]
+        self.assertEqual(staged_file.content_type, "image/png")
+
+    def test_item_upload_attaches_staged_images(self):
+        data = _png_bytes()
+        token, _ = self._stage(data)
+
+        response = self.client.post(reverse("inventory:item_upload"), {
+            "title": "Black Cap",
+            "description": "",
+            "location_found": "Gym",
+            "date_found": date.today(),
+            "status": Item.Status.FOUND,
+            "category": Item.Category.SPORTS_AND_CLOTHING,
+            "images-TOTAL_FORMS": "1",
+            "images-INITIAL_FORMS": "0",
+            "images-MIN_NUM_FORMS": "0",
+            "images-MAX_NUM_FORMS": "3",
+            "staged_tokens": [token],
+        })
+
+        self.assertEqual(response.status_code, 302)
+        item_image = ItemImage.objects.get(item__title="Black Cap")
+        with item_image.image.open("rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(list((self.tmpdir / "staging").iterdir()), [])
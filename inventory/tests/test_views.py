@@ -8,7 +8,7 @@ from django.urls import reverse
 from PIL import Image
 from unittest.mock import patch
 
-from inventory.models import Item, ItemImage
+from inventory.models import ArchivedItem, Item, ItemImage
 
 
 def _create_test_image(name="test.png"):
@@ -52,6 +52,23 @@ class PublicViewsTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Blue Backpack")
 
+    def test_archived_item_detail_shows_tombstone(self):
+        archived = ArchivedItem.objects.create(
+            original_id=9999,
+            title="Green Umbrella",
+            date_found=date.today(),
+            status=Item.Status.CLAIMED,
+            category=Item.Category.OTHER_MISC,
+            created_at=self.item1.created_at,
+        )
+        response = self.client.get(reverse("inventory:item_detail", args=[archived.original_id]))
+        self.assertEqual(response.status_code, 410)
+        self.assertContains(response, "Green Umbrella", status_code=410)
+
+    def test_unknown_item_detail_is_404(self):
+        response = self.client.get(reverse("inventory:item_detail", args=[123456]))
+        self.assertEqual(response.status_code, 404)
+
 
 class StaffUploadViewsTests(TestCase):
     def setUp(self):
@@ -68,7 +85,7 @@ class StaffUploadViewsTests(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertIn("/accounts/login/", response["Location"])
 
-    @patch("inventory.views.analyze_item_images")
+    @patch("inventory.views.aanalyze_item_images")
     def test_upload_flow_with_vision_suggestions(self, mock_analyze):
         mock_analyze.return_value = {
             "title": "Suggested Title",
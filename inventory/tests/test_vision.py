@@ -1,24 +1,59 @@
+import asyncio
+import base64
+import json
+import threading
 from io import BytesIO
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from django.conf import settings
-from django.test import TestCase, override_settings
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
 
-from inventory.services import analyze_item_images
+from PIL import Image
+
+from inventory.metrics import counters, latency
+from inventory.services import (
+    aanalyze_item_details,
+    aanalyze_item_images,
+    aanalyze_item_quick,
+    analyze_item_images,
+    astream_item_analysis,
+    analyze_items_batch,
+)
+from inventory.singleflight import AnalysisCoordinator, Superseded
+from inventory.vision_providers import (
+    CATEGORY_RULES,
+    LocalVisionProvider,
+    PartialJSONObject,
+    get_async_client,
+    get_vision_provider,
+)
+from inventory.vision_stub import make_stub_server
+
+
+def _gemini_response(payload):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        "candidates": [{"content": {"parts": [{"text": json.dumps(payload)}]}}]
+    }
+    return response
+
+
+def _image(name):
+    return SimpleUploadedFile(name, b"fake-image-bytes", content_type="image/jpeg")
 
 
 class VisionServiceTests(TestCase):
-    @override_settings(OPENAI_API_KEY="test-key")
-    @patch("inventory.services.requests.post")
+    @override_settings(GOOGLE_API_KEY="test-key", VISION_PROVIDER="gemini")
+    @patch("requests.post")
     def test_analyze_item_images_happy_path(self, mock_post):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
+        mock_post.return_value = _gemini_response({
             "title": "Black Umbrella",
             "description": "A compact black umbrella with silver handle.",
-        }
-        mock_response.raise_for_status.return_value = None
-        mock_post.return_value = mock_response
+            "category": "Other/Misc",
+        })
 
         file_obj = SimpleUploadedFile(
             "umbrella.jpg",
@@ -32,10 +67,381 @@ class VisionServiceTests(TestCase):
         self.assertIn("compact black umbrella", result["description"].lower())
         mock_post.assert_called_once()
 
-    @override_settings(OPENAI_API_KEY="")
+    @override_settings(GOOGLE_API_KEY="", VISION_PROVIDER="gemini")
     def test_analyze_item_images_no_api_key_returns_empty(self):
-        result = analyze_item_images([])
+        result = analyze_item_images([_image("a.jpg")])
         self.assertEqual(result, {})
 
 
+@override_settings(GOOGLE_API_KEY="test-key", VISION_PROVIDER="gemini")
+class BatchVisionServiceTests(TestCase):
+    @patch("requests.post")
+    def test_batch_maps_results_back_to_item_ids(self, mock_post):
+        mock_post.return_value = _gemini_response([
+            {"item_id": "2", "title": "Blue Bottle", "description": "Dented", "category": "Bottles and containers"},
+            {"item_id": "1", "title": "Black Laptop", "description": "Dell", "category": "Electronics"},
+        ])
+
+        result = analyze_items_batch({1: [_image("a.jpg")], 2: [_image("b.jpg"), _image("c.jpg")]})
+
+        mock_post.assert_called_once()
+        self.assertEqual(result[1]["title"], "Black Laptop")
+        self.assertEqual(result[1]["category"], "ELECTRONICS")
+        self.assertEqual(result[2]["category"], "BOTTLES_AND_CONTAINERS")
+        parts = mock_post.call_args.kwargs["json"]["contents"][0]["parts"]
+        self.assertEqual(sum("inline_data" in part for part in parts), 3)
+
+    @patch("requests.post")
+    def test_batch_falls_back_to_single_calls_on_bad_json(self, mock_post):
+        bad = MagicMock(status_code=200)
+        bad.json.return_value = {"candidates": [{"content": {"parts": [{"text": "not json"}]}}]}
+        mock_post.side_effect = [
+            bad,
+            _gemini_response({"title": "Wallet", "description": "", "category": "Other"}),
+            _gemini_response({"title": "Scarf", "description": "", "category": "Clothing"}),
+        ]
+
+        result = analyze_items_batch({1: [_image("a.jpg")], 2: [_image("b.jpg")]})
+
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(result[1]["title"], "Wallet")
+        self.assertEqual(result[2]["category"], "SPORTS_AND_CLOTHING")
+
+    @patch("requests.post")
+    def test_batch_retries_only_missing_items(self, mock_post):
+        mock_post.side_effect = [
+            _gemini_response([{"item_id": "1", "title": "Wallet", "description": "", "category": "Other"}]),
+            _gemini_response({"title": "Scarf", "description": "", "category": "Clothing"}),
+        ]
+
+        result = analyze_items_batch({1: [_image("a.jpg")], 2: [_image("b.jpg")]})
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(result[2]["title"], "Scarf")
+
+    @override_settings(GOOGLE_API_KEY="")
+    def test_unconfigured_provider_maps_every_item_to_empty(self):
+        self.assertEqual(analyze_items_batch({1: [_image("a.jpg")], 2: [_image("b.jpg")]}), {1: {}, 2: {}})
+
+    @patch("requests.post")
+    def test_batch_does_not_retry_items_when_the_call_fails(self, mock_post):
+        mock_post.return_value = MagicMock(status_code=400, text="bad request")
+        throttle = MagicMock()
+
+        result = analyze_items_batch({1: [_image("a.jpg")], 2: [_image("b.jpg")]}, throttle=throttle)
+
+        self.assertEqual(result, {1: {}, 2: {}})
+        mock_post.assert_called_once()
+        throttle.assert_called_once()
+
+    @patch("requests.post")
+    def test_batch_throttles_every_retry(self, mock_post):
+        mock_post.side_effect = [
+            _gemini_response([{"item_id": "1", "title": "Wallet", "description": "", "category": "Other"}]),
+            _gemini_response({"title": "Scarf", "description": "", "category": "Clothing"}),
+        ]
+        throttle = MagicMock()
+
+        analyze_items_batch({1: [_image("a.jpg")], 2: [_image("b.jpg")]}, throttle=throttle)
+
+        self.assertEqual(throttle.call_count, 2)
+
+
+def _photo(color, size=(40, 40), name="photo.png"):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(GOOGLE_API_KEY="test-key", VISION_PROVIDER="gemini", VISION_THUMBNAIL_SIZE=64)
+class TieredVisionTests(TestCase):
+    def setUp(self):
+        latency.reset()
+        self.addCleanup(latency.reset)
+
+    @patch("inventory.vision_providers.apost_with_retries", new_callable=AsyncMock)
+    def test_quick_pass_sends_one_thumbnail(self, mock_post):
+        mock_post.return_value = _gemini_response({"title": "Blue Bottle", "category": "Bottles and containers"})
+
+        result = async_to_sync(aanalyze_item_quick)([_photo((20, 20, 200), size=(300, 900)), _photo((0, 0, 0))])
+
+        self.assertEqual(result, {"title": "Blue Bottle", "category": "BOTTLES_AND_CONTAINERS"})
+        parts = mock_post.call_args.args[1]["contents"][0]["parts"]
+        images = [part["inline_data"] for part in parts if "inline_data" in part]
+        self.assertEqual(len(images), 1)
+        thumbnail = Image.open(BytesIO(base64.b64decode(images[0]["data"])))
+        self.assertEqual(thumbnail.size, (21, 64))
+        self.assertNotIn("DESCRIPTION FORMATTING RULES", parts[0]["text"])
+        self.assertEqual(latency.summary()["vision.quick"]["count"], 1)
+
+    @patch("inventory.vision_providers.apost_with_retries", new_callable=AsyncMock)
+    def test_detail_pass_sends_every_photo_and_one_category_rule(self, mock_post):
+        mock_post.return_value = _gemini_response({"description": "Steel bottle with a dent", "title": "ignored"})
+
+        result = async_to_sync(aanalyze_item_details)(
+            [_image("a.jpg"), _image("b.jpg")], "BOTTLES_AND_CONTAINERS", "Blue Bottle"
+        )
+
+        self.assertEqual(result, {"description": "Steel bottle with a dent"})
+        parts = mock_post.call_args.args[1]["contents"][0]["parts"]
+        self.assertEqual(sum("inline_data" in part for part in parts), 2)
+        self.assertIn(CATEGORY_RULES["BOTTLES_AND_CONTAINERS"], parts[0]["text"])
+        self.assertNotIn(CATEGORY_RULES["ELECTRONICS"], parts[0]["text"])
+        self.assertIn('"Blue Bottle"', parts[0]["text"])
+        self.assertEqual(latency.summary()["vision.details"]["count"], 1)
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        self.coordinator = AnalysisCoordinator()
+        self.calls = []
+        counters.reset()
+        self.addCleanup(counters.reset)
+
+    def _call(self, result, delay=0.05):
+        async def call():
+            self.calls.append(result)
+            await asyncio.sleep(delay)
+            return result
+        return call
+
+    def test_identical_requests_share_one_call(self):
+        async def run():
+            return await asyncio.gather(
+                *(self.coordinator.run("page", "photos-a", self._call("a")) for _ in range(3)),
+                self.coordinator.run("other page", "photos-a", self._call("a")),
+            )
+
+        self.assertEqual(async_to_sync(run)(), ["a"] * 4)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(counters.summary(), {"vision.calls_shared": 2})
+
+    def test_newer_request_cancels_the_older_call(self):
+        async def run():
+            older = asyncio.ensure_future(self.coordinator.run("page", "photos-a", self._call("a", delay=5)))
+            await asyncio.sleep(0.01)
+            newer = await self.coordinator.run("page", "photos-ab", self._call("ab"))
+            with self.assertRaises(Superseded):
+                await older
+            return newer
+
+        self.assertEqual(async_to_sync(run)(), "ab")
+        self.assertEqual(self.calls, ["a", "ab"])
+        self.assertEqual(counters.summary(), {"vision.calls_cancelled": 1})
+
+    def test_result_superseded_on_another_event_loop_is_discarded(self):
+        async def newer_on_another_loop():
+            return await self.coordinator.run("page", "photos-ab", self._call("ab", delay=0))
+
+        async def older():
+            await asyncio.to_thread(asyncio.run, newer_on_another_loop())
+            return "a"
+
+        async def run():
+            return await self.coordinator.run("page", "photos-a", older)
+
+        with self.assertRaises(Superseded):
+            async_to_sync(run)()
+        self.assertEqual(counters.summary(), {"vision.results_discarded": 1})
+
+
+class VisionProviderTests(TestCase):
+    def test_partial_json_yields_fields_as_they_complete(self):
+        text = '{"title": "Blue \\"Hydro\\" Flask", "category": "Bottles", "description": "Dented\\nlid"}'
+        parser = PartialJSONObject()
+        completed = [fields for i in range(0, len(text), 7) if (fields := parser.feed(text[i:i + 7]))]
+        self.assertEqual(completed, [
+            {"title": 'Blue "Hydro" Flask'},
+            {"category": "Bottles"},
+            {"description": "Dented\nlid"},
+        ])
+
+    def test_provider_is_chosen_from_settings(self):
+        with override_settings(VISION_PROVIDER="local"):
+            self.assertIsInstance(get_vision_provider(), LocalVisionProvider)
+        with override_settings(VISION_PROVIDER="inventory.vision_providers.LocalVisionProvider"):
+            self.assertIsInstance(get_vision_provider(), LocalVisionProvider)
+
+    @override_settings(VISION_PROVIDER="local")
+    def test_local_provider_is_deterministic(self):
+        first = analyze_item_images([_photo((20, 20, 200), size=(20, 60))])
+        second = analyze_item_images([_photo((20, 20, 200), size=(20, 60))])
+        self.assertEqual(first, second)
+        self.assertEqual(first["title"], "Blue Bottle")
+        self.assertEqual(first["category"], "BOTTLES_AND_CONTAINERS")
+
+    @override_settings(OPENAI_API_KEY="test-key", VISION_PROVIDER="openai")
+    @patch("requests.post")
+    def test_openai_provider_sends_all_images(self, mock_post):
+        mock_post.return_value = MagicMock(status_code=200)
+        mock_post.return_value.json.return_value = {
+            "choices": [{"message": {"content": json.dumps({"title": "Red Scarf", "category": "Clothing"})}}]
+        }
+
+        result = analyze_item_images([_image("a.jpg"), _image("b.jpg")])
+
+        self.assertEqual(result["category"], "SPORTS_AND_CLOTHING")
+        content = mock_post.call_args.kwargs["json"]["messages"][1]["content"]
+        self.assertEqual(sum(part["type"] == "image_url" for part in content), 2)
+
+
+class GeminiStubServerTests(TestCase):
+    def _start(self, seed=1, **config):
+        server = make_stub_server(port=0, seed=seed, **config)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        host, port = server.server_address[:2]
+        overrides = override_settings(
+            VISION_PROVIDER="gemini",
+            GOOGLE_API_KEY="stub",
+            GEMINI_BASE_URL=f"http://{host}:{port}/v1beta",
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        return server
+
+    def test_single_and_batched_requests_round_trip(self):
+        self._start()
+        single = analyze_item_images([_photo((200, 20, 20), size=(60, 20))])
+        self.assertEqual(single["title"], "Red Device")
+        self.assertEqual(single["category"], "ELECTRONICS")
+
+        batch = analyze_items_batch({1: [_photo((10, 10, 10))], 2: [_photo((20, 20, 200), size=(20, 60))]})
+        self.assertEqual(batch[1]["title"], "Black Item")
+        self.assertEqual(batch[2]["category"], "BOTTLES_AND_CONTAINERS")
+
+    @patch("inventory.vision_providers.RETRY_BACKOFF_S", 0)
+    def test_transient_errors_are_retried(self):
+        # Seed 4 fails the first three requests and lets the fourth through.
+        server = self._start(seed=4, error_rate=0.5)
+        with override_settings(VISION_MAX_RETRIES=5):
+            result = analyze_item_images([_photo((10, 10, 10))])
+        self.assertEqual(result["title"], "Black Item")
+        self.assertEqual(server.RequestHandlerClass.config.errors, 3)
+
+    @patch("inventory.vision_providers.RETRY_BACKOFF_S", 0)
+    def test_persistent_errors_return_empty(self):
+        server = self._start(error_rate=1.0)
+        with override_settings(VISION_MAX_RETRIES=1):
+            self.assertEqual(analyze_item_images([_photo((10, 10, 10))]), {})
+        self.assertEqual(server.RequestHandlerClass.config.requests, 2)
+
+    def test_streamed_fields_arrive_before_the_response_completes(self):
+        self._start(chunk_chars=8, chunk_delay=0.02)
+        latency.reset()
+        self.addCleanup(latency.reset)
+
+        async def collect():
+            events = [fields async for fields in astream_item_analysis([_photo((200, 20, 20), size=(60, 20))])]
+            await get_async_client().aclose()
+            return events
+
+        events = async_to_sync(collect)()
+
+        self.assertEqual(events, [
+            {"title": "Red Device"},
+            {"category": "ELECTRONICS"},
+            {"description": events[-1]["description"]},
+        ])
+        timings = latency.summary()
+        self.assertLess(timings["vision.full.first_field"]["p50_ms"], timings["vision.full"]["p50_ms"] / 2)
+
+    def test_stream_failing_midway_falls_back_for_the_missing_fields(self):
+        self._start()
+
+        async def broken_stream(url, body, timeout):
+            yield '{"title": "Red Device", "categ'
+            raise ConnectionError("stream dropped")
+
+        async def collect():
+            with patch("inventory.vision_providers.astream_candidate_text", broken_stream):
+                events = [fields async for fields in astream_item_analysis([_photo((200, 20, 20), size=(60, 20))])]
+            await get_async_client().aclose()
+            return events
+
+        with self.assertLogs("inventory.vision_providers", "ERROR"):
+            events = async_to_sync(collect)()
+
+        self.assertEqual(events[0], {"title": "Red Device"})
+        self.assertEqual(set(events[1]), {"category", "description"})
+        self.assertEqual(events[1]["category"], "ELECTRONICS")
+
+    async def test_endpoint_relays_fields_as_server_sent_events(self):
+        self._start(chunk_chars=8)
+        user = await sync_to_async(get_user_model().objects.create_user)(username="staff", password="pw", is_staff=True)
+        await sync_to_async(self.async_client.force_login)(user)
+
+        response = await self.async_client.post(
+            reverse("inventory:analyze_images_ajax"),
+            {"phase": "quick", "image_0": _photo((200, 20, 20), size=(60, 20))},
+            headers={"Accept": "text/event-stream"},
+        )
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        await get_async_client().aclose()
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(body, (
+            'event: fields\ndata: {"title": "Red Device"}\n\n'
+            'event: fields\ndata: {"category": "ELECTRONICS"}\n\n'
+            'event: done\ndata: {"title": "Red Device", "category": "ELECTRONICS"}\n\n'
+        ))
+
+    @patch("inventory.vision_providers.RETRY_BACKOFF_S", 0)
+    def test_async_calls_share_one_connection_pool(self):
+        server = self._start(seed=4, error_rate=0.5)
+
+        async def analyze_concurrently():
+            client = get_async_client()
+            try:
+                results = await asyncio.gather(
+                    *(aanalyze_item_images([_photo((200, 20, 20), size=(60, 20))]) for _ in range(4))
+                )
+                return results, client is get_async_client()
+            finally:
+                await client.aclose()
+
+        with override_settings(VISION_MAX_RETRIES=5):
+            results, shared = async_to_sync(analyze_concurrently)()
+        self.assertTrue(shared)
+        self.assertEqual([result["title"] for result in results], ["Red Device"] * 4)
+        self.assertGreater(server.RequestHandlerClass.config.errors, 0)
+
+
+@override_settings(VISION_PROVIDER="local")
+class AnalyzeEndpointTests(TestCase):
+    def test_staff_get_suggestions(self):
+        get_user_model().objects.create_user(username="staff", password="pw", is_staff=True)
+        client = Client()
+        client.login(username="staff", password="pw")
+        response = client.post(
+            reverse("inventory:analyze_images_ajax"), {"image_0": _photo((20, 20, 200), size=(20, 60))}
+        )
+        self.assertEqual(response.json()["title"], "Blue Bottle")
+
+    def test_phases_return_their_own_fields(self):
+        get_user_model().objects.create_user(username="staff", password="pw", is_staff=True)
+        client = Client()
+        client.login(username="staff", password="pw")
+        url = reverse("inventory:analyze_images_ajax")
+
+        response = client.post(url, {"phase": "quick", "image_0": _photo((20, 20, 200), size=(20, 60))})
+        self.assertEqual(response.json(), {"title": "Blue Bottle", "category": "BOTTLES_AND_CONTAINERS"})
+        self.assertRegex(response["Server-Timing"], r"^vision-quick;dur=\d+$")
+
+        response = client.post(url, {
+            "phase": "details",
+            "category": "BOTTLES_AND_CONTAINERS",
+            "title": "Blue Bottle",
+            "image_0": _photo((20, 20, 200), size=(20, 60)),
+        })
+        self.assertEqual(list(response.json()), ["description"])
+        self.assertIn("bottle", response.json()["description"])
 
+    def test_requires_staff_and_post(self):
+        response = Client().post(reverse("inventory:analyze_images_ajax"))
+        self.assertEqual(response.status_code, 403)
+        get_user_model().objects.create_user(username="staff", password="pw", is_staff=True)
+        client = Client()
+        client.login(username="staff", password="pw")
+        self.assertEqual(client.get(reverse("inventory:analyze_images_ajax")).status_code, 405)
@@ -0,0 +1,292 @@
+"""
+Resumable staging area for staff image uploads.
+
+The upload page sends each photo once, in chunks, as soon as it is picked.
+Chunks are appended to a file under ``UPLOAD_STAGING_DIR`` straight from the
+request stream, the image header is checked as soon as enough bytes have
+arrived, and the returned token is what both the analyze endpoint and the
+item form refer to. A dropped connection resumes from the offset the server
+reports instead of starting again.
+"""
+import json
+import logging
+import os
+import re
+import secrets
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from PIL import Image, UnidentifiedImageError
+
+from .ingest import heif_available, normalize_image
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "GIF", "WEBP", "HEIF", "MPO"}
+# Enough for every supported format to expose its dimensions; the probe is
+# retried as more bytes arrive, up to HEADER_PROBE_LIMIT
+HEADER_PROBE_BYTES = 64 * 1024
+HEADER_PROBE_LIMIT = 1024 * 1024
+COPY_BUFFER_BYTES = 64 * 1024
+TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+class UploadError(Exception):
+    """A staged upload was rejected; the message is safe to show to staff."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def inspect_image(file) -> tuple:
+    """
+    Return ``(format, width, height)`` from the image header alone.
+
+    ``Image.open`` only parses the header, so this is cheap even for a large
+    photo and works on a partially received file. Raises ``UploadError`` for
+    unsupported formats or images above ``MAX_IMAGE_PIXELS``.
+    """
+    heif_available()
+    position = file.tell() if hasattr(file, "tell") else None
+    try:
+        with Image.open(file) as img:
+            image_format, (width, height) = img.format, img.size
+    except (UnidentifiedImageError, OSError, SyntaxError) as e:
+        raise UploadError("File is not a supported image.") from e
+    finally:
+        if position is not None:
+            file.seek(position)
+
+    if image_format not in ALLOWED_FORMATS:
+        raise UploadError(f"{image_format} images are not supported.")
+    if width * height > settings.MAX_IMAGE_PIXELS:
+        raise UploadError(f"Image is too large ({width}x{height}).")
+    return image_format, width, height
+
+
+class StagedUpload:
+    """One upload in the staging directory: ``<token>.part`` plus ``<token>.json`` metadata."""
+
+    def __init__(self, token, meta):
+        self.token = token
+        self.meta = meta
+
+    @staticmethod
+    def directory() -> Path:
+        return Path(settings.UPLOAD_STAGING_DIR)
+
+    @property
+    def data_path(self) -> Path:
+        return self.directory() / f"{self.token}.part"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.directory() / f"{self.token}.json"
+
+    @property
+    def offset(self) -> int:
+        return self.meta["received"]
+
+    @property
+    def complete(self) -> bool:
+        return self.meta["received"] == self.meta["size"] and self.meta.get("format") is not None
+
+    @classmethod
+    def create(cls, user, filename, size, content_type="", scaled=False):
+        if size <= 0:
+            raise UploadError("File is empty.")
+        if size > settings.MAX_UPLOAD_BYTES:
+            raise UploadError(
+                f"File is larger than {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB.", status=413
+            )
+        upload = cls(secrets.token_urlsafe(18), {
+            "user_id": user.pk,
+            "filename": os.path.basename(filename or "upload")[:100],
+            "content_type": content_type,
+            "size": size,
+            # Downscaled in the browser; checked against UPLOAD_MAX_DIMENSION
+            "scaled": scaled,
+            "received": 0,
+            "format": None,
+            "width": None,
+            "height": None,
+            "created": time.time(),
+        })
+        upload.directory().mkdir(parents=True, exist_ok=True)
+        upload.data_path.touch()
+        upload._save_meta()
+        return upload
+
+    @classmethod
+    def load(cls, token, user):
+        """Return the upload for ``token`` if it exists and belongs to ``user``."""
+        if not token or not TOKEN_PATTERN.match(token):
+            raise UploadError("Unknown upload.", status=404)
+        try:
+            meta = json.loads((cls.directory() / f"{token}.json").read_text())
+        except (FileNotFoundError, ValueError):
+            raise UploadError("Unknown upload.", status=404)
+        if meta["user_id"] != user.pk:
+            raise UploadError("Unknown upload.", status=404)
+        return cls(token, meta)
+
+    def append(self, offset, stream) -> None:
+        """
+        Append bytes read from ``stream`` at ``offset``.
+
+        The offset must match what has been received so far, so a client that
+        lost a response re-asks for the offset instead of writing a gap. A
+        request retried while the original is still writing waits for it on a
+        lock held on the data file, then is rejected with the new offset.
+        """
+        try:
+            f = open(self.data_path, "r+b")
+        except FileNotFoundError:
+            raise UploadError("Unknown upload.", status=404)
+        with f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            # Another request may have appended since this upload was loaded
+            self._reload_meta()
+            if self.complete:
+                raise UploadError("Upload is already complete.", status=409)
+            if offset != self.offset:
+                raise UploadError(f"Expected offset {self.offset}.", status=409)
+
+            received = self.offset
+            f.seek(received)
+            while True:
+                chunk = stream.read(COPY_BUFFER_BYTES)
+                if not chunk:
+                    break
+                received += len(chunk)
+                if received > self.meta["size"]:
+                    f.truncate(self.offset)
+                    raise UploadError("Upload is larger than declared.", status=413)
+                f.write(chunk)
+            f.flush()
+            self.meta["received"] = received
+
+            try:
+                if self.meta["format"] is None and (received >= HEADER_PROBE_BYTES or received == self.meta["size"]):
+                    self._probe_header()
+                if self.complete:
+                    self._normalize()
+            except UploadError:
+                self.discard()
+                raise
+            self._save_meta()
+
+    def _probe_header(self) -> None:
+        with open(self.data_path, "rb") as f:
+            try:
+                image_format, width, height = inspect_image(f)
+            except UploadError:
+                if self.offset < min(self.meta["size"], HEADER_PROBE_LIMIT):
+                    # Some headers (e.g. JPEGs with large EXIF or ICC blocks)
+                    # need more bytes; try again after the next chunk.
+                    return
+                raise
+        if self.meta.get("scaled") and max(width, height) > settings.UPLOAD_MAX_DIMENSION:
+            raise UploadError(
+                f"Downscaled image is {width}x{height}, larger than {settings.UPLOAD_MAX_DIMENSION}px."
+            )
+        self.meta.update(format=image_format, width=width, height=height)
+
+    def _normalize(self) -> None:
+        """Run the ingest stage once, so analysis and the saved item both use the normalised bytes."""
+        try:
+            with open(self.data_path, "rb") as f:
+                normalized = normalize_image(f)
+        except Exception as e:
+            raise UploadError("File is not a supported image.") from e
+        self.meta["normalized"] = True
+        if normalized is None:
+            return
+        data, extension = normalized
+        tmp_path = self.directory() / f"{self.token}.normalized"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, self.data_path)
+        with Image.open(self.data_path) as img:
+            image_format, (width, height) = img.format, img.size
+        self.meta.update(
+            size=len(data),
+            received=len(data),
+            format=image_format,
+            width=width,
+            height=height,
+            filename=f"{os.path.splitext(self.meta['filename'])[0]}.{extension}",
+        )
+
+    def open(self) -> File:
+        """Open the completed upload as a Django ``File`` named after the original."""
+        if not self.complete:
+            raise UploadError("Upload is not complete.", status=409)
+        f = File(open(self.data_path, "rb"), name=self.meta["filename"])
+        f.content_type = Image.MIME.get(self.meta["format"]) or self.meta["content_type"] or "image/jpeg"
+        return f
+
+    def as_json(self) -> dict:
+        return {
+            "token": self.token,
+            "offset": self.offset,
+            "size": self.meta["size"],
+            "complete": self.complete,
+            "width": self.meta["width"],
+            "height": self.meta["height"],
+        }
+
+    def discard(self) -> None:
+        for path in (self.data_path, self.meta_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _reload_meta(self) -> None:
+        try:
+            self.meta = json.loads(self.meta_path.read_text())
+        except (FileNotFoundError, ValueError):
+            raise UploadError("Unknown upload.", status=404)
+
+    def _save_meta(self) -> None:
+        tmp_path = self.meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.meta))
+        os.replace(tmp_path, self.meta_path)
+
+
+def open_staged_uploads(tokens, user) -> list:
+    """Return ``(upload, file)`` pairs for the completed uploads among ``tokens``."""
+    opened = []
+    for token in tokens:
+        try:
+            upload = StagedUpload.load(token, user)
+            opened.append((upload, upload.open()))
+        except UploadError as e:
+            logger.warning("Ignoring staged upload %s: %s", token, e)
+    return opened
+
+
+def purge_stale_uploads(max_age_seconds) -> int:
+    """Delete staging files older than ``max_age_seconds``; return how many uploads were removed."""
+    directory = StagedUpload.directory()
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if not entry.name.endswith(".part") or entry.stat().st_mtime >= cutoff:
+            continue
+        StagedUpload(entry.name[:-len(".part")], {}).discard()
+        removed += 1
+    return removed
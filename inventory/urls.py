@@ -9,12 +9,18 @@ urlpatterns = [
     path("", views.LandingPageView.as_view(), name="landing"),
     # Public listing & detail views
     path("browse/", views.ItemListView.as_view(), name="item_list"),
+    path("browse/photo/", views.PhotoSearchView.as_view(), name="photo_search"),
     path("items/<int:pk>/", views.ItemDetailView.as_view(), name="item_detail"),
     path("items/<int:pk>/claim/", views.ClaimItemView.as_view(), name="claim_item"),
+    path("report/", views.LostReportView.as_view(), name="lost_report"),
+    path("locations/", views.LocationAutocompleteView.as_view(), name="location_autocomplete"),
     # Staff-only upload flow
     path("staff/items/upload/", views.ItemUploadView.as_view(), name="item_upload"),
-    path("staff/items/analyze/", views.analyze_images_ajax, name="analyze_images_ajax"),
+    path("staff/items/analyze/", views.AnalyzeImagesView.as_view(), name="analyze_images_ajax"),
+    path("staff/uploads/", views.UploadStagingView.as_view(), name="upload_staging"),
+    path("staff/uploads/<str:token>/", views.UploadStagingView.as_view(), name="staged_upload"),
     path("staff/dashboard/", views.AdminDashboardView.as_view(), name="admin_dashboard"),
+    path("staff/matches/", views.MatchQueueView.as_view(), name="match_queue"),
 ]
 
 
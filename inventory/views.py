@@ -1,21 +1,35 @@
-from datetime import timedelta
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Q
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.vary import vary_on_headers
 from django.views.generic import DetailView, ListView, TemplateView
 
-from .forms import ClaimItemForm, ItemForm, ItemImageFormSet
-from .models import Item
-from .services import analyze_item_images
+from .forms import ClaimItemForm, ItemForm, ItemImageFormSet, LostReportForm, PhotoSearchForm
+from .facets import get_facet_counts
+from .locations import find_location, location_suggestions
+from .matching import resolve_match
+from .media import serve_media
+from .models import ArchivedItem, Item, ItemImage, LostReport, ReportMatch, visible_items_q
+from .search import search_items
+from .services import aanalyze_item_details, aanalyze_item_images, aanalyze_item_quick, astream_item_analysis
+from .similarity import find_similar_items, search_items_by_photo
+from .singleflight import Superseded, coordinator
+from .uploads import StagedUpload, UploadError, open_staged_uploads
 
 
 class StaffRequiredMixin(UserPassesTestMixin):
@@ -24,6 +38,13 @@ class StaffRequiredMixin(UserPassesTestMixin):
         return user.is_authenticated and user.is_staff
 
 
+class MediaFileView(View):
+    """Uploaded photos; see ``inventory.media`` for access checks and caching."""
+
+    def get(self, request, path):
+        return serve_media(request, path)
+
+
 class LandingPageView(TemplateView):
     template_name = "inventory/landing.html"
 
@@ -31,6 +52,16 @@ class LandingPageView(TemplateView):
 class ItemUploadView(LoginRequiredMixin, StaffRequiredMixin, View):
     template_name = "inventory/item_upload.html"
 
+    def upload_settings(self):
+        """Limits the upload page's script applies before sending photos."""
+        return {
+            "upload_chunk_bytes": settings.UPLOAD_CHUNK_BYTES,
+            "upload_max_dimension": settings.UPLOAD_MAX_DIMENSION,
+            "upload_jpeg_quality": settings.UPLOAD_JPEG_QUALITY,
+            "upload_keep_original": settings.UPLOAD_KEEP_ORIGINAL,
+            "vision_streaming": settings.VISION_STREAMING,
+        }
+
     def get(self, request):
         item_form = ItemForm()
         formset = ItemImageFormSet()
@@ -40,12 +71,14 @@ class ItemUploadView(LoginRequiredMixin, StaffRequiredMixin, View):
             {
                 "item_form": item_form,
                 "formset": formset,
+                **self.upload_settings(),
             },
         )
 
     def post(self, request):
         item_form = ItemForm(request.POST)
         formset = ItemImageFormSet(request.POST, request.FILES)
+        staged_tokens = [token for token in request.POST.getlist("staged_tokens") if token]
 
         # Debug: Log form errors if any
         if not item_form.is_valid():
@@ -65,6 +98,9 @@ class ItemUploadView(LoginRequiredMixin, StaffRequiredMixin, View):
                 {
                     "item_form": item_form,
                     "formset": formset,
+                    **self.upload_settings(),
+                    # Photos already in the staging area do not need to be sent again.
+                    "staged_tokens": staged_tokens,
                 },
             )
 
@@ -77,6 +113,16 @@ class ItemUploadView(LoginRequiredMixin, StaffRequiredMixin, View):
         if formset.has_changed():
             formset.save()
 
+        # Photos sent ahead through the staging area are copied into media storage in chunks.
+        for upload, staged_file in open_staged_uploads(staged_tokens, request.user):
+            with staged_file:
+                ItemImage.objects.create(
+                    item=item,
+                    image=staged_file,
+                    normalized_at=timezone.now() if upload.meta.get("normalized") else None,
+                )
+            upload.discard()
+
         messages.success(
             request,
             f'Item "{item.title}" has been successfully uploaded!',
@@ -84,23 +130,175 @@ class ItemUploadView(LoginRequiredMixin, StaffRequiredMixin, View):
         return redirect(reverse("inventory:item_list"))
 
 
-@require_http_methods(["POST"])
-@csrf_exempt
-def analyze_images_ajax(request):
-    """AJAX endpoint to analyze images and return title/description suggestions."""
-    if not (request.user.is_authenticated and request.user.is_staff):
-        return JsonResponse({"error": "Unauthorized"}, status=403)
-    
-    uploaded_images = []
-    for key in request.FILES:
-        if key.startswith("image_"):
-            uploaded_images.append(request.FILES[key])
-    
-    if not uploaded_images:
-        return JsonResponse({"title": "", "description": ""})
-    
-    suggestions = analyze_item_images(uploaded_images)
-    return JsonResponse(suggestions)
+def _staff_user(request):
+    user = request.user
+    return user if user.is_authenticated and user.is_staff else None
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AnalyzeImagesView(View):
+    """
+    AJAX endpoint to analyze images and return title/description suggestions.
+
+    ``phase=quick`` returns only the title and category, from a thumbnail;
+    ``phase=details`` (with the chosen ``category`` and ``title``) only the
+    description. Without a phase the full suggestion is returned in one call.
+    A request replaced by a newer one from the same upload page gets a 409
+    with ``{"superseded": true}``.
+
+    With ``Accept: text/event-stream`` the fields are streamed as server-sent
+    events as soon as the model has written each one (see
+    ``_suggestion_events``).
+
+    Async, so under ASGI the vision API call waits on the event loop instead
+    of occupying a worker thread that public pages need.
+    """
+    http_method_names = ["post"]
+
+    async def post(self, request):
+        # Loading the session user touches the database, which is sync-only.
+        user = await sync_to_async(_staff_user)(request)
+        if user is None:
+            return JsonResponse({"error": "Unauthorized"}, status=403)
+
+        phase = request.POST.get("phase", "")
+        category, title = request.POST.get("category", ""), request.POST.get("title", "")[:200]
+        if phase not in ("quick", "details"):
+            phase = "full"
+        streaming = "text/event-stream" in request.headers.get("Accept", "")
+        direct_images = [request.FILES[key] for key in request.FILES if key.startswith("image_")]
+        staged_tokens = request.POST.getlist("staged_tokens")
+
+        async def analyze():
+            async with _analysis_images(direct_images, staged_tokens, user) as uploaded_images:
+                if not uploaded_images:
+                    return {"title": "", "description": ""}
+                if phase == "quick":
+                    return await aanalyze_item_quick(uploaded_images)
+                if phase == "details":
+                    return await aanalyze_item_details(uploaded_images, category, title)
+                return await aanalyze_item_images(uploaded_images)
+
+        async def analyze_streaming():
+            async with _analysis_images(direct_images, staged_tokens, user) as uploaded_images:
+                if not uploaded_images:
+                    yield {"title": "", "description": ""}
+                    return
+                async for fields in astream_item_analysis(uploaded_images, phase, category, title):
+                    yield fields
+
+        # One upload page (the session cookie plus the page's own id) gets at
+        # most one vision call in flight; see inventory.singleflight.
+        session = f"{request.session.session_key or user.pk}:{request.POST.get('upload_session', '')[:64]}"
+        fingerprint = await sync_to_async(_analysis_fingerprint, thread_sensitive=False)(
+            phase, category, title, staged_tokens, direct_images, streaming
+        )
+        if streaming:
+            return StreamingHttpResponse(
+                _suggestion_events(coordinator.stream(session, fingerprint, analyze_streaming)),
+                content_type="text/event-stream",
+                # Proxies must pass each event on as it is written.
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
+        started = time.perf_counter()
+        try:
+            suggestions = await coordinator.run(session, fingerprint, analyze)
+        except Superseded:
+            return JsonResponse({"superseded": True}, status=409)
+        response = JsonResponse(suggestions)
+        response["Server-Timing"] = f"vision-{phase};dur={(time.perf_counter() - started) * 1000:.0f}"
+        return response
+
+
+@asynccontextmanager
+async def _analysis_images(direct_images, staged_tokens, user):
+    """Photos sent with the request plus those already in the staging area, referenced by token."""
+    staged = await sync_to_async(open_staged_uploads, thread_sensitive=False)(staged_tokens, user)
+    try:
+        yield direct_images + [staged_file for _, staged_file in staged]
+    finally:
+        for _, staged_file in staged:
+            staged_file.close()
+
+
+async def _suggestion_events(stream):
+    """
+    Server-sent events for a streamed analysis: a ``fields`` event per batch
+    of completed fields, then ``done`` with all of them, or ``superseded``.
+    """
+    suggestion = {}
+    try:
+        async for fields in stream:
+            suggestion.update(fields)
+            yield f"event: fields\ndata: {json.dumps(fields)}\n\n"
+    except Superseded:
+        yield "event: superseded\ndata: {}\n\n"
+        return
+    yield f"event: done\ndata: {json.dumps(suggestion)}\n\n"
+
+
+def _analysis_fingerprint(phase, category, title, staged_tokens, files, streaming=False) -> str:
+    """Identify an analysis request by everything that affects its answer."""
+    digest = hashlib.sha256(json.dumps([phase, category, title, staged_tokens, streaming]).encode())
+    for uploaded in files:
+        for chunk in uploaded.chunks():
+            digest.update(chunk)
+        uploaded.seek(0)
+    return digest.hexdigest()
+
+
+class UploadStagingView(StaffRequiredMixin, View):
+    """
+    Resumable chunked photo uploads for the staff upload page.
+
+    ``POST`` with ``{"filename", "size", "content_type"}`` starts an upload and
+    returns its token. Each chunk is then ``PUT`` as the raw request body with
+    an ``Upload-Offset`` header; ``GET`` reports the offset to resume from and
+    ``DELETE`` discards the upload.
+    """
+    raise_exception = True
+    http_method_names = ["get", "post", "put", "delete"]
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except UploadError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+
+    def post(self, request, token=None):
+        if token is not None:
+            return JsonResponse({"error": "Method not allowed"}, status=405)
+        try:
+            data = json.loads(request.body)
+            size = int(data.get("size") or 0)
+        except (ValueError, TypeError, AttributeError):
+            return JsonResponse({"error": "Invalid request"}, status=400)
+        upload = StagedUpload.create(
+            request.user,
+            filename=str(data.get("filename", "")),
+            size=size,
+            content_type=str(data.get("content_type", "")),
+            scaled=bool(data.get("scaled")),
+        )
+        return JsonResponse(dict(upload.as_json(), chunk_size=settings.UPLOAD_CHUNK_BYTES), status=201)
+
+    def get(self, request, token=None):
+        return JsonResponse(StagedUpload.load(token, request.user).as_json())
+
+    def put(self, request, token=None):
+        upload = StagedUpload.load(token, request.user)
+        try:
+            offset = int(request.headers.get("Upload-Offset", ""))
+        except ValueError:
+            return JsonResponse({"error": "Missing Upload-Offset header"}, status=400)
+        # Read straight from the request stream so a chunk is never buffered whole.
+        upload.append(offset, request)
+        return JsonResponse(upload.as_json())
+
+    def delete(self, request, token=None):
+        StagedUpload.load(token, request.user).discard()
+        return JsonResponse({"success": True})
 
 
 class ItemUploadConfirmView(LoginRequiredMixin, StaffRequiredMixin, View):
@@ -134,60 +332,31 @@ class ItemUploadConfirmView(LoginRequiredMixin, StaffRequiredMixin, View):
         )
         return redirect(reverse("inventory:item_list"))
 
+# Pages rendering item photos pick the image format from the Accept header.
+vary_on_accept = method_decorator(vary_on_headers("Accept"), name="dispatch")
+
+
+@vary_on_accept
 class ItemListView(ListView):
     model = Item
     template_name = "inventory/item_list.html"
     context_object_name = "items"
     paginate_by = 20
 
-    def get_claim_duration_days(self, category):
-        """Return the number of days a claimed item should remain visible based on category."""
-        duration_map = {
-            Item.Category.ELECTRONICS: 7,
-            Item.Category.SPORTS_AND_CLOTHING: 3,
-            Item.Category.BAGS_AND_CARRY: 1,
-            Item.Category.BOTTLES_AND_CONTAINERS: 1,
-            Item.Category.OTHER_MISC: 1,
-            Item.Category.DOCUMENTS_AND_IDS: 1,  # Default for documents
-            Item.Category.NOTEBOOKS_AND_BOOKS: 1,  # Default for notebooks
-        }
-        return duration_map.get(category, 1)
-
     def get_queryset(self):
-        now = timezone.now()
-        
-        # Build Q objects for claimed items that are still within their category-specific duration
-        claimed_q_objects = Q()
-        for category, _ in Item.Category.choices:
-            duration_days = self.get_claim_duration_days(category)
-            cutoff_date = now - timedelta(days=duration_days)
-            claimed_q_objects |= Q(
-                status=Item.Status.CLAIMED,
-                category=category,
-                claimed_at__isnull=False,
-                claimed_at__gte=cutoff_date
-            )
-        
-        # Combine FOUND items and CLAIMED items within duration
-        queryset = Item.objects.filter(
-            Q(status=Item.Status.FOUND) | claimed_q_objects
-        ).prefetch_related('images', 'claims')
+        # FOUND items and CLAIMED items within their category's visibility window
+        queryset = Item.objects.filter(visible_items_q()).prefetch_related('images', 'claims')
 
         # Category filter
         category = self.request.GET.get("category")
         if category:
             queryset = queryset.filter(category=category)
 
-        # Search query
-        q = self.request.GET.get("q")
-        if q:
-            queryset = queryset.filter(
-                Q(title__icontains=q) | Q(description__icontains=q)
-            )
-
+        # Location filter: any spelling or alias of a location, matched on the indexed foreign key
         location = self.request.GET.get("location")
         if location:
-            queryset = queryset.filter(location_found__icontains=location)
+            self.location = find_location(location)
+            queryset = queryset.filter(location=self.location) if self.location else queryset.none()
 
         date_from = parse_date(self.request.GET.get("date_from") or "")
         if date_from:
@@ -197,16 +366,36 @@ class ItemListView(ListView):
         if date_to:
             queryset = queryset.filter(date_found__lte=date_to)
 
-        return queryset.order_by('-date_found', '-created_at')
+        queryset = queryset.order_by('-date_found', '-created_at')
+
+        # Search query: typo-tolerant and synonym-aware, ordered by relevance
+        q = self.request.GET.get("q")
+        if q:
+            queryset = search_items(queryset, q)
+
+        return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['current_category'] = self.request.GET.get("category", "")
         context['search_query'] = self.request.GET.get("q", "")
         context['all_categories'] = Item.Category.choices
+        location = getattr(self, "location", None)
+        context['current_location'] = location.name if location else self.request.GET.get("location", "")
+        context['facet_counts'] = get_facet_counts()
         return context
 
 
+class LocationAutocompleteView(View):
+    """Location names starting with ``q``, for the upload form and the browse filters."""
+
+    def get(self, request):
+        response = JsonResponse({"results": location_suggestions(request.GET.get("q", ""))})
+        patch_cache_control(response, public=True, max_age=settings.FACET_CACHE_SECONDS)
+        return response
+
+
+@vary_on_accept
 class ItemDetailView(DetailView):
     model = Item
     template_name = "inventory/item_detail.html"
@@ -215,6 +404,57 @@ class ItemDetailView(DetailView):
     def get_queryset(self):
         return Item.objects.prefetch_related('images', 'claims')
 
+    def get(self, request, *args, **kwargs):
+        try:
+            return super().get(request, *args, **kwargs)
+        except Http404:
+            # Items removed by the retention job leave a tombstone so old links still resolve.
+            archived_item = ArchivedItem.objects.filter(original_id=kwargs["pk"]).first()
+            if archived_item is None:
+                raise
+            return render(
+                request,
+                "inventory/item_archived.html",
+                {"archived_item": archived_item},
+                status=410,
+            )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['similar_items'] = find_similar_items(self.object)
+        return context
+
+
+@vary_on_accept
+class PhotoSearchView(View):
+    """Find items that look like an uploaded photo using the local similarity index."""
+    http_method_names = ["post"]
+    template_name = "inventory/item_list.html"
+
+    def post(self, request):
+        form = PhotoSearchForm(request.POST, request.FILES)
+        items = []
+        if form.is_valid():
+            items = search_items_by_photo(form.cleaned_data['photo'])
+        else:
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, f"{field}: {error}")
+
+        return render(
+            request,
+            self.template_name,
+            {
+                "items": items,
+                "is_paginated": False,
+                "photo_search": True,
+                "current_category": "",
+                "search_query": "",
+                "all_categories": Item.Category.choices,
+                "facet_counts": get_facet_counts(),
+            },
+        )
+
 
 class ClaimItemView(View):
     """Handle item claiming - allows multiple people to claim the same item."""
@@ -269,6 +509,53 @@ class ClaimItemView(View):
         return redirect("inventory:item_detail", pk=pk)
 
 
+class LostReportView(View):
+    """Let a student describe something they lost; the matcher compares it with found items."""
+    template_name = "inventory/lost_report.html"
+
+    def get(self, request):
+        return render(request, self.template_name, {"form": LostReportForm()})
+
+    def post(self, request):
+        form = LostReportForm(request.POST, request.FILES)
+        if not form.is_valid():
+            return render(request, self.template_name, {"form": form})
+        report = form.save()
+        return render(request, self.template_name, {"report": report})
+
+
+@vary_on_accept
+class MatchQueueView(LoginRequiredMixin, StaffRequiredMixin, View):
+    """Suggested report/item matches for staff to confirm or dismiss, best first."""
+    template_name = "inventory/match_queue.html"
+    paginate_by = 25
+
+    def get(self, request):
+        from django.core.paginator import Paginator
+
+        pending = (
+            ReportMatch.objects.filter(status=ReportMatch.Status.PENDING, report__status=LostReport.Status.OPEN)
+            .select_related("report", "item")
+            .prefetch_related("item__images")
+            .order_by("-score", "-created_at")
+        )
+        page_obj = Paginator(pending, self.paginate_by).get_page(request.GET.get("page"))
+        return render(request, self.template_name, {"matches": page_obj, "page_obj": page_obj})
+
+    def post(self, request):
+        match = get_object_or_404(ReportMatch, pk=request.POST.get("match_id"), status=ReportMatch.Status.PENDING)
+        confirmed = request.POST.get("action") == "confirm"
+        resolve_match(match, confirmed)
+        if confirmed:
+            messages.success(
+                request,
+                f'Matched "{match.item.title}" to {match.report.reporter_name}\'s report. '
+                f"Contact: {match.report.reporter_contact or 'none given'}.",
+            )
+        return redirect(f"{reverse('inventory:match_queue')}?page={request.POST.get('page', 1)}")
+
+
+@vary_on_accept
 class AdminDashboardView(LoginRequiredMixin, StaffRequiredMixin, View):
     """Admin dashboard showing all items in a table with claim information."""
     template_name = "inventory/admin_dashboard.html"
@@ -321,10 +608,7 @@ class AdminDashboardView(LoginRequiredMixin, StaffRequiredMixin, View):
             if item.claim_count > 1:
                 items_with_multiple_claims.add(item.pk)
         
-        # Prepare claimants data for JavaScript (for the overlay)
-        import json
-        from django.core.serializers.json import DjangoJSONEncoder
-        
+        # Claimants for the overlay, handed to admin_dashboard.js via json_script
         claimants_data = {}
         for item in page_obj:
             if item.claims.exists():
@@ -342,7 +626,10 @@ class AdminDashboardView(LoginRequiredMixin, StaffRequiredMixin, View):
             'is_paginated': page_obj.has_other_pages(),
             'claim_messages': claim_messages,
             'items_with_multiple_claims': items_with_multiple_claims,
-            'claimants_data': json.dumps(claimants_data, cls=DjangoJSONEncoder),
+            'claimants_data': claimants_data,
+            'pending_matches': ReportMatch.objects.filter(
+                status=ReportMatch.Status.PENDING, report__status=LostReport.Status.OPEN
+            ).count(),
         }
         
         return render(request, self.template_name, context)
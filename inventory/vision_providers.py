@@ -0,0 +1,888 @@
+import asyncio
+import base64
+import colorsys
+import json
+import logging
+import re
+import time
+import weakref
+from io import BytesIO
+from typing import Mapping
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limiting and transient upstream failures.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_BACKOFF_S = 0.5
+
+CATEGORY_CHOICES_TEXT = (
+    'one of: Electronics, Bags and Carry, Sports and clothing, '
+    'Bottles and containers, Documents and Id\\"s, Notebooks/books, Other/Misc'
+)
+
+# Description (and title) formatting rules, keyed by the Item.Category value
+# they apply to. The full prompts include all of them; the detailed pass of
+# tiered analysis only sends the one for the category the quick pass chose.
+CATEGORY_RULES = {
+    "NOTEBOOKS_AND_BOOKS": (
+        "NOTEBOOKS/BOOKS: "
+        "If it's a TISB notebook (identified by 'the international school bangalore' on cover), "
+        "description should ONLY include: color of the book, name written on it, class and section, and subject name. "
+        "No other details. "
+        "For other books/notebooks: emphasize any labels first, then describe patterns and design."
+    ),
+    "ELECTRONICS": (
+        "ELECTRONICS: "
+        "Identify the device type, then brand name. If brand is not visible, describe key features. "
+        "Title should be: [Brand] [Device Type] [Color] [Model if visible]. "
+        "Description should emphasize brand name and model if found, then describe design, patterns, and physical features."
+    ),
+    "BAGS_AND_CARRY": (
+        "BAGS AND CARRY: "
+        "Title should be: [Color] [Brand if visible] [Type of bag]. "
+        "Description should mention features like keychains, tears, zippers, pockets, and other distinguishing characteristics."
+    ),
+    "BOTTLES_AND_CONTAINERS": (
+        "BOTTLES AND CONTAINERS: "
+        "Title should be: [Brand if visible] [Bottle or Box] [Color]. "
+        "Description should focus on physical features like dents, scratches, stickers, and other visible characteristics."
+    ),
+    "OTHER_MISC": (
+        "OTHER/MISC: "
+        "Describe as usual with relevant details."
+    ),
+}
+DEFAULT_CATEGORY_RULE = (
+    "ALL OTHER CATEGORIES: "
+    "Describe as usual but avoid unnecessary trivial details (e.g., don't mention specific button colors unless relevant). "
+    "Focus on useful identifying information."
+)
+
+DESCRIPTION_RULES = (
+    "DESCRIPTION FORMATTING RULES BY CATEGORY:\n\n"
+    + "".join(
+        f"{number}. {rule}\n\n"
+        for number, rule in enumerate([*CATEGORY_RULES.values(), DEFAULT_CATEGORY_RULE], start=1)
+    )
+)
+
+
+def single_item_prompt(image_count: int) -> str:
+    """Prompt asking for one JSON object describing one item."""
+    image_count_text = f"{image_count} image" if image_count == 1 else f"{image_count} images"
+    return (
+        f"You are helping catalog lost-and-found items for a reception desk. "
+        f"Given {image_count_text} of the same item from different angles/views, analyze ALL images comprehensively "
+        f"to provide the most accurate identification. Consider all visible details across all images. "
+        f"Respond with JSON only, with this exact shape:\n"
+        '{ "title": "short, specific title", '
+        f'"category": "{CATEGORY_CHOICES_TEXT}", '
+        '"description": "detailed description (format varies by category - see rules below)" }.\n\n'
+        "IMPORTANT: Analyze ALL images together. If different images show different aspects (e.g., one shows a case, another shows the device screen), "
+        "use the most identifying features from ALL images to determine what the item actually is. "
+        "Do not be biased toward the first image - consider all images equally.\n\n"
+        + DESCRIPTION_RULES +
+        "Do not include any explanation or text outside the JSON. Return only valid JSON."
+    )
+
+
+def batch_prompt(item_count: int) -> str:
+    """Prompt asking for a JSON array with one object per labelled item."""
+    return (
+        f"You are helping catalog lost-and-found items for a reception desk. "
+        f"The images below show {item_count} DIFFERENT items. Each item's images are preceded by a "
+        f'line of the form Item "<item_id>". Analyze each item separately, using all of its images and none '
+        f"of the other items' images. "
+        f"Respond with a JSON array only, with one object per item in this exact shape:\n"
+        '[{ "item_id": "the id from the Item line", "title": "short, specific title", '
+        f'"category": "{CATEGORY_CHOICES_TEXT}", '
+        '"description": "detailed description (format varies by category - see rules below)" }].\n\n'
+        + DESCRIPTION_RULES +
+        "Do not include any explanation or text outside the JSON. Return only valid JSON."
+    )
+
+
+def batch_item_label(key) -> str:
+    """Text part that introduces one item's images in a batched request."""
+    return f'Item "{key}":'
+
+
+def quick_prompt() -> str:
+    """Short prompt for the first pass of tiered analysis: title and category from one thumbnail."""
+    return (
+        "You are helping catalog a lost-and-found item. Identify the item in this photo. "
+        "Respond with JSON only, with this exact shape:\n"
+        '{ "title": "short, specific title, e.g. [Color] [Brand if visible] [Type of item]", '
+        f'"category": "{CATEGORY_CHOICES_TEXT}" }}.\n'
+        "Return only valid JSON."
+    )
+
+
+def detail_prompt(image_count: int, category: str, title: str = "") -> str:
+    """
+    Prompt for the second pass of tiered analysis: a description written to
+    the rule for ``category`` (an Item.Category value) only.
+    """
+    image_count_text = f"{image_count} image" if image_count == 1 else f"{image_count} images"
+    identified = f'identified as "{title}"' if title else "already identified"
+    return (
+        f"You are helping catalog lost-and-found items for a reception desk. "
+        f"Given {image_count_text} of the same item from different angles/views, {identified}, "
+        f"write its description using the most identifying features from ALL images. "
+        f"Respond with JSON only, with this exact shape:\n"
+        '{ "description": "detailed description following the rule below" }.\n\n'
+        + CATEGORY_RULES.get(category, DEFAULT_CATEGORY_RULE) + "\n\n"
+        "Do not include any explanation or text outside the JSON. Return only valid JSON."
+    )
+
+
+# Words that map free text onto an Item.Category value, checked in order.
+# Also seeds the search synonym table (see inventory.search).
+CATEGORY_KEYWORDS = {
+    "ELECTRONICS": ("electronic", "laptop", "phone", "tablet", "charger"),
+    "BAGS_AND_CARRY": ("bag", "backpack", "carry", "luggage"),
+    "SPORTS_AND_CLOTHING": ("cloth", "shirt", "pants", "jacket", "shoe", "wearable", "sport"),
+    "BOTTLES_AND_CONTAINERS": ("bottle", "flask", "container", "tupperware"),
+    "DOCUMENTS_AND_IDS": ("document", "id", "passport", "license", "card"),
+    "NOTEBOOKS_AND_BOOKS": ("notebook", "book", "diary"),
+}
+
+
+def normalize_category(value: str) -> str:
+    """Map a free-text category from the model onto an Item.Category value."""
+    v = value.lower()
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if any(keyword in v for keyword in keywords):
+            return category
+    return "OTHER_MISC"
+
+
+class PartialJSONObject:
+    """
+    Incremental parser for the flat JSON object of strings a streamed
+    response builds up. ``feed`` takes the next piece of text and returns the
+    fields whose values it completed, so a title can be used while the
+    description is still being generated.
+    """
+
+    FIELD = re.compile(r'\s*[{,]?\s*"(?P<key>(?:[^"\\]|\\.)*)"\s*:\s*"(?P<value>(?:[^"\\]|\\.)*)"')
+
+    def __init__(self):
+        self.text = ""
+        # End of the last complete field; matching resumes here
+        self.position = 0
+
+    def feed(self, text: str) -> dict:
+        self.text += text
+        fields = {}
+        while True:
+            match = self.FIELD.match(self.text, self.position)
+            if match is None:
+                return fields
+            # The matched value is still JSON-escaped.
+            fields[json.loads(f'"{match["key"]}"')] = json.loads(f'"{match["value"]}"', strict=False)
+            self.position = match.end()
+
+
+# Fields each kind of analysis returns.
+FULL_FIELDS = ("title", "description", "category")
+QUICK_FIELDS = ("title", "category")
+DETAIL_FIELDS = ("description",)
+
+
+def clean_fields(parsed: Mapping) -> dict:
+    """Strip each of the model's values and normalise the category, if there is one."""
+    cleaned = {field: (value or "").strip() for field, value in parsed.items()}
+    if "category" in cleaned:
+        cleaned["category"] = normalize_category(cleaned["category"])
+    return cleaned
+
+
+def clean_suggestion(parsed: Mapping, fields=FULL_FIELDS) -> Mapping[str, str]:
+    """Strip the model's ``fields`` and normalise the category."""
+    suggestion = clean_fields({field: parsed.get(field) for field in fields})
+
+    if not suggestion.get("title") and not suggestion.get("description"):
+        logger.warning("Vision provider returned empty %s: %s", "/".join(fields), parsed)
+
+    return suggestion
+
+
+def read_image_files(files) -> list:
+    """Return ``(bytes, content_type)`` for each readable file."""
+    images = []
+    for image_file in files:
+        try:
+            # Read file bytes
+            image_file.seek(0)
+            image_bytes = image_file.read()
+            image_file.seek(0)
+        except Exception:
+            logger.exception("Failed to read image file for vision analysis")
+            continue
+        content_type = getattr(image_file, "content_type", "image/jpeg") or "image/jpeg"
+        images.append((image_bytes, content_type))
+    return images
+
+
+def thumbnail_image(image_bytes: bytes, size: int = 0) -> tuple:
+    """
+    Return ``(jpeg bytes, "image/jpeg")`` scaled to fit ``size`` pixels
+    (default ``settings.VISION_THUMBNAIL_SIZE``), or the input unchanged if
+    it cannot be decoded or is already that small.
+    """
+    from PIL import Image
+
+    from .ingest import heif_available
+
+    size = size or getattr(settings, "VISION_THUMBNAIL_SIZE", 512)
+    heif_available()
+    try:
+        img = Image.open(BytesIO(image_bytes))
+        if max(img.size) <= size:
+            return image_bytes, Image.MIME.get(img.format, "image/jpeg")
+        # draft() lets the JPEG decoder skip most of the pixels.
+        img.draft("RGB", (size, size))
+        img = img.convert("RGB")
+        img.thumbnail((size, size))
+        buffer = BytesIO()
+        img.save(buffer, format="JPEG", quality=80)
+    except Exception:
+        logger.warning("Could not thumbnail image for quick vision analysis; sending it as is")
+        return image_bytes, "image/jpeg"
+    return buffer.getvalue(), "image/jpeg"
+
+
+def read_thumbnail(files) -> list:
+    """``read_image_files`` for the first readable file only, thumbnailed."""
+    images = read_image_files(files[:1])
+    return [thumbnail_image(image_bytes) for image_bytes, _ in images]
+
+
+def post_with_retries(url: str, body: dict, timeout: float, headers=None):
+    """
+    POST JSON, retrying rate-limited and transient failures with exponential
+    backoff. Returns the last response; re-raises the last connection error.
+    """
+    # HTTP clients are imported on first use to keep them out of process startup.
+    import requests
+
+    max_retries = getattr(settings, "VISION_MAX_RETRIES", 2)
+    for attempt in range(max_retries + 1):
+        last_attempt = attempt == max_retries
+        try:
+            resp = requests.post(url, json=body, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if last_attempt:
+                raise
+            logger.warning("Vision API connection failed; retrying (attempt %d)", attempt + 1)
+        else:
+            if resp.status_code not in RETRY_STATUSES or last_attempt:
+                return resp
+            logger.warning("Vision API HTTP %s; retrying (attempt %d)", resp.status_code, attempt + 1)
+        time.sleep(RETRY_BACKOFF_S * (2 ** attempt))
+
+
+# One pooled client per event loop: an AsyncClient cannot be shared across loops.
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    Return the running event loop's shared ``httpx.AsyncClient``, so
+    concurrent vision calls from async views reuse keep-alive connections.
+    """
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        max_connections = getattr(settings, "VISION_MAX_CONNECTIONS", 100)
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def astream_candidate_text(url: str, body: dict, timeout: float):
+    """
+    POST to a Gemini ``streamGenerateContent?alt=sse`` endpoint and yield the
+    first candidate's text as each server-sent event arrives. An HTTP error
+    is logged and yields nothing; there are no retries once streaming.
+    """
+    client = get_async_client()
+    async with client.stream("POST", url, json=body, timeout=timeout) as resp:
+        if resp.status_code != 200:
+            await resp.aread()
+            logger.error("Gemini Vision API HTTP error %s: %s", resp.status_code, resp.text[:500])
+            return
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            chunk = json.loads(line[len("data:"):])
+            for candidate in chunk.get("candidates", [])[:1]:
+                for part in candidate.get("content", {}).get("parts", []):
+                    if "text" in part:
+                        yield part["text"]
+
+
+async def apost_with_retries(url: str, body: dict, timeout: float, headers=None):
+    """Async version of ``post_with_retries`` using the shared connection pool."""
+    import httpx
+
+    client = get_async_client()
+    max_retries = getattr(settings, "VISION_MAX_RETRIES", 2)
+    for attempt in range(max_retries + 1):
+        last_attempt = attempt == max_retries
+        try:
+            resp = await client.post(url, json=body, headers=headers, timeout=timeout)
+        except httpx.TransportError:
+            if last_attempt:
+                raise
+            logger.warning("Vision API connection failed; retrying (attempt %d)", attempt + 1)
+        else:
+            if resp.status_code not in RETRY_STATUSES or last_attempt:
+                return resp
+            logger.warning("Vision API HTTP %s; retrying (attempt %d)", resp.status_code, attempt + 1)
+        await asyncio.sleep(RETRY_BACKOFF_S * (2 ** attempt))
+
+
+class VisionProvider:
+    """
+    Backend that turns item photos into title/description/category suggestions.
+
+    ``analyze`` takes the files for one item; ``analyze_batch`` takes a
+    mapping of item key -> files and returns key -> suggestions. Both return
+    {} for anything that could not be analysed. ``aanalyze`` is the async
+    variant used by async views.
+
+    Tiered analysis splits ``analyze`` in two: ``analyze_quick`` returns the
+    title and category from a thumbnail of the first photo, and
+    ``analyze_details`` the description from every photo once the category
+    is known. The defaults fall back to a full ``analyze``.
+    """
+
+    name = ""
+
+    def is_configured(self) -> bool:
+        return True
+
+    def analyze(self, files: list) -> Mapping[str, str]:
+        raise NotImplementedError
+
+    async def aanalyze(self, files: list) -> Mapping[str, str]:
+        # Providers without a native async path run in a worker thread.
+        return await sync_to_async(self.analyze, thread_sensitive=False)(files)
+
+    def analyze_quick(self, files: list) -> Mapping[str, str]:
+        suggestion = self.analyze(files[:1])
+        return {field: suggestion[field] for field in QUICK_FIELDS if field in suggestion}
+
+    def analyze_details(self, files: list, category: str, title: str = "") -> Mapping[str, str]:
+        suggestion = self.analyze(files)
+        return {field: suggestion[field] for field in DETAIL_FIELDS if field in suggestion}
+
+    async def aanalyze_quick(self, files: list) -> Mapping[str, str]:
+        return await sync_to_async(self.analyze_quick, thread_sensitive=False)(files)
+
+    async def aanalyze_details(self, files: list, category: str, title: str = "") -> Mapping[str, str]:
+        return await sync_to_async(self.analyze_details, thread_sensitive=False)(files, category, title)
+
+    async def astream(self, files: list, phase: str = "full", category: str = "", title: str = ""):
+        """
+        Yield dicts of suggestion fields for ``phase`` ("full", "quick" or
+        "details") as they become available. Providers that cannot stream
+        yield everything at once.
+        """
+        if phase == "quick":
+            yield await self.aanalyze_quick(files)
+        elif phase == "details":
+            yield await self.aanalyze_details(files, category, title)
+        else:
+            yield await self.aanalyze(files)
+
+    def analyze_batch(self, items: Mapping, throttle=None) -> dict:
+        """
+        Analyse several items, one request each. ``throttle``, if given, is
+        called before every request.
+        """
+        results = {}
+        for key, files in items.items():
+            if throttle:
+                throttle()
+            results[key] = self.analyze(files)
+        return results
+
+
+class GeminiProvider(VisionProvider):
+    """Google Gemini generateContent API (or anything speaking its wire format)."""
+
+    name = "gemini"
+
+    def __init__(self):
+        self.api_key = getattr(settings, "GOOGLE_API_KEY", "")
+        self.base_url = getattr(settings, "GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
+        self.model = getattr(settings, "GEMINI_MODEL", "gemini-2.5-flash")
+
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    def analyze(self, files: list) -> Mapping[str, str]:
+        return self._analyze_phase(files, "full")
+
+    async def aanalyze(self, files: list) -> Mapping[str, str]:
+        return await self._aanalyze_phase(files, "full")
+
+    def analyze_quick(self, files: list) -> Mapping[str, str]:
+        return self._analyze_phase(files, "quick")
+
+    async def aanalyze_quick(self, files: list) -> Mapping[str, str]:
+        return await self._aanalyze_phase(files, "quick")
+
+    def analyze_details(self, files: list, category: str, title: str = "") -> Mapping[str, str]:
+        return self._analyze_phase(files, "details", category, title)
+
+    async def aanalyze_details(self, files: list, category: str, title: str = "") -> Mapping[str, str]:
+        return await self._aanalyze_phase(files, "details", category, title)
+
+    async def astream(self, files: list, phase: str = "full", category: str = "", title: str = ""):
+        """
+        Stream from ``streamGenerateContent`` and yield each field as soon as
+        its JSON value is complete. If the stream fails or ends before every
+        field has arrived, the unstreamed call (with its retries) supplies
+        the fields still missing.
+        """
+        parts, fields, timeout = await sync_to_async(self._phase_request, thread_sensitive=False)(
+            files, phase, category, title
+        )
+        if not parts:
+            logger.warning("No valid images to analyze")
+            return
+
+        endpoint, body = self._request(parts, method="streamGenerateContent")
+        parser = PartialJSONObject()
+        missing = set(fields)
+        try:
+            async for text in astream_candidate_text(endpoint, body, timeout):
+                completed = {key: value for key, value in parser.feed(text).items() if key in missing}
+                if completed:
+                    missing -= completed.keys()
+                    yield clean_fields(completed)
+        except Exception:
+            logger.exception("Gemini Vision API streaming call failed")
+        if missing:
+            result = self._parse_single_response(await self._agenerate(parts, timeout=timeout), fields)
+            yield {key: value for key, value in result.items() if key in missing}
+
+    def _phase_request(self, files, phase, category="", title="") -> tuple:
+        """Return ``(parts, fields, timeout)`` for one analysis phase; no parts if no image was readable."""
+        # Process ALL images, not just the first one (the quick pass sends a thumbnail of the first)
+        image_parts = self._image_parts(files, thumbnail=phase == "quick")
+        if phase == "quick":
+            prompt, fields, timeout = quick_prompt(), QUICK_FIELDS, 10
+        elif phase == "details":
+            prompt, fields, timeout = detail_prompt(len(image_parts), category, title), DETAIL_FIELDS, 30
+        else:
+            prompt, fields, timeout = single_item_prompt(len(image_parts)), FULL_FIELDS, 30
+        # Build parts array with prompt followed by all images
+        parts = [{"text": prompt}] + image_parts if image_parts else []
+        return parts, fields, timeout
+
+    def _analyze_phase(self, files, phase, category="", title="") -> Mapping[str, str]:
+        parts, fields, timeout = self._phase_request(files, phase, category, title)
+        if not parts:
+            logger.warning("No valid images to analyze")
+            return {}
+        return self._parse_single_response(self._generate(parts, timeout=timeout), fields)
+
+    async def _aanalyze_phase(self, files, phase, category="", title="") -> Mapping[str, str]:
+        # Reading and encoding the photos is blocking file I/O.
+        parts, fields, timeout = await sync_to_async(self._phase_request, thread_sensitive=False)(
+            files, phase, category, title
+        )
+        if not parts:
+            logger.warning("No valid images to analyze")
+            return {}
+        return self._parse_single_response(await self._agenerate(parts, timeout=timeout), fields)
+
+    @staticmethod
+    def _parse_single_response(content_text, fields=FULL_FIELDS) -> Mapping[str, str]:
+        if content_text is None:
+            return {}
+        try:
+            parsed = json.loads(content_text)
+        except Exception:
+            logger.exception("Gemini Vision API returned invalid JSON")
+            return {}
+
+        return clean_suggestion(parsed, fields)
+
+    def analyze_batch(self, items: Mapping, throttle=None) -> dict:
+        """
+        Send every item's images, labelled by key, in one request and map the
+        JSON array response back. Items missing from, or unparseable in, the
+        response are retried one at a time; if the batched call itself fails,
+        nothing is retried and every item maps to {}. ``throttle``, if given,
+        is called before every request.
+        """
+        keys_by_label = {}
+        item_parts = []
+        for key, files in items.items():
+            image_parts = self._image_parts(files)
+            if not image_parts:
+                continue
+            keys_by_label[str(key)] = key
+            item_parts.append({"text": batch_item_label(key)})
+            item_parts.extend(image_parts)
+        if not keys_by_label:
+            return {key: {} for key in items}
+
+        if throttle:
+            throttle()
+        content_text = self._generate(
+            [{"text": batch_prompt(len(keys_by_label))}] + item_parts,
+            timeout=30 + 10 * len(keys_by_label),
+        )
+        if content_text is None:
+            # Retrying each item would multiply the calls against an API that is already failing
+            return {key: {} for key in items}
+        results = self._parse_batch_response(content_text, keys_by_label)
+
+        missing = [key for key in keys_by_label.values() if not results.get(key)]
+        if missing and len(missing) < len(keys_by_label):
+            logger.warning(
+                "Batched vision response missing %d of %d item(s); retrying individually",
+                len(missing), len(keys_by_label),
+            )
+        for key in missing:
+            if throttle:
+                throttle()
+            results[key] = self.analyze(items[key])
+        for key in items:
+            results.setdefault(key, {})
+        return results
+
+    def _image_parts(self, files, thumbnail=False) -> list:
+        # Encode as base64 for Gemini API
+        images = read_thumbnail(files) if thumbnail else read_image_files(files)
+        return [
+            {"inline_data": {"mime_type": content_type, "data": base64.b64encode(image_bytes).decode("utf-8")}}
+            for image_bytes, content_type in images
+        ]
+
+    def _request(self, parts: list, method: str = "generateContent") -> tuple:
+        """Return the ``method`` endpoint and JSON body for ``parts``."""
+        endpoint = f"{self.base_url}/models/{self.model}:{method}?key={self.api_key}"
+        if method == "streamGenerateContent":
+            endpoint += "&alt=sse"
+        body = {
+            "contents": [
+                {
+                    "parts": parts
+                }
+            ],
+            "generationConfig": {
+                "temperature": 0.4,
+                "response_mime_type": "application/json",
+            },
+        }
+        return endpoint, body
+
+    @staticmethod
+    def _candidate_text(resp):
+        """Return the text of the first candidate, or None for an HTTP error."""
+        if resp.status_code != 200:
+            logger.error(
+                "Gemini Vision API HTTP error %s: %s",
+                resp.status_code,
+                resp.text[:500],
+            )
+            return None
+
+        data = resp.json()
+        # Gemini returns content in candidates[0].content.parts[0].text
+        return data["candidates"][0]["content"]["parts"][0]["text"]
+
+    def _generate(self, parts: list, timeout: float = 30):
+        """Return the text of the first candidate, or None if the call fails."""
+        endpoint, body = self._request(parts)
+        try:
+            resp = post_with_retries(endpoint, body, timeout)
+            # If model not found, try to list available models for debugging
+            if resp.status_code == 404:
+                self._log_available_models()
+            return self._candidate_text(resp)
+        except Exception:
+            logger.exception("Gemini Vision API call failed")
+            return None
+
+    async def _agenerate(self, parts: list, timeout: float = 30):
+        """Async ``_generate``: awaits the API instead of blocking a thread."""
+        endpoint, body = self._request(parts)
+        try:
+            resp = await apost_with_retries(endpoint, body, timeout)
+            if resp.status_code == 404:
+                await sync_to_async(self._log_available_models, thread_sensitive=False)()
+            return self._candidate_text(resp)
+        except Exception:
+            logger.exception("Gemini Vision API call failed")
+            return None
+
+    def _log_available_models(self):
+        import requests
+
+        try:
+            models_resp = requests.get(f"{self.base_url}/models?key={self.api_key}", timeout=10)
+            if models_resp.status_code == 200:
+                models_data = models_resp.json()
+                available_models = [m.get("name", "") for m in models_data.get("models", [])]
+                logger.warning(
+                    "Model %s not found. Available models: %s",
+                    self.model,
+                    ", ".join(available_models[:10]),  # Show first 10
+                )
+        except Exception:
+            pass  # Ignore errors when listing models
+
+    @staticmethod
+    def _parse_batch_response(content_text, keys_by_label: Mapping) -> dict:
+        """Map a batched JSON array response back to the caller's item keys."""
+        if content_text is None:
+            return {}
+        try:
+            parsed = json.loads(content_text)
+        except Exception:
+            logger.warning("Batched vision response was not valid JSON; falling back to single-item calls")
+            return {}
+        if isinstance(parsed, dict):
+            parsed = parsed.get("items", [])
+        if not isinstance(parsed, list):
+            return {}
+
+        results = {}
+        for entry in parsed:
+            if not isinstance(entry, dict):
+                continue
+            key = keys_by_label.get(str(entry.get("item_id", "")).strip())
+            if key is None or key in results:
+                continue
+            suggestion = clean_suggestion(entry)
+            if suggestion["title"] or suggestion["description"]:
+                results[key] = suggestion
+        return results
+
+
+class OpenAIProvider(VisionProvider):
+    """OpenAI vision-capable chat completions model."""
+
+    name = "openai"
+    endpoint = "https://api.openai.com/v1/chat/completions"
+
+    def __init__(self):
+        self.api_key = getattr(settings, "OPENAI_API_KEY", "")
+        self.model = getattr(settings, "OPENAI_VISION_MODEL", "gpt-4.1-mini")
+
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    def analyze(self, files: list) -> Mapping[str, str]:
+        images = read_image_files(files)
+        return self._complete(images, single_item_prompt(len(images)))
+
+    async def aanalyze(self, files: list) -> Mapping[str, str]:
+        images = await sync_to_async(read_image_files, thread_sensitive=False)(files)
+        return await self._acomplete(images, single_item_prompt(len(images)))
+
+    def analyze_quick(self, files: list) -> Mapping[str, str]:
+        return self._complete(read_thumbnail(files), quick_prompt(), QUICK_FIELDS, timeout=10)
+
+    async def aanalyze_quick(self, files: list) -> Mapping[str, str]:
+        images = await sync_to_async(read_thumbnail, thread_sensitive=False)(files)
+        return await self._acomplete(images, quick_prompt(), QUICK_FIELDS, timeout=10)
+
+    def analyze_details(self, files: list, category: str, title: str = "") -> Mapping[str, str]:
+        images = read_image_files(files)
+        return self._complete(images, detail_prompt(len(images), category, title), DETAIL_FIELDS)
+
+    async def aanalyze_details(self, files: list, category: str, title: str = "") -> Mapping[str, str]:
+        images = await sync_to_async(read_image_files, thread_sensitive=False)(files)
+        return await self._acomplete(images, detail_prompt(len(images), category, title), DETAIL_FIELDS)
+
+    def _complete(self, images: list, prompt: str, fields=FULL_FIELDS, timeout: float = 30) -> Mapping[str, str]:
+        if not images:
+            logger.warning("No valid images to analyze")
+            return {}
+
+        try:
+            resp = post_with_retries(self.endpoint, self._body(images, prompt), timeout=timeout, headers=self._headers())
+            return self._parse_response(resp, fields)
+        except Exception:
+            logger.exception("OpenAI Vision API call failed or returned invalid JSON")
+            return {}
+
+    async def _acomplete(self, images: list, prompt: str, fields=FULL_FIELDS, timeout: float = 30) -> Mapping[str, str]:
+        if not images:
+            logger.warning("No valid images to analyze")
+            return {}
+
+        try:
+            resp = await apost_with_retries(
+                self.endpoint, self._body(images, prompt), timeout=timeout, headers=self._headers()
+            )
+            return self._parse_response(resp, fields)
+        except Exception:
+            logger.exception("OpenAI Vision API call failed or returned invalid JSON")
+            return {}
+
+    def _headers(self) -> dict:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _body(self, images: list, prompt: str) -> dict:
+        # Encode as base64 data URLs
+        image_content = [
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:{content_type};base64,{base64.b64encode(image_bytes).decode('utf-8')}"},
+            }
+            for image_bytes, content_type in images
+        ]
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": prompt},
+                {
+                    "role": "user",
+                    "content": [{"type": "text", "text": "Analyze this lost-and-found item."}] + image_content,
+                },
+            ],
+            # Force the model to return a JSON object
+            "response_format": {"type": "json_object"},
+            "temperature": 0.4,
+        }
+
+    @staticmethod
+    def _parse_response(resp, fields=FULL_FIELDS) -> Mapping[str, str]:
+        if resp.status_code != 200:
+            logger.error(
+                "OpenAI Vision API HTTP error %s: %s",
+                resp.status_code,
+                resp.text[:500],
+            )
+            return {}
+
+        data = resp.json()
+        content_text = data["choices"][0]["message"]["content"]
+        return clean_suggestion(json.loads(content_text), fields)
+
+
+# Colour names by upper hue bound (degrees) for the local provider.
+HUE_NAMES = [
+    (15, "Red"),
+    (45, "Orange"),
+    (70, "Yellow"),
+    (170, "Green"),
+    (200, "Teal"),
+    (260, "Blue"),
+    (300, "Purple"),
+    (345, "Pink"),
+    (360, "Red"),
+]
+
+
+def describe_image_statistics(images) -> dict:
+    """
+    Derive a deterministic suggestion from raw image statistics.
+
+    ``images`` is a list of image bytes. The title is the average colour plus
+    a noun guessed from the aspect ratio; the category is the matching
+    display label. Used by the local provider and the Gemini stub server.
+    """
+    from PIL import Image
+
+    from .ingest import heif_available
+
+    heif_available()
+    pixels = []
+    aspect_ratios = []
+    for image_bytes in images:
+        try:
+            img = Image.open(BytesIO(image_bytes))
+            img.draft("RGB", (128, 128))
+            aspect_ratios.append(img.height / img.width if img.width else 1.0)
+            pixels.append(img.convert("RGB").resize((16, 16)).getdata())
+        except Exception:
+            continue
+    if not pixels:
+        return {"title": "", "category": "Other/Misc", "description": ""}
+
+    flat = [pixel for image_pixels in pixels for pixel in image_pixels]
+    r, g, b = (sum(channel) / len(flat) / 255 for channel in zip(*flat))
+    hue, saturation, value = colorsys.rgb_to_hsv(r, g, b)
+    if value < 0.2:
+        colour = "Black"
+    elif saturation < 0.15:
+        colour = "White" if value > 0.8 else "Grey"
+    else:
+        colour = next(name for bound, name in HUE_NAMES if hue * 360 < bound)
+
+    aspect = sum(aspect_ratios) / len(aspect_ratios)
+    if aspect > 1.6:
+        noun, category = "Bottle", "Bottles and containers"
+    elif aspect < 0.7:
+        noun, category = "Device", "Electronics"
+    elif value > 0.75 and saturation < 0.2:
+        noun, category = "Notebook", "Notebooks/books"
+    else:
+        noun, category = "Item", "Other/Misc"
+
+    count = len(pixels)
+    return {
+        "title": f"{colour} {noun}",
+        "category": category,
+        "description": (
+            f"{colour} {noun.lower()} shown in {count} photo{'s' if count != 1 else ''}. "
+            "Suggested offline from image colour and shape; please check the details."
+        ),
+    }
+
+
+class LocalVisionProvider(VisionProvider):
+    """Offline, deterministic provider that needs no API key or network."""
+
+    name = "local"
+
+    def analyze(self, files: list) -> Mapping[str, str]:
+        images = [image_bytes for image_bytes, _ in read_image_files(files)]
+        if not images:
+            return {}
+        return clean_suggestion(describe_image_statistics(images))
+
+    def analyze_quick(self, files: list) -> Mapping[str, str]:
+        images = [image_bytes for image_bytes, _ in read_thumbnail(files)]
+        if not images:
+            return {}
+        return clean_suggestion(describe_image_statistics(images), QUICK_FIELDS)
+
+
+VISION_PROVIDERS = {
+    "gemini": "inventory.vision_providers.GeminiProvider",
+    "openai": "inventory.vision_providers.OpenAIProvider",
+    "local": "inventory.vision_providers.LocalVisionProvider",
+}
+
+
+def get_vision_provider(name: str = "") -> VisionProvider:
+    """
+    Instantiate the provider named by ``settings.VISION_PROVIDER``: one of
+    the VISION_PROVIDERS keys or a dotted path to a VisionProvider subclass.
+    """
+    name = name or getattr(settings, "VISION_PROVIDER", "gemini")
+    return import_string(VISION_PROVIDERS.get(name, name))()
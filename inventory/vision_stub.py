@@ -0,0 +1,166 @@
+"""
+Local stand-in for the Gemini generateContent API.
+
+Speaks the same wire format as the real endpoint, answers from image
+statistics (see ``describe_image_statistics``) and injects configurable
+latency and error rates, so load tests and CI can drive the whole vision
+path, including retries, without network access or an API key.
+``streamGenerateContent?alt=sse`` answers as server-sent events carrying
+``chunk_chars`` characters each, ``chunk_delay`` seconds apart. Start it
+with ``python manage.py run_vision_stub`` and set
+``GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta``.
+"""
+import base64
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .vision_providers import describe_image_statistics
+
+logger = logging.getLogger(__name__)
+
+GENERATE_PATH = re.compile(r"^/v1beta/models/(?P<model>[^/:]+):(?P<method>generateContent|streamGenerateContent)$")
+ITEM_LABEL = re.compile(r'^Item "(?P<key>[^"]*)"')
+
+
+class StubConfig:
+    def __init__(
+        self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=None, chunk_chars=24, chunk_delay=0.0
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_chars = chunk_chars
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def next_outcome(self):
+        """Return ``(delay_seconds, should_fail)`` for the next request."""
+        with self.lock:
+            self.requests += 1
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            fail = self.random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return delay, fail
+
+
+def build_response_text(parts) -> str:
+    """Answer a generateContent ``parts`` list the way the real prompt asks for."""
+    groups = []  # [(key or None, [image bytes])]
+    for part in parts:
+        if "text" in part:
+            match = ITEM_LABEL.match(part["text"])
+            if match:
+                groups.append((match.group("key"), []))
+        elif "inline_data" in part:
+            if not groups:
+                groups.append((None, []))
+            groups[-1][1].append(base64.b64decode(part["inline_data"]["data"]))
+
+    if groups and groups[0][0] is not None:
+        return json.dumps([dict(describe_image_statistics(images), item_id=key) for key, images in groups])
+    images = groups[0][1] if groups else []
+    return json.dumps(describe_image_statistics(images))
+
+
+class GeminiStubHandler(BaseHTTPRequestHandler):
+    config = StubConfig()
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/v1beta/models":
+            self._send_json(200, {"models": [{"name": "models/gemini-2.5-flash"}]})
+        else:
+            self._send_error(404, "NOT_FOUND", "Unknown path")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        match = GENERATE_PATH.match(self.path.split("?")[0])
+        if not match:
+            self._send_error(404, "NOT_FOUND", f"models/{self.path} is not found")
+            return
+
+        delay, fail = self.config.next_outcome()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            status = self.config.error_status
+            self._send_error(status, "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE", "Injected stub error")
+            return
+
+        try:
+            body = json.loads(raw)
+            parts = body["contents"][0]["parts"]
+            text = build_response_text(parts)
+        except Exception as e:
+            self._send_error(400, "INVALID_ARGUMENT", str(e))
+            return
+
+        if match.group("method") == "streamGenerateContent":
+            self._send_stream(text)
+            return
+        self._send_json(200, {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {"promptTokenCount": len(raw) // 4, "candidatesTokenCount": len(text) // 4},
+            "modelVersion": "stub",
+        })
+
+    def _send_stream(self, text):
+        """Send ``text`` in pieces as server-sent events over a chunked response."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        size = max(1, self.config.chunk_chars)
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        for index, piece in enumerate(pieces):
+            if index and self.config.chunk_delay:
+                time.sleep(self.config.chunk_delay)
+            chunk = {
+                "candidates": [{
+                    "content": {"parts": [{"text": piece}], "role": "model"},
+                    "finishReason": "STOP" if index == len(pieces) - 1 else None,
+                    "index": 0,
+                }],
+                "modelVersion": "stub",
+            }
+            event = f"data: {json.dumps(chunk)}\r\n\r\n".encode("utf-8")
+            self.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_error(self, status, reason, message):
+        self._send_json(status, {"error": {"code": status, "message": message, "status": reason}})
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("vision stub: " + format, *args)
+
+
+def make_stub_server(host="127.0.0.1", port=8765, **config) -> ThreadingHTTPServer:
+    """Create (but do not start) a stub server; ``port=0`` picks a free port."""
+    handler = type("ConfiguredGeminiStubHandler", (GeminiStubHandler,), {"config": StubConfig(**config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -1,9 +1,28 @@
+"""
+ASGI entry point.
+
+Serving over ASGI lets the async vision endpoint keep many slow vision API
+calls in flight per process, while the ordinary sync views run in a thread
+pool alongside them. Run it under gunicorn with uvicorn workers::
+
+    gunicorn lost_and_found_project.asgi:application --preload \\
+        -k uvicorn.workers.UvicornWorker --workers 2 --bind 0.0.0.0:8000
+
+or as a single process with
+``uvicorn lost_and_found_project.asgi:application``. ``ASGI_THREADS`` caps
+the thread pool used for sync views, and ``VISION_MAX_CONNECTIONS`` the
+connections each worker keeps open to the vision API. The WSGI entry point
+still works, but there each vision call ties up a worker until it returns.
+As in ``wsgi.py``, the URLconf is imported at load time so ``--preload``
+shares the view modules between workers.
+"""
 import os
 
 from django.core.asgi import get_asgi_application
+from django.urls import get_resolver
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "lost_and_found_project.settings")
 
 application = get_asgi_application()
-
-
+# Import the URLconf and views now rather than on the first request (see above).
+get_resolver().urlconf_module
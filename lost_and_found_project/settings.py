@@ -101,6 +101,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "inventory.routers.replica_routing_middleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -109,6 +110,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+if not DEBUG:
+    # Serves the collectstatic output; runserver serves static files in development
+    MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
+
 ROOT_URLCONF = "lost_and_found_project.urls"
 
 TEMPLATES = [
@@ -140,6 +145,10 @@ if database_url:
             ssl_require=True,
         )
     }
+    # Browse search matches words with pg_trgm; same threshold as the
+    # in-memory index used on SQLite (inventory.search.SIMILARITY_THRESHOLD)
+    INSTALLED_APPS.append("django.contrib.postgres")
+    DATABASES["default"].setdefault("OPTIONS", {})["options"] = "-c pg_trgm.word_similarity_threshold=0.3"
 else:
     DATABASES = {
         "default": {
@@ -148,6 +157,25 @@ else:
         }
     }
 
+# Read replicas: comma-separated database URLs (e.g. sqlite:///replica.sqlite3,
+# a copy of db.sqlite3, to try it locally). GET requests read the inventory
+# tables from one of them; see inventory.routers
+DATABASE_REPLICAS = []
+for number, replica_url in enumerate(filter(None, os.environ.get("DATABASE_REPLICA_URLS", "").split(",")), 1):
+    replica_url = replica_url.strip()
+    alias = f"replica{number}"
+    DATABASES[alias] = dj_database_url.parse(
+        replica_url, conn_max_age=600, ssl_require=replica_url.startswith("postgres")
+    )
+    if DATABASES[alias]["ENGINE"] == "django.db.backends.postgresql":
+        DATABASES[alias].setdefault("OPTIONS", {})["options"] = "-c pg_trgm.word_similarity_threshold=0.3"
+    # Tests read the test database through the replica aliases
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ["inventory.routers.ReplicaRouter"]
+# How long a client that wrote keeps reading from the primary, covering replication lag
+DATABASE_PIN_SECONDS = int(os.environ.get("DATABASE_PIN_SECONDS", "10"))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -175,16 +203,88 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
+# Outside debug, collectstatic writes content-hashed copies of every asset plus
+# gzip and brotli versions, and WhiteNoise serves the hashed names with
+# far-future immutable cache headers. Run ``manage.py collectstatic`` on
+# deploy; in development and tests the unhashed source files are served.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Who sends a media file once inventory.media has checked access: "" streams
+# it from Django (gunicorn uses sendfile()), "nginx" answers with
+# X-Accel-Redirect to MEDIA_ACCEL_REDIRECT_PREFIX (an internal location
+# aliased to MEDIA_ROOT), "sendfile" with X-Sendfile for Apache/lighttpd
+MEDIA_SENDFILE = os.environ.get("MEDIA_SENDFILE", "")
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get("MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+# Browser cache lifetime of original photos; renditions are cached as immutable
+MEDIA_CACHE_SECONDS = int(os.environ.get("MEDIA_CACHE_SECONDS", "3600"))
+
+# Encoding an upload's renditions (JPEG, WebP and AVIF at several widths) takes
+# a second or more per photo, so by default it runs in a background thread
+# after the save commits; pages serve the original until they exist. Set
+# RENDITIONS_IN_BACKGROUND=0 to encode before the response instead.
+RENDITIONS_IN_BACKGROUND = os.environ.get("RENDITIONS_IN_BACKGROUND", "1") == "1"
+
+# Claimed items are archived this many days after their public visibility window ends
+ITEM_RETENTION_DAYS = int(os.environ.get("ITEM_RETENTION_DAYS", "30"))
+# Cold storage for images of archived items
+ARCHIVE_MEDIA_ROOT = Path(os.environ.get("ARCHIVE_MEDIA_ROOT", BASE_DIR / "archive" / "media"))
+
+# Memory-mapped feature vectors used for "looks like this" image search
+IMAGE_SIMILARITY_INDEX_DIR = Path(
+    os.environ.get("IMAGE_SIMILARITY_INDEX_DIR", BASE_DIR / "var" / "similarity")
+)
+
+# Staff photo uploads: resumable chunked staging area and size limits
+UPLOAD_STAGING_DIR = Path(os.environ.get("UPLOAD_STAGING_DIR", BASE_DIR / "var" / "uploads"))
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = int(os.environ.get("MAX_IMAGE_PIXELS", str(50_000_000)))
+UPLOAD_CHUNK_BYTES = int(os.environ.get("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+# The upload page downscales photos in the browser to this longest edge before
+# sending them; set UPLOAD_KEEP_ORIGINAL=1 where originals must be retained
+UPLOAD_MAX_DIMENSION = int(os.environ.get("UPLOAD_MAX_DIMENSION", "2048"))
+UPLOAD_JPEG_QUALITY = float(os.environ.get("UPLOAD_JPEG_QUALITY", "0.85"))
+UPLOAD_KEEP_ORIGINAL = os.environ.get("UPLOAD_KEEP_ORIGINAL", "0") == "1"
+
+# How long the browse page's facet counts are cached. Changes invalidate the
+# cache in the process that made them; other processes catch up within this
+FACET_CACHE_SECONDS = int(os.environ.get("FACET_CACHE_SECONDS", "60"))
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Vision analysis provider: "gemini", "openai", "local" (offline, derived from
+# image statistics) or a dotted path to a VisionProvider subclass
+VISION_PROVIDER = os.environ.get("VISION_PROVIDER", "gemini")
+VISION_MAX_RETRIES = int(os.environ.get("VISION_MAX_RETRIES", "2"))
+# Connections each worker process keeps open to the vision API from async views
+VISION_MAX_CONNECTIONS = int(os.environ.get("VISION_MAX_CONNECTIONS", "100"))
+# Longest side, in pixels, of the thumbnail the quick first pass of tiered
+# analysis sends (title and category only; the description pass sends every photo)
+VISION_THUMBNAIL_SIZE = int(os.environ.get("VISION_THUMBNAIL_SIZE", "512"))
+# Stream suggestions to the upload page field by field (Gemini's
+# streamGenerateContent relayed as server-sent events). Needs ASGI; under WSGI
+# the response is only sent once complete
+VISION_STREAMING = os.environ.get("VISION_STREAMING", "0") == "1"
+
 # Google Gemini API Key (currently in use)
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
+GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.5-flash")
+# Point at the local stub (python manage.py run_vision_stub) for offline load tests
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
 
-# OpenAI API Key (commented out - kept for reference if switching back)
-# OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
+# OpenAI API Key (used when VISION_PROVIDER = "openai")
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
+OPENAI_VISION_MODEL = os.environ.get("OPENAI_VISION_MODEL", "gpt-4.1-mini")
 
 # Authentication
 LOGIN_URL = "login"
@@ -1,15 +1,15 @@
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from inventory.views import MediaFileView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("inventory.urls", namespace="inventory")),
     path("accounts/", include("django.contrib.auth.urls")),
+    # Uploaded photos, access-checked in every environment (see inventory.media)
+    re_path(rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.+)$", MediaFileView.as_view(), name="media"),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
-
@@ -1,9 +1,23 @@
+"""
+WSGI entry point.
+
+Loading the project only imports what every process needs; the views pull
+in the image libraries (Pillow, numpy) and HTTP clients. The URLconf is
+imported here, at load time, so that with gunicorn's ``--preload``::
+
+    gunicorn lost_and_found_project.wsgi --preload --workers 4
+
+those modules are imported once in the master process and shared
+copy-on-write by the forked workers, rather than imported again by each
+worker on its first request.
+"""
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "lost_and_found_project.settings")
 
 application = get_wsgi_application()
-
-
+# Import the URLconf and views now rather than on the first request (see above).
+get_resolver().urlconf_module
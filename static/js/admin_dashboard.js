@@ -0,0 +1,206 @@
+// Mobile menu functionality
+function openMobileMenu() {
+    const sidebar = document.getElementById('sidebar');
+    const overlay = document.getElementById('mobile-menu-overlay');
+    if (sidebar && overlay) {
+        sidebar.classList.remove('-translate-x-full');
+        overlay.classList.add('active');
+        document.body.style.overflow = 'hidden';
+    }
+}
+
+function closeMobileMenu() {
+    const sidebar = document.getElementById('sidebar');
+    const overlay = document.getElementById('mobile-menu-overlay');
+    if (sidebar && overlay) {
+        sidebar.classList.add('-translate-x-full');
+        overlay.classList.remove('active');
+        document.body.style.overflow = '';
+    }
+}
+
+// Image modal functionality
+function openImageModal(imageUrl, imageTitle) {
+    const modal = document.getElementById('imageModal');
+    const modalImage = document.getElementById('modalImage');
+    modalImage.src = imageUrl;
+    modalImage.alt = imageTitle;
+    modal.classList.add('active');
+    document.body.style.overflow = 'hidden';
+}
+
+function closeImageModal() {
+    const modal = document.getElementById('imageModal');
+    modal.classList.remove('active');
+    document.body.style.overflow = '';
+}
+
+// Helper function to get CSRF token
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
+
+// Claimants data from server
+const claimantsData = JSON.parse(document.getElementById('claimants-data').textContent);
+const dashboardUrl = document.currentScript.dataset.dashboardUrl;
+
+// View all claimants functionality
+function showAllClaimants(itemId, itemTitle) {
+    const modal = document.getElementById('claimantsModal');
+    const titleEl = document.getElementById('claimantsItemTitle');
+    const listEl = document.getElementById('claimantsList');
+    
+    titleEl.textContent = `Item: ${itemTitle}`;
+    
+    // Get claimants for this item
+    const claimants = claimantsData[itemId] || [];
+    
+    if (claimants.length === 0) {
+        listEl.innerHTML = '<p class="text-slate-500 text-sm">No claimants found.</p>';
+    } else {
+        listEl.innerHTML = claimants.map((claimant, index) => {
+            const date = new Date(claimant.claimed_at);
+            const dateStr = date.toLocaleDateString('en-US', { 
+                month: 'short', 
+                day: 'numeric', 
+                year: 'numeric',
+                hour: 'numeric',
+                minute: '2-digit'
+            });
+            return `
+                <div class="claimant-item">
+                    <div class="flex items-center justify-between">
+                        <span class="font-bold text-slate-900">${index + 1}. ${claimant.name}</span>
+                        <span class="text-xs text-slate-500">${dateStr}</span>
+                    </div>
+                </div>
+            `;
+        }).join('');
+    }
+    
+    modal.classList.add('active');
+    document.body.style.overflow = 'hidden';
+}
+
+function closeClaimantsModal() {
+    const modal = document.getElementById('claimantsModal');
+    modal.classList.remove('active');
+    document.body.style.overflow = '';
+}
+
+// Delete confirmation and execution
+let itemToDelete = null;
+
+function confirmDelete(itemId, itemTitle) {
+    itemToDelete = itemId;
+    document.getElementById('deleteItemTitle').textContent = itemTitle;
+    document.getElementById('deleteModal').classList.add('active');
+    document.body.style.overflow = 'hidden';
+}
+
+function closeDeleteModal() {
+    document.getElementById('deleteModal').classList.remove('active');
+    document.body.style.overflow = '';
+    itemToDelete = null;
+}
+
+function performDelete() {
+    if (!itemToDelete) return;
+    
+    const btn = document.getElementById('confirmDeleteBtn');
+    btn.disabled = true;
+    btn.textContent = 'Deleting...';
+    
+    fetch(dashboardUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'X-CSRFToken': getCookie('csrftoken')
+        },
+        body: JSON.stringify({
+            'action': 'delete_item',
+            'item_id': itemToDelete
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            // Reload the page to show updated list
+            window.location.reload();
+        } else {
+            alert('Error deleting item: ' + (data.error || 'Unknown error'));
+            btn.disabled = false;
+            btn.textContent = 'Delete';
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        alert('Error deleting item. Please try again.');
+        btn.disabled = false;
+        btn.textContent = 'Delete';
+    });
+}
+
+// Dismiss message functionality
+function dismissMessage(messageId) {
+    const messageElement = document.getElementById('message-' + messageId);
+    if (messageElement) {
+        messageElement.style.display = 'none';
+        
+        // Remove from session via AJAX
+        fetch(dashboardUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken')
+            },
+            body: JSON.stringify({
+                'action': 'dismiss_message',
+                'message_id': messageId
+            })
+        }).catch(err => console.error('Error dismissing message:', err));
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const mobileMenuBtn = document.getElementById('mobile-menu-btn');
+    
+    if (mobileMenuBtn) {
+        mobileMenuBtn.addEventListener('click', openMobileMenu);
+    }
+    
+    const navLinks = document.querySelectorAll('#sidebar nav a');
+    navLinks.forEach(link => {
+        link.addEventListener('click', function() {
+            if (window.innerWidth < 1280) {
+                closeMobileMenu();
+            }
+        });
+    });
+    
+    window.addEventListener('resize', function() {
+        if (window.innerWidth >= 1280) {
+            closeMobileMenu();
+        }
+    });
+    
+    // Close modals on Escape key
+    document.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape') {
+            closeImageModal();
+            closeDeleteModal();
+            closeClaimantsModal();
+        }
+    });
+});
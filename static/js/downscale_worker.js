@@ -0,0 +1,21 @@
+// Runs in a Web Worker: decodes, resizes and re-encodes a photo off the main thread.
+self.onmessage = async function(e) {
+    const {id, file, maxDimension, quality} = e.data;
+    try {
+        const bitmap = await createImageBitmap(file, {imageOrientation: 'from-image'});
+        const scale = Math.min(1, maxDimension / Math.max(bitmap.width, bitmap.height));
+        const width = Math.round(bitmap.width * scale);
+        const height = Math.round(bitmap.height * scale);
+        const canvas = new OffscreenCanvas(width, height);
+        const ctx = canvas.getContext('2d');
+        // JPEG has no alpha; flatten transparent PNGs onto white.
+        ctx.fillStyle = '#fff';
+        ctx.fillRect(0, 0, width, height);
+        ctx.drawImage(bitmap, 0, 0, width, height);
+        bitmap.close();
+        const blob = await canvas.convertToBlob({type: 'image/jpeg', quality: quality});
+        self.postMessage({id, blob, width, height, scaled: scale < 1});
+    } catch (error) {
+        self.postMessage({id, error: String(error)});
+    }
+};
@@ -0,0 +1,127 @@
+let currentGalleryIndex = 0;
+const galleryImages = document.querySelectorAll('[data-gallery-index]');
+const totalImages = galleryImages.length;
+
+function navigateGallery(direction) {
+    if (totalImages <= 1) return;
+    
+    currentGalleryIndex += direction;
+    if (currentGalleryIndex < 0) {
+        currentGalleryIndex = totalImages - 1;
+    } else if (currentGalleryIndex >= totalImages) {
+        currentGalleryIndex = 0;
+    }
+    
+    updateGallery();
+}
+
+function goToImage(index) {
+    if (index >= 0 && index < totalImages) {
+        currentGalleryIndex = index;
+        updateGallery();
+    }
+}
+
+// Swap in the real source of images rendered with data-src (see responsive_image)
+function loadDeferredImages(root) {
+    if (!root) return;
+    root.querySelectorAll('img[data-src]').forEach(img => {
+        if (img.dataset.srcset) img.srcset = img.dataset.srcset;
+        img.src = img.dataset.src;
+        img.removeAttribute('data-src');
+        img.removeAttribute('data-srcset');
+    });
+}
+
+function updateGallery() {
+    loadDeferredImages(galleryImages[currentGalleryIndex]);
+
+    // Update main images
+    galleryImages.forEach((img, index) => {
+        if (index === currentGalleryIndex) {
+            img.classList.remove('opacity-0');
+            img.classList.add('opacity-100');
+        } else {
+            img.classList.remove('opacity-100');
+            img.classList.add('opacity-0');
+        }
+    });
+    
+    // Update thumbnails
+    const thumbs = document.querySelectorAll('.gallery-thumb');
+    thumbs.forEach((thumb, index) => {
+        if (index === currentGalleryIndex) {
+            thumb.classList.remove('border-transparent', 'hover:border-cyan-400');
+            thumb.classList.add('border-cyan-500');
+        } else {
+            thumb.classList.remove('border-cyan-500');
+            thumb.classList.add('border-transparent', 'hover:border-cyan-400');
+        }
+    });
+    
+    // Update counter
+    const counter = document.getElementById('current-image-index');
+    if (counter) {
+        counter.textContent = currentGalleryIndex + 1;
+    }
+}
+
+// Keyboard navigation
+document.addEventListener('keydown', function(e) {
+    if (e.key === 'ArrowLeft') {
+        navigateGallery(-1);
+    } else if (e.key === 'ArrowRight') {
+        navigateGallery(1);
+    }
+});
+
+// Mobile menu functionality
+function openMobileMenu() {
+    const sidebar = document.getElementById('sidebar');
+    const overlay = document.getElementById('mobile-menu-overlay');
+    if (sidebar && overlay) {
+        sidebar.classList.remove('-translate-x-full');
+        overlay.classList.add('active');
+        document.body.style.overflow = 'hidden';
+    }
+}
+
+function closeMobileMenu() {
+    const sidebar = document.getElementById('sidebar');
+    const overlay = document.getElementById('mobile-menu-overlay');
+    if (sidebar && overlay) {
+        sidebar.classList.add('-translate-x-full');
+        overlay.classList.remove('active');
+        document.body.style.overflow = '';
+    }
+}
+
+// Initialize gallery on page load
+document.addEventListener('DOMContentLoaded', function() {
+    const mobileMenuBtn = document.getElementById('mobile-menu-btn');
+    
+    if (mobileMenuBtn) {
+        mobileMenuBtn.addEventListener('click', openMobileMenu);
+    }
+    
+    // Close menu when clicking on nav links (mobile)
+    const navLinks = document.querySelectorAll('#sidebar nav a');
+    navLinks.forEach(link => {
+        link.addEventListener('click', function() {
+            if (window.innerWidth < 1280) { // xl breakpoint
+                closeMobileMenu();
+            }
+        });
+    });
+    
+    if (totalImages > 0) {
+        updateGallery();
+    }
+    
+    // Close mobile menu on window resize if it becomes desktop
+    window.addEventListener('resize', function() {
+        if (window.innerWidth >= 1280) {
+            closeMobileMenu();
+        }
+    });
+});
@@ -0,0 +1,130 @@
+// Image carousel functionality
+const carouselState = {};
+
+// Swap in the real source of images rendered with data-src (see responsive_image)
+function loadDeferredImages(root) {
+    if (!root) return;
+    root.querySelectorAll('img[data-src]').forEach(img => {
+        if (img.dataset.srcset) img.srcset = img.dataset.srcset;
+        img.src = img.dataset.src;
+        img.removeAttribute('data-src');
+        img.removeAttribute('data-srcset');
+    });
+}
+
+function navigateCarousel(itemId, direction) {
+    const container = document.querySelector(`[data-item-id="${itemId}"] .image-carousel-wrapper`);
+    if (!container) return;
+    
+    const images = container.querySelectorAll('[data-image-index]');
+    if (images.length <= 1) return;
+    
+    if (!carouselState[itemId]) {
+        carouselState[itemId] = 0;
+    }
+    
+    carouselState[itemId] += direction;
+    if (carouselState[itemId] < 0) {
+        carouselState[itemId] = images.length - 1;
+    } else if (carouselState[itemId] >= images.length) {
+        carouselState[itemId] = 0;
+    }
+    
+    // Update image visibility
+    loadDeferredImages(images[carouselState[itemId]]);
+
+    images.forEach((img, index) => {
+        if (index === carouselState[itemId]) {
+            img.classList.remove('opacity-0');
+            img.classList.add('opacity-100');
+        } else {
+            img.classList.remove('opacity-100');
+            img.classList.add('opacity-0');
+        }
+    });
+    
+    // Update dots
+    const dots = container.parentElement.querySelectorAll('.carousel-dot');
+    dots.forEach((dot, index) => {
+        if (index === carouselState[itemId]) {
+            dot.classList.remove('bg-white/50');
+            dot.classList.add('bg-white');
+        } else {
+            dot.classList.remove('bg-white');
+            dot.classList.add('bg-white/50');
+        }
+    });
+}
+
+// Keyboard navigation for carousels
+document.addEventListener('keydown', function(e) {
+    if (e.key === 'ArrowLeft' || e.key === 'ArrowRight') {
+        const hoveredCard = document.querySelector('.image-carousel-container:hover');
+        if (hoveredCard) {
+            const itemId = hoveredCard.closest('[data-item-id]')?.getAttribute('data-item-id');
+            if (itemId) {
+                e.preventDefault();
+                navigateCarousel(parseInt(itemId), e.key === 'ArrowLeft' ? -1 : 1);
+            }
+        }
+    }
+});
+
+// Mobile menu functionality
+function openMobileMenu() {
+    const sidebar = document.getElementById('sidebar');
+    const overlay = document.getElementById('mobile-menu-overlay');
+    if (sidebar && overlay) {
+        sidebar.classList.remove('-translate-x-full');
+        overlay.classList.add('active');
+        document.body.style.overflow = 'hidden';
+    }
+}
+
+function closeMobileMenu() {
+    const sidebar = document.getElementById('sidebar');
+    const overlay = document.getElementById('mobile-menu-overlay');
+    if (sidebar && overlay) {
+        sidebar.classList.add('-translate-x-full');
+        overlay.classList.remove('active');
+        document.body.style.overflow = '';
+    }
+}
+
+// Ensure search form works properly
+document.addEventListener('DOMContentLoaded', function() {
+    const searchForm = document.getElementById('search-form');
+    const searchInput = document.getElementById('search-input');
+    const mobileMenuBtn = document.getElementById('mobile-menu-btn');
+    
+    if (mobileMenuBtn) {
+        mobileMenuBtn.addEventListener('click', openMobileMenu);
+    }
+    
+    // Close menu when clicking on nav links (mobile)
+    const navLinks = document.querySelectorAll('#sidebar nav a');
+    navLinks.forEach(link => {
+        link.addEventListener('click', function() {
+            if (window.innerWidth < 1280) { // xl breakpoint
+                closeMobileMenu();
+            }
+        });
+    });
+    
+    if (searchForm && searchInput) {
+        // Form already submits on button click, but ensure Enter key works
+        searchInput.addEventListener('keypress', function(e) {
+            if (e.key === 'Enter') {
+                e.preventDefault();
+                searchForm.submit();
+            }
+        });
+    }
+    
+    // Close mobile menu on window resize if it becomes desktop
+    window.addEventListener('resize', function() {
+        if (window.innerWidth >= 1280) {
+            closeMobileMenu();
+        }
+    });
+});
@@ -0,0 +1,806 @@
+(function() {
+    // Per-request settings come from data-* attributes on this script's tag.
+    const config = document.currentScript.dataset;
+    const maxImages = 3;
+    let imageFieldCount = document.querySelectorAll('.image-field-wrapper').length;
+    const formsetPrefix = config.formsetPrefix;
+    const totalFormsInput = document.querySelector(`#id_${formsetPrefix}-TOTAL_FORMS`);
+    
+    function updateTotalForms() {
+        totalFormsInput.value = imageFieldCount;
+    }
+
+    // Photos are downscaled in a worker before upload so a phone camera file
+    // does not cross the network at full size. Browsers without
+    // OffscreenCanvas, formats they cannot decode (HEIC) and deployments that
+    // must keep originals send the file unchanged.
+    const uploadMaxDimension = Number(config.maxDimension) || 2048;
+    const uploadJpegQuality = Number(config.jpegQuality) || 0.85;
+    const keepOriginal = config.keepOriginal === 'true';
+    let downscaleWorker = null;
+    let downscaleJobId = 0;
+    const downscaleJobs = new Map();
+
+    function getDownscaleWorker() {
+        if (downscaleWorker || typeof OffscreenCanvas === 'undefined' || typeof Worker === 'undefined') {
+            return downscaleWorker;
+        }
+        downscaleWorker = new Worker(config.workerUrl);
+        downscaleWorker.onmessage = function(e) {
+            const job = downscaleJobs.get(e.data.id);
+            downscaleJobs.delete(e.data.id);
+            if (job) job(e.data);
+        };
+        return downscaleWorker;
+    }
+
+    function prepareUpload(file) {
+        const original = {file: file, scaled: false};
+        const worker = keepOriginal ? null : getDownscaleWorker();
+        if (!worker) return Promise.resolve(original);
+        return new Promise(resolve => {
+            const id = ++downscaleJobId;
+            downscaleJobs.set(id, result => {
+                // Keep the original when decoding failed or re-encoding would not make it smaller.
+                if (result.error || !result.blob || (!result.scaled && result.blob.size >= file.size)) {
+                    if (result.error) console.warn('Downscaling failed, uploading original:', result.error);
+                    resolve(original);
+                    return;
+                }
+                const name = file.name.replace(/\.[^.]+$/, '') + '.jpg';
+                console.log(`Downscaled ${file.name} from ${file.size} to ${result.blob.size} bytes (${result.width}x${result.height})`);
+                resolve({file: new File([result.blob], name, {type: 'image/jpeg'}), scaled: true});
+            });
+            worker.postMessage({id, file, maxDimension: uploadMaxDimension, quality: uploadJpegQuality});
+        });
+    }
+
+    // The HEIC preview converter is large and only needed for iPhone photos in
+    // browsers that cannot show them, so it is fetched the first time one is picked.
+    const heicConverterUrl = 'https://cdn.jsdelivr.net/npm/heic2any@0.0.4/dist/heic2any.min.js';
+    let heicConverter = null;
+
+    function loadHeicConverter() {
+        if (!heicConverter) {
+            heicConverter = new Promise((resolve, reject) => {
+                const script = document.createElement('script');
+                script.src = heicConverterUrl;
+                script.crossOrigin = 'anonymous';
+                script.onload = () => resolve(window.heic2any);
+                script.onerror = () => {
+                    heicConverter = null;
+                    reject(new Error('HEIC converter could not be loaded'));
+                };
+                document.head.appendChild(script);
+            });
+        }
+        return heicConverter;
+    }
+
+    // Each photo is sent once, in resumable chunks, to the staging area as soon
+    // as it is picked. Analysis and the final form submit refer to it by token.
+    const stagingUrl = config.stagingUrl;
+    const defaultChunkSize = Number(config.chunkBytes) || 1048576;
+    const maxChunkRetries = 3;
+
+    function csrfHeaders(extra) {
+        const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]');
+        return Object.assign({'X-CSRFToken': csrfToken ? csrfToken.value : ''}, extra || {});
+    }
+
+    async function readJson(response) {
+        const data = await response.json().catch(() => ({}));
+        if (!response.ok) {
+            const error = new Error(data.error || `HTTP error! status: ${response.status}`);
+            error.status = response.status;
+            throw error;
+        }
+        return data;
+    }
+
+    async function stageFile(prepared, onProgress) {
+        const file = prepared.file;
+        let upload = await fetch(stagingUrl, {
+            method: 'POST',
+            headers: csrfHeaders({'Content-Type': 'application/json'}),
+            body: JSON.stringify({filename: file.name, size: file.size, content_type: file.type, scaled: prepared.scaled}),
+        }).then(readJson);
+        const uploadUrl = `${stagingUrl}${upload.token}/`;
+        const chunkSize = upload.chunk_size || defaultChunkSize;
+        let retries = 0;
+
+        while (!upload.complete) {
+            const offset = upload.offset;
+            try {
+                upload = await fetch(uploadUrl, {
+                    method: 'PUT',
+                    headers: csrfHeaders({'Upload-Offset': String(offset), 'Content-Type': 'application/octet-stream'}),
+                    body: file.slice(offset, offset + chunkSize),
+                }).then(readJson);
+                retries = 0;
+                onProgress(Math.round((upload.offset / file.size) * 100));
+            } catch (error) {
+                // Rejected files (format, size) are final; anything else resumes
+                // from the offset the server actually has.
+                if ((error.status && error.status !== 409 && error.status < 500) || ++retries > maxChunkRetries) {
+                    throw error;
+                }
+                await new Promise(resolve => setTimeout(resolve, 500 * retries));
+                upload = await fetch(uploadUrl, {headers: csrfHeaders()}).then(readJson);
+            }
+        }
+        return upload.token;
+    }
+
+    function startStaging(wrapper, file) {
+        const tokenInput = wrapper.querySelector('.staged-token-input');
+        const progress = wrapper.querySelector('.upload-progress');
+        discardStaged(wrapper);
+        progress.textContent = 'Preparing photo...';
+        progress.className = 'text-xs text-cyan-600 mt-1 upload-progress';
+        const staging = prepareUpload(file).then(prepared => stageFile(prepared, percent => {
+            progress.textContent = `Uploading... ${percent}%`;
+        })).then(token => {
+            if (wrapper.staging === staging) {
+                tokenInput.value = token;
+                progress.textContent = '✓ Uploaded';
+                progress.className = 'text-xs text-green-600 mt-1 upload-progress';
+            }
+            return token;
+        }).catch(error => {
+            console.error('Staged upload failed, the photo will be sent with the form instead:', error);
+            if (wrapper.staging === staging) {
+                progress.textContent = error.status && error.status < 500 ? `Upload rejected: ${error.message}` : '';
+                progress.className = 'text-xs text-red-600 mt-1 upload-progress';
+            }
+            throw error;
+        });
+        wrapper.staging = staging;
+        return staging;
+    }
+
+    function discardStaged(wrapper) {
+        const tokenInput = wrapper.querySelector('.staged-token-input');
+        const progress = wrapper.querySelector('.upload-progress');
+        if (tokenInput && tokenInput.value) {
+            fetch(`${stagingUrl}${tokenInput.value}/`, {method: 'DELETE', headers: csrfHeaders()}).catch(() => {});
+            tokenInput.value = '';
+        }
+        if (progress) progress.textContent = '';
+        wrapper.staging = null;
+    }
+
+    // Photos that made it to the staging area are not uploaded a second time on submit.
+    document.getElementById('upload-form').addEventListener('submit', function(e) {
+        const form = this;
+        const pending = Array.from(document.querySelectorAll('.image-field-wrapper'))
+            .map(wrapper => wrapper.staging)
+            .filter(Boolean);
+        if (!form.dataset.stagingSettled && pending.length) {
+            e.preventDefault();
+            Promise.allSettled(pending).then(() => {
+                form.dataset.stagingSettled = '1';
+                form.requestSubmit();
+            });
+            return;
+        }
+        document.querySelectorAll('.image-field-wrapper').forEach(wrapper => {
+            const tokenInput = wrapper.querySelector('.staged-token-input');
+            const input = wrapper.querySelector('input[type="file"]');
+            if (tokenInput && tokenInput.value && input) {
+                input.disabled = true;
+            }
+        });
+    });
+    
+    function addImageField() {
+        if (imageFieldCount >= maxImages) {
+            document.getElementById('add-image-btn').classList.add('hidden');
+            return;
+        }
+        
+        imageFieldCount++;
+        updateTotalForms();
+        
+        const container = document.getElementById('image-fields-container');
+        const newField = document.createElement('div');
+        newField.className = 'image-field-wrapper rounded-xl border border-slate-200 bg-slate-50 p-4';
+        newField.setAttribute('data-field-index', (imageFieldCount - 1).toString());
+        newField.innerHTML = `
+            <label class="block text-sm font-bold text-slate-700 mb-2">Image ${imageFieldCount}</label>
+            <div class="flex items-center gap-3 mb-2">
+                <button type="button" class="rounded-xl bg-cyan-500 px-4 py-2 text-sm font-bold text-white shadow-lg shadow-cyan-500/20 transition hover:bg-cyan-600 upload-choice-btn">Upload</button>
+                <button type="button" class="rounded-xl bg-green-500 px-4 py-2 text-sm font-bold text-white shadow-lg shadow-green-500/20 transition hover:bg-green-600 camera-choice-btn">Camera</button>
+                <input type="file" name="${formsetPrefix}-${imageFieldCount - 1}-image" 
+                       id="id_${formsetPrefix}-${imageFieldCount - 1}-image" 
+                       class="image-upload-input" accept="image/*,.heic,.heif">
+                <button type="button" class="rounded-xl bg-red-500 px-4 py-2 text-sm font-bold text-white shadow-lg transition hover:bg-red-600 remove-image-btn hidden">Remove</button>
+            </div>
+            <input type="hidden" name="staged_tokens" value="" class="staged-token-input">
+            <p class="text-xs text-slate-500 mt-1 upload-progress"></p>
+            <div class="image-preview mt-3 hidden">
+                <img src="" alt="Preview" class="rounded-xl border-2 border-slate-300 max-w-[200px] max-h-[200px] w-auto h-auto">
+            </div>
+        `;
+        container.appendChild(newField);
+        
+        const input = newField.querySelector('.image-upload-input');
+        attachImageHandlers(input);
+        attachRemoveHandler(newField);
+        attachChoiceButtons(newField);
+        
+        if (imageFieldCount >= maxImages) {
+            document.getElementById('add-image-btn').classList.add('hidden');
+        }
+    }
+    
+    function attachChoiceButtons(wrapper) {
+        const uploadBtn = wrapper.querySelector('.upload-choice-btn');
+        const cameraBtn = wrapper.querySelector('.camera-choice-btn');
+        const input = wrapper.querySelector('input[type="file"]');
+
+        if (!uploadBtn || !cameraBtn || !input) return;
+
+        uploadBtn.addEventListener('click', function(e) {
+            e.preventDefault();
+            e.stopPropagation();
+            input.removeAttribute("capture");
+            input.setAttribute("accept", "image/*,.heic,.heif");
+            requestAnimationFrame(function() {
+                input.click();
+            });
+        });
+
+        cameraBtn.addEventListener('click', function(e) {
+            e.preventDefault();
+            e.stopPropagation();
+            input.setAttribute("capture", "environment");
+            input.setAttribute("accept", "image/*");
+            requestAnimationFrame(function() {
+                input.click();
+            });
+        });
+    }
+    
+    function attachRemoveHandler(wrapper) {
+        const removeBtn = wrapper.querySelector('.remove-image-btn');
+        const input = wrapper.querySelector('input[type="file"]');
+        const preview = wrapper.querySelector('.image-preview');
+        
+        removeBtn.addEventListener('click', function() {
+            input.value = '';
+            discardStaged(wrapper);
+            preview.classList.add('hidden');
+            removeBtn.classList.add('hidden');
+            analyzeImages();
+        });
+    }
+    
+    function attachImageHandlers(input) {
+        input.addEventListener('change', function(e) {
+            const file = e.target.files[0];
+            const wrapper = input.closest('.image-field-wrapper');
+            
+            if (!wrapper) {
+                console.error('Could not find image-field-wrapper');
+                return;
+            }
+            
+            const preview = wrapper.querySelector('.image-preview');
+            const img = preview ? preview.querySelector('img') : null;
+            const removeBtn = wrapper.querySelector('.remove-image-btn');
+            
+            if (!preview || !img) {
+                console.error('Could not find preview elements', {preview, img, wrapper});
+                return;
+            }
+            
+            if (file) {
+                console.log('File selected:', file.name, file.type);
+                
+                if (!file.type.startsWith('image/') && !file.name.toLowerCase().endsWith('.heic') && !file.name.toLowerCase().endsWith('.heif')) {
+                    alert('Please select an image file');
+                    input.value = '';
+                    return;
+                }
+                
+                const isHeic = file.name.toLowerCase().endsWith('.heic') || 
+                              file.name.toLowerCase().endsWith('.heif') ||
+                              file.type === 'image/heic' || 
+                              file.type === 'image/heif';
+                
+                if (isHeic) {
+                    console.log('Converting HEIC file to JPEG...');
+                    preview.innerHTML = '<p class="text-cyan-600">Converting HEIC image...</p>';
+                    preview.classList.remove('hidden');
+                    
+                    loadHeicConverter().then(heic2any => heic2any({
+                        blob: file,
+                        toType: 'image/jpeg',
+                        quality: 0.8
+                    })).then(function(conversionResult) {
+                        const jpegBlob = Array.isArray(conversionResult) ? conversionResult[0] : conversionResult;
+                        const reader = new FileReader();
+                        reader.onload = function(event) {
+                            preview.innerHTML = '<img src="" alt="Preview" class="rounded-xl border-2 border-slate-300 max-w-[200px] max-h-[200px] w-auto h-auto">';
+                            const convertedImg = preview.querySelector('img');
+                            convertedImg.src = event.target.result;
+                            preview.classList.remove('hidden');
+                            if (removeBtn) {
+                                removeBtn.classList.remove('hidden');
+                            }
+                            console.log('HEIC converted and preview shown');
+                        };
+                        reader.readAsDataURL(jpegBlob);
+                    }).catch(function(error) {
+                        console.error('HEIC conversion error:', error);
+                        preview.innerHTML = '<p class="text-red-600 text-sm">HEIC files are not supported for preview. The file will still be uploaded, but please convert it to JPEG/PNG for better compatibility.</p>';
+                        preview.classList.remove('hidden');
+                        if (removeBtn) {
+                            removeBtn.classList.remove('hidden');
+                        }
+                    });
+                } else {
+                    // An object URL lets the browser decode the file directly
+                    // instead of building a base64 copy of it in memory.
+                    const objectUrl = URL.createObjectURL(file);
+                    img.src = objectUrl;
+                    preview.classList.remove('hidden');
+                    
+                    if (removeBtn) {
+                        removeBtn.classList.remove('hidden');
+                    }
+                    
+                    img.onload = function() {
+                        console.log('Image loaded successfully, dimensions:', img.naturalWidth, 'x', img.naturalHeight);
+                        URL.revokeObjectURL(objectUrl);
+                    };
+                    img.onerror = function(err) {
+                        console.error('Error loading image into img element:', err);
+                        URL.revokeObjectURL(objectUrl);
+                        preview.innerHTML = '<p class="text-red-600 text-sm">Error loading image preview. The file may be corrupted or in an unsupported format.</p>';
+                    };
+                }
+                
+                startStaging(wrapper, file).catch(() => {});
+                analyzeImages();
+            } else {
+                console.log('File cleared');
+                discardStaged(wrapper);
+                preview.classList.add('hidden');
+                if (removeBtn) {
+                    removeBtn.classList.add('hidden');
+                }
+            }
+        });
+    }
+    
+    let lastAITitle = '';
+    let lastAIDescription = '';
+    let isAIGeneratedTitle = false;
+    let isAIGeneratedDescription = false;
+    let lastImageHash = ''; // Track image changes
+    // The server keeps at most one analysis in flight per upload page; a newer
+    // one supersedes the last, which is also aborted here.
+    const uploadSession = window.crypto && crypto.randomUUID ? crypto.randomUUID() : String(Math.random()).slice(2);
+    let currentAnalysis = null;
+
+    function cancelAnalysis() {
+        if (currentAnalysis) currentAnalysis.abort();
+        currentAnalysis = null;
+    }
+    
+    // Create a simple hash of current images to detect changes
+    function getImageHash() {
+        const imageInputs = document.querySelectorAll('.image-upload-input');
+        const imageInfo = [];
+        imageInputs.forEach((input) => {
+            if (input.files && input.files[0]) {
+                // Use filename, size, and last modified to create a unique identifier
+                const file = input.files[0];
+                imageInfo.push(`${file.name}-${file.size}-${file.lastModified}`);
+            }
+        });
+        return imageInfo.sort().join('|'); // Sort to handle reordering
+    }
+    
+    function analyzeImages() {
+        const formData = new FormData();
+        const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]');
+        if (!csrfToken) {
+            console.error('CSRF token not found');
+            return;
+        }
+        formData.append('csrfmiddlewaretoken', csrfToken.value);
+        formData.append('upload_session', uploadSession);
+        
+        const imageInputs = document.querySelectorAll('.image-upload-input');
+        let hasImages = false;
+        imageInputs.forEach((input) => {
+            if (input.files && input.files[0]) {
+                hasImages = true;
+            }
+        });
+        
+        if (!hasImages) {
+            cancelAnalysis();
+            document.getElementById('ai-status-title').textContent = '';
+            document.getElementById('ai-status-desc').textContent = '';
+            const categoryStatus = document.getElementById('ai-status-category');
+            if (categoryStatus) categoryStatus.textContent = '';
+            isAIGeneratedTitle = false;
+            isAIGeneratedDescription = false;
+            lastAITitle = '';
+            lastAIDescription = '';
+            lastImageHash = '';
+            return;
+        }
+        
+        // Check if images have changed
+        const currentImageHash = getImageHash();
+        const imagesChanged = currentImageHash !== lastImageHash;
+        lastImageHash = currentImageHash;
+        
+        const titleField = document.querySelector('#id_title');
+        const descField = document.querySelector('#id_description');
+        const categoryField = document.querySelector('#id_category');
+        const titleStatus = document.getElementById('ai-status-title');
+        const descStatus = document.getElementById('ai-status-desc');
+        const categoryStatus = document.getElementById('ai-status-category');
+        const currentTitle = titleField.value;
+        const currentDesc = descField.value;
+        
+        // If images changed, force regeneration of all fields (including category)
+        // Otherwise, only update if fields are empty or were AI-generated
+        const shouldUpdateTitle = imagesChanged || !currentTitle || (isAIGeneratedTitle && currentTitle === lastAITitle);
+        const shouldUpdateDescription = imagesChanged || !currentDesc || (isAIGeneratedDescription && currentDesc === lastAIDescription);
+        const shouldUpdateCategory = imagesChanged || true; // Always reassess category when images change
+        
+        // If images changed, we should always analyze, even if fields were manually edited
+        if (!imagesChanged && !shouldUpdateTitle && !shouldUpdateDescription && currentTitle && currentDesc) {
+            // Only skip if images haven't changed AND fields were manually edited
+            titleStatus.textContent = '';
+            descStatus.textContent = '';
+            if (categoryStatus) categoryStatus.textContent = '';
+            return;
+        }
+        
+        // Count actual images being sent for status message
+        let imageCount = 0;
+        imageInputs.forEach((input) => {
+            if (input.files && input.files[0]) {
+                imageCount++;
+            }
+        });
+        const imageText = imageCount === 1 ? 'image' : 'images';
+        
+        cancelAnalysis();
+        const analysis = new AbortController();
+        currentAnalysis = analysis;
+        function checkCurrent() {
+            if (analysis.signal.aborted) throw new DOMException('Superseded by a newer analysis', 'AbortError');
+        }
+
+        titleField.disabled = true;
+        descField.disabled = true;
+        if (categoryField) categoryField.disabled = true;
+        titleStatus.textContent = `Analyzing ${imageText}...`;
+        titleStatus.className = 'text-xs text-cyan-600 mt-1';
+        descStatus.textContent = `Analyzing ${imageText}...`;
+        descStatus.className = 'text-xs text-cyan-600 mt-1';
+        if (categoryStatus) {
+            categoryStatus.textContent = `Analyzing ${imageText}...`;
+            categoryStatus.className = 'text-xs text-cyan-600 mt-1';
+        }
+        
+        // Wait for the staged uploads and refer to them by token; a photo whose
+        // staging failed is sent along directly instead.
+        const stagedFiles = Array.from(imageInputs).map((input, index) => {
+            if (!(input.files && input.files[0])) return null;
+            const wrapper = input.closest('.image-field-wrapper');
+            const staging = wrapper && wrapper.staging ? wrapper.staging : Promise.reject(new Error('not staged'));
+            return staging.then(
+                token => formData.append('staged_tokens', token),
+                () => formData.append(`image_${index}`, input.files[0])
+            );
+        });
+
+        // Tiered analysis: a quick pass on one thumbnail fills the title and
+        // category, then a detailed pass over every photo, using only the
+        // chosen category's rules, fills the description.
+        function requestPhase(phase, extra, onFields) {
+            formData.set('phase', phase);
+            Object.entries(extra || {}).forEach(([key, value]) => formData.set(key, value));
+            const headers = {'X-Requested-With': 'XMLHttpRequest'};
+            if (config.visionStreaming === 'true') headers['Accept'] = 'text/event-stream';
+            return fetch(config.analyzeUrl, {
+                method: 'POST',
+                body: formData,
+                signal: analysis.signal,
+                headers: headers,
+            }).then(response => {
+                if (response.status === 409) {
+                    throw new DOMException('Superseded by a newer analysis', 'AbortError');
+                }
+                if (!response.ok) {
+                    throw new Error(`HTTP error! status: ${response.status}`);
+                }
+                if ((response.headers.get('Content-Type') || '').startsWith('text/event-stream')) {
+                    return readEvents(response, onFields);
+                }
+                return response.json();
+            });
+        }
+
+        // Streamed responses send each field as soon as the model has written it
+        // ("fields" events), then everything once more in a "done" event.
+        async function readEvents(response, onFields) {
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            while (true) {
+                const {value, done} = await reader.read();
+                if (done) throw new Error('Analysis stream ended early');
+                buffer += decoder.decode(value, {stream: true});
+                let end;
+                while ((end = buffer.indexOf('\n\n')) !== -1) {
+                    const message = buffer.slice(0, end);
+                    buffer = buffer.slice(end + 2);
+                    let event = 'message';
+                    let data = '';
+                    message.split('\n').forEach(line => {
+                        if (line.startsWith('event:')) event = line.slice(6).trim();
+                        else if (line.startsWith('data:')) data += line.slice(5).trim();
+                    });
+                    if (event === 'superseded') {
+                        throw new DOMException('Superseded by a newer analysis', 'AbortError');
+                    }
+                    checkCurrent();
+                    if (event === 'fields') onFields(JSON.parse(data));
+                    if (event === 'done') return JSON.parse(data);
+                }
+            }
+        }
+
+        // Each suggestion is applied once, whether it arrives streamed or in the final response.
+        const applied = {};
+        function applyFields(data) {
+            if ('title' in data && applied.title !== data.title) {
+                applied.title = data.title;
+                if (data.title && shouldUpdateTitle) {
+                    titleField.value = data.title;
+                    lastAITitle = data.title;
+                    isAIGeneratedTitle = true;
+                    titleStatus.textContent = `✓ AI-generated from ${imageText}`;
+                    titleStatus.className = 'text-xs text-green-600 mt-1';
+                } else if (data.title && !shouldUpdateTitle) {
+                    titleStatus.textContent = 'AI suggestion available (field manually edited)';
+                    titleStatus.className = 'text-xs text-slate-500 mt-1';
+                } else {
+                    titleStatus.textContent = '';
+                }
+            }
+
+            // Update category if provided - always update when images change
+            if ('category' in data && applied.category !== data.category) {
+                applied.category = data.category;
+                if (data.category && categoryField && shouldUpdateCategory) {
+                    const value = data.category;
+                    const optionValues = Array.from(categoryField.options).map(o => o.value);
+                    if (optionValues.includes(value)) {
+                        const previousCategory = categoryField.value;
+                        categoryField.value = value;
+                        if (categoryStatus) {
+                            if (previousCategory !== value) {
+                                categoryStatus.textContent = '✓ AI-selected category (updated)';
+                            } else {
+                            categoryStatus.textContent = '✓ AI-selected category';
+                            }
+                            categoryStatus.className = 'text-xs text-green-600 mt-1';
+                        }
+                    } else if (categoryStatus) {
+                        categoryStatus.textContent = 'AI suggested category, but it did not match available options';
+                        categoryStatus.className = 'text-xs text-yellow-600 mt-1';
+                    }
+                } else if (categoryStatus && shouldUpdateCategory) {
+                    categoryStatus.textContent = '';
+                }
+            }
+
+            if ('description' in data && applied.description !== data.description) {
+                applied.description = data.description;
+                if (data.description && shouldUpdateDescription) {
+                    descField.value = data.description;
+                    lastAIDescription = data.description;
+                    isAIGeneratedDescription = true;
+                    descStatus.textContent = `✓ AI-generated from ${imageText}`;
+                    descStatus.className = 'text-xs text-green-600 mt-1';
+                } else if (data.description && !shouldUpdateDescription) {
+                    descStatus.textContent = 'AI suggestion available (field manually edited)';
+                    descStatus.className = 'text-xs text-slate-500 mt-1';
+                } else {
+                    descStatus.textContent = '';
+                }
+            }
+        }
+
+        let quickDone = false;
+        Promise.all(stagedFiles)
+        .then(() => requestPhase('quick', {}, applyFields))
+        .then(data => {
+            checkCurrent();
+            console.log('AI quick response:', data);
+            quickDone = true;
+            applyFields({title: data.title || '', category: data.category || ''});
+
+            // Staff can edit the title and category while the description is written.
+            titleField.disabled = false;
+            if (categoryField) categoryField.disabled = false;
+
+            if (!data.title && !data.category) {
+                titleStatus.textContent = 'No AI suggestions available';
+                titleStatus.className = 'text-xs text-yellow-600 mt-1';
+                descStatus.textContent = 'No AI suggestions available';
+                descStatus.className = 'text-xs text-yellow-600 mt-1';
+                if (categoryStatus) {
+                    categoryStatus.textContent = 'No AI suggestions available';
+                    categoryStatus.className = 'text-xs text-yellow-600 mt-1';
+                }
+                return null;
+            }
+
+            descStatus.textContent = `Writing description from ${imageText}...`;
+            return requestPhase('details', {
+                category: categoryField ? categoryField.value : '',
+                title: titleField.value,
+            }, applyFields);
+        })
+        .then(data => {
+            if (!data) return;
+            checkCurrent();
+            console.log('AI details response:', data);
+            applyFields({description: data.description || ''});
+        })
+        .catch(error => {
+            // A newer analysis owns the fields now.
+            if (error.name === 'AbortError') return;
+            console.error('Error analyzing images:', error);
+            descStatus.textContent = 'Error: Could not analyze image. Check console for details.';
+            descStatus.className = 'text-xs text-red-600 mt-1';
+            if (quickDone) return;
+            titleStatus.textContent = 'Error: Could not analyze image. Check console for details.';
+            titleStatus.className = 'text-xs text-red-600 mt-1';
+            if (categoryStatus) {
+                categoryStatus.textContent = 'Error: Could not analyze category.';
+                categoryStatus.className = 'text-xs text-red-600 mt-1';
+            }
+        })
+        .finally(() => {
+            if (currentAnalysis && currentAnalysis !== analysis) return;
+            currentAnalysis = null;
+            titleField.disabled = false;
+            descField.disabled = false;
+            if (categoryField) categoryField.disabled = false;
+        });
+    }
+    
+    document.getElementById('add-image-btn').addEventListener('click', addImageField);
+    if (imageFieldCount < maxImages) {
+        document.getElementById('add-image-btn').classList.remove('hidden');
+    }
+    
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', initializeHandlers);
+    } else {
+        initializeHandlers();
+    }
+    
+    function initializeHandlers() {
+        console.log('Initializing image handlers...');
+        const wrappers = document.querySelectorAll('.image-field-wrapper');
+        console.log('Found', wrappers.length, 'image field wrappers');
+        
+        wrappers.forEach((wrapper, index) => {
+            const input = wrapper.querySelector('input[type="file"]');
+            if (input) {
+                console.log('Attaching handler to input', index, input.id);
+                input.classList.add('image-upload-input');
+                if (input.accept && !input.accept.includes('.heic')) {
+                    input.accept = input.accept + ',.heic,.heif';
+                } else if (!input.accept) {
+                    input.accept = 'image/*,.heic,.heif';
+                }
+                attachChoiceButtons(wrapper);
+                attachImageHandlers(input);
+                attachRemoveHandler(wrapper);
+            } else {
+                console.warn('No file input found in wrapper', index);
+            }
+        });
+        
+        const todayBtn = document.getElementById('today-btn');
+        const dateInput = document.querySelector('#id_date_found');
+        
+        if (todayBtn && dateInput) {
+            todayBtn.addEventListener('click', function() {
+                const today = new Date();
+                const year = today.getFullYear();
+                const month = String(today.getMonth() + 1).padStart(2, '0');
+                const day = String(today.getDate()).padStart(2, '0');
+                dateInput.value = `${year}-${month}-${day}`;
+                
+                todayBtn.classList.add('bg-green-500');
+                todayBtn.classList.remove('bg-slate-600');
+                setTimeout(function() {
+                    todayBtn.classList.remove('bg-green-500');
+                    todayBtn.classList.add('bg-slate-600');
+                }, 500);
+            });
+        }
+        
+        const titleField = document.querySelector('#id_title');
+        const descField = document.querySelector('#id_description');
+        
+        if (titleField) {
+            titleField.addEventListener('input', function() {
+                if (this.value !== lastAITitle) {
+                    isAIGeneratedTitle = false;
+                }
+            });
+        }
+        
+        if (descField) {
+            descField.addEventListener('input', function() {
+                if (this.value !== lastAIDescription) {
+                    isAIGeneratedDescription = false;
+                }
+            });
+        }
+    }
+})();
+
+// Mobile menu functionality
+function openMobileMenu() {
+    const sidebar = document.getElementById('sidebar');
+    const overlay = document.getElementById('mobile-menu-overlay');
+    if (sidebar && overlay) {
+        sidebar.classList.remove('-translate-x-full');
+        overlay.classList.add('active');
+        document.body.style.overflow = 'hidden';
+    }
+}
+
+function closeMobileMenu() {
+    const sidebar = document.getElementById('sidebar');
+    const overlay = document.getElementById('mobile-menu-overlay');
+    if (sidebar && overlay) {
+        sidebar.classList.add('-translate-x-full');
+        overlay.classList.remove('active');
+        document.body.style.overflow = '';
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const mobileMenuBtn = document.getElementById('mobile-menu-btn');
+    
+    if (mobileMenuBtn) {
+        mobileMenuBtn.addEventListener('click', openMobileMenu);
+    }
+    
+    // Close menu when clicking on nav links (mobile)
+    const navLinks = document.querySelectorAll('#sidebar nav a');
+    navLinks.forEach(link => {
+        link.addEventListener('click', function() {
+            if (window.innerWidth < 1280) { // xl breakpoint
+                closeMobileMenu();
+            }
+        });
+    });
+    
+    // Close mobile menu on window resize if it becomes desktop
+    window.addEventListener('resize', function() {
+        if (window.innerWidth >= 1280) {
+            closeMobileMenu();
+        }
+    });
+});
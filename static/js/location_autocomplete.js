@@ -0,0 +1,57 @@
+(function() {
+    // Suggests known locations while typing. Every input with
+    // data-location-autocomplete (the URL of the location autocomplete view)
+    // gets a <datalist> filled with the locations starting with its text.
+    const DEBOUNCE_MS = 150;
+
+    function attach(input, index) {
+        const list = document.createElement('datalist');
+        list.id = `location-options-${index}`;
+        input.after(list);
+        input.setAttribute('list', list.id);
+        input.setAttribute('autocomplete', 'off');
+
+        const seen = new Map();
+        let timer = null;
+        let controller = null;
+
+        function render(names) {
+            list.replaceChildren(...names.map(name => {
+                const option = document.createElement('option');
+                option.value = name;
+                return option;
+            }));
+        }
+
+        async function suggest() {
+            const prefix = input.value.trim().toLowerCase();
+            if (!prefix) {
+                render([]);
+                return;
+            }
+            if (seen.has(prefix)) {
+                render(seen.get(prefix));
+                return;
+            }
+            if (controller) controller.abort();
+            controller = new AbortController();
+            try {
+                const url = `${input.dataset.locationAutocomplete}?q=${encodeURIComponent(prefix)}`;
+                const response = await fetch(url, {signal: controller.signal, headers: {'Accept': 'application/json'}});
+                if (!response.ok) return;
+                const data = await response.json();
+                seen.set(prefix, data.results);
+                render(data.results);
+            } catch (error) {
+                if (error.name !== 'AbortError') console.warn('Location suggestions failed:', error);
+            }
+        }
+
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            timer = setTimeout(suggest, DEBOUNCE_MS);
+        });
+    }
+
+    document.querySelectorAll('[data-location-autocomplete]').forEach(attach);
+})();
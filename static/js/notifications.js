@@ -0,0 +1,67 @@
+(function() {
+    const overlay = document.getElementById('notification-overlay');
+    if (!overlay) return; // Exit if overlay doesn't exist
+    
+    function getIconForTag(tag) {
+        const icons = {
+            'success': '✓',
+            'error': '✕',
+            'warning': '⚠',
+            'info': 'ℹ'
+        };
+        return icons[tag] || 'ℹ';
+    }
+    
+    function showNotification(message, tag) {
+        const notification = document.createElement('div');
+        notification.className = `notification ${tag}`;
+        
+        const icon = document.createElement('div');
+        icon.className = 'notification-icon';
+        icon.textContent = getIconForTag(tag);
+        
+        const content = document.createElement('div');
+        content.className = 'notification-content';
+        content.textContent = message;
+        
+        const closeBtn = document.createElement('button');
+        closeBtn.className = 'notification-close';
+        closeBtn.innerHTML = '×';
+        closeBtn.setAttribute('aria-label', 'Close');
+        closeBtn.onclick = function() {
+            dismissNotification(notification);
+        };
+        
+        notification.appendChild(icon);
+        notification.appendChild(content);
+        notification.appendChild(closeBtn);
+        
+        overlay.appendChild(notification);
+        
+        // Messages are permanent - no auto-dismiss
+        // User must click the × button to dismiss
+    }
+    
+    function dismissNotification(notification) {
+        notification.classList.add('fade-out');
+        setTimeout(function() {
+            if (notification.parentNode) {
+                notification.parentNode.removeChild(notification);
+            }
+        }, 300);
+    }
+    
+    // Show any Django messages as notifications (only for staff)
+    // Messages are passed via data attribute to avoid CSP issues
+    const messagesData = document.getElementById('messages-data');
+    if (messagesData) {
+        try {
+            const messages = JSON.parse(messagesData.textContent);
+            messages.forEach(function(msg) {
+                showNotification(msg.text, msg.tags);
+            });
+        } catch (e) {
+            console.error('Error parsing messages:', e);
+        }
+    }
+})();